@@ -26,6 +26,10 @@ urlpatterns = [
     path('api/', include('inquiries.urls')),
     path('api/', include('services.urls')),
     path('api/', include('proposal.urls')),
+    path('api/', include('core.urls')),
+    path('api/', include('sync.urls')),
+    path('api/', include('dashboard.urls')),
+    path('api/', include('analytics.urls')),
 ]
 
 urlpatterns += staticfiles_urlpatterns()
\ No newline at end of file
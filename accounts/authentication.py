@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from .models import CustomUser
+
+
+def user_status_cache_key(user_id):
+    return f'accounts:user-status:{user_id}'
+
+
+def get_user_status(user_id):
+    """
+    Return the current `(role, is_active)` of a user, cached for `TOKEN_USER_STATUS_TTL` seconds.
+
+    A cache miss costs one small query; deleted users are reported as inactive.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        tuple: The role and active flag of the user.
+    """
+    key = user_status_cache_key(user_id)
+    status = cache.get(key)
+    if status is None:
+        status = CustomUser.objects.filter(pk=user_id).values_list('role', 'is_active').first() or ('', False)
+        cache.set(key, status, settings.TOKEN_USER_STATUS_TTL)
+    return status
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Lightweight user built from the access token claims instead of a `CustomUser` row.
+
+    It exposes the `role` claim so the permission classes can run without loading the user.
+    It has no database representation: use `user.pk` where a foreign key value is needed.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that trusts the `role` and `is_active` claims of the access token.
+
+    Instead of loading the `CustomUser` row on every request, the user is rebuilt from the
+    token claims. Revocation is enforced through `get_user_status`, which is served from the
+    cache: a token is rejected once its user is deactivated or deleted, or its role no longer
+    matches, within at most `TOKEN_USER_STATUS_TTL` seconds (immediately in the worker that
+    made the change). Tokens issued before the role claim existed get their role from the
+    cached status.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        role, is_active = get_user_status(user.pk)
+        if not is_active or not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if user.role is None:
+            user.role = role
+        elif user.role != role:
+            raise AuthenticationFailed('Token has been revoked', code='token_not_valid')
+        return user
@@ -6,7 +6,8 @@ from django.db import models
 class CustomUser(AbstractBaseUser,PermissionsMixin):
     """
     Used Django custom user model and for adding a 'role' field to define user roles
-    such as 'admin' and 'sales_agent'.
+    such as 'admin' and 'sales_agent'. `updated_at` validates the cached responses that
+    embed the user (see `core.conditional`).
     """
     ROLE_CHOICES = [
         ('admin', 'Admin'),
@@ -19,6 +20,7 @@ class CustomUser(AbstractBaseUser,PermissionsMixin):
     role = models.CharField(max_length=20,choices=ROLE_CHOICES)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
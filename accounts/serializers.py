@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import CustomUser
 
 class SalesAgentSerializer(serializers.ModelSerializer):
@@ -52,3 +53,20 @@ class SalesAgentSerializer(serializers.ModelSerializer):
                 role=role
             )
             return user
+
+
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token serializer that adds the user's `username`, `role` and `is_active` to the token claims.
+
+    The claims let `StatelessJWTAuthentication` build the request user from the token alone,
+    without loading the user from the database on every request.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        return token
@@ -0,0 +1,14 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import user_status_cache_key
+from .models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_status(sender, instance, **kwargs):
+    """
+    Drop the cached role and active flag of a user when it is saved or deleted,
+    so role changes and deactivations revoke existing tokens right away.
+    """
+    cache.delete(user_status_cache_key(instance.pk))
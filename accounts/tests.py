@@ -1,3 +1,50 @@
-from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from .models import CustomUser
 
-# Create your tests here.
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    """
+    Access tokens carry the user's role, so authenticated requests do not load the user row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user(
+            username='agent', email='agent@example.com', role='sales_agent', password='password'
+        )
+
+    def setUp(self):
+        cache.clear()
+        response = self.client.post('/api/auth/token/', {'username': 'agent', 'password': 'password'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['access']}")
+
+    def test_permission_checks_are_database_free(self):
+        self.client.get('/api/customers/')
+        # the user status is cached, only the customers page is queried
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/customers/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_role_is_enforced_from_token(self):
+        response = self.client.post('/api/sales-agent/', {})
+        self.assertEqual(response.status_code, 403)
+
+    def test_deactivated_user_is_rejected(self):
+        self.agent.is_active = False
+        self.agent.save()
+        response = self.client.get('/api/services/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_role_change_revokes_token(self):
+        self.agent.role = 'admin'
+        self.agent.save()
+        response = self.client.get('/api/services/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_created_records_are_assigned_to_token_user(self):
+        response = self.client.post('/api/customers/', {
+            'name': 'Customer', 'email': 'customer@example.com', 'phone_no': '0000', 'address': 'Address',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['data']['assigned_sales_agent'], self.agent.pk)
@@ -1,7 +1,7 @@
 import logging
 from rest_framework import generics
 from ..serializers import SalesAgentSerializer
-from ..utils import custom_response
+from core.envelope import envelope_response
 from accounts.permissions import IsAdmin
 
 logger = logging.getLogger(__name__)
@@ -40,21 +40,21 @@ class SalesAgentCreateView(generics.CreateAPIView):
         if serializer.is_valid():
             try:
                 serializer.save()
-                return custom_response(
+                return envelope_response(
                     status_code=201,
                     message="User created successfully.",
                     data=serializer.data
                 )
             except Exception as e:
                 logger.error(f"Error creating user: {str(e)}")
-                return custom_response(
+                return envelope_response(
                     status_code=500,
                     message="An error occurred while creating the user.",
                     data=None
                 )
         else:
             logger.error(f"Validation error: {serializer.errors}")
-            return custom_response(
+            return envelope_response(
                 status_code=400,
                 message="Invalid data.",
                 data=serializer.errors
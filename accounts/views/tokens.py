@@ -1,7 +1,5 @@
 from rest_framework_simplejwt.views import TokenObtainPairView,TokenRefreshView,TokenVerifyView
-from rest_framework.response import Response
-from rest_framework import status
-from django.utils import timezone
+from core.envelope import envelope_response
 
 class CustomTokenObtainView(TokenObtainPairView):
     """
@@ -21,24 +19,20 @@ class CustomTokenObtainView(TokenObtainPairView):
         """
         try:
             response = super().post(request, *args, **kwargs)
-            return Response({
-                "status": "success",
-                "code": response.status_code,
-                "message": "Token created successfully.",
-                "timestamp": timezone.now(),
-                "data": {
+            return envelope_response(
+                status_code=200,
+                message="Token created successfully.",
+                data={
                     "access": response.data['access'],
                     "refresh": response.data['refresh']
                 }
-            }, status=status.HTTP_200_OK)
+            )
         except Exception as e:
-            return Response({
-                "status": "error",
-                "code": 400,
-                "message": "Invalid credentials.",
-                "timestamp": timezone.now(),
-                "data": None
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return envelope_response(
+                status_code=400,
+                message="Invalid credentials.",
+                data=None
+            )
             
             
 class CustomTokenRefreshView(TokenRefreshView):
@@ -59,23 +53,19 @@ class CustomTokenRefreshView(TokenRefreshView):
         """
         try:
             response = super().post(request, *args, **kwargs)
-            return Response({
-                "status": "success",
-                "code": response.status_code,
-                "message": "Token refreshed successfully.",
-                "timestamp": timezone.now(),
-                "data": {
+            return envelope_response(
+                status_code=200,
+                message="Token refreshed successfully.",
+                data={
                     "access": response.data['access'],
                 }
-            }, status=status.HTTP_200_OK)
+            )
         except Exception as e:
-            return Response({
-                "status": "error",
-                "code": 401,
-                "message": "Token refresh failed.",
-                "timestamp": timezone.now(),
-                "data": None
-            }, status=status.HTTP_401_UNAUTHORIZED)
+            return envelope_response(
+                status_code=401,
+                message="Token refresh failed.",
+                data=None
+            )
             
             
             
@@ -96,19 +86,14 @@ class CustomTokenVerifyView(TokenVerifyView):
         """
         try:
             response = super().post(request, *args, **kwargs)
-            return Response({
-                "status": "success",
-                "code": 200,
-                "message": "Token is valid.",
-                "timestamp": timezone.now(),
-                "data": None
-            }, status=status.HTTP_200_OK)
+            return envelope_response(
+                status_code=200,
+                message="Token is valid.",
+                data=None
+            )
         except Exception as e:
-            return Response({
-                "status": "error",
-                "code": 401,
-                "message": "Token is invalid or expired.",
-                "timestamp": timezone.now(),
-                "data": None
-            }, status=status.HTTP_401_UNAUTHORIZED)         
-            
\ No newline at end of file
+            return envelope_response(
+                status_code=401,
+                message="Token is invalid or expired.",
+                data=None
+            )
@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from core.writes import defer_write
+
+BUCKET_VERSION_KEY = 'analytics:bucket-version:{month}'
+
+_local = threading.local()
+
+
+def month_of(value):
+    """
+    Return the month bucket of a datetime, in the current time zone, e.g. '2026-10'.
+    """
+    return timezone.localtime(value).strftime('%Y-%m')
+
+
+def month_start(month):
+    """
+    Return the aware datetime at which a month bucket starts.
+    """
+    return timezone.make_aware(datetime.strptime(month, '%Y-%m'))
+
+
+def next_month(month):
+    year, number = map(int, month.split('-'))
+    return f'{year + number // 12}-{number % 12 + 1:02d}'
+
+
+def month_range(first, last):
+    """
+    Return the months from `first` to `last`, both included.
+    """
+    months = [first]
+    while months[-1] < last:
+        months.append(next_month(months[-1]))
+    return months
+
+
+def get_bucket_versions(months):
+    """
+    Return the current version of each month bucket.
+
+    Like the service catalog version, a missing version starts from the current time, so it
+    never goes back to a version whose results may still be cached.
+
+    Returns:
+        dict: The version of every month.
+    """
+    keys = {month: BUCKET_VERSION_KEY.format(month=month) for month in months}
+    versions = cache.get_many(keys.values())
+    missing = {key: time.time_ns() for key in keys.values() if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {month: versions[key] for month, key in keys.items()}
+
+
+def bump_buckets(months):
+    """
+    Invalidate the cached analytics of the given months.
+
+    Within `batched_writes`, every month is invalidated once, at the end of the block.
+    """
+    defer_write(write_bumps, months)
+
+
+def write_bumps(months):
+    for month in set(months):
+        key = BUCKET_VERSION_KEY.format(month=month)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def cached_buckets(name, months, compute):
+    """
+    Return the results of every month, computing only the months not cached.
+
+    Each month is cached under its bucket version, so a write invalidates only the month it
+    falls in; in practice only the current month is recomputed.
+
+    Args:
+        name (str): The analytics and scope the results belong to, part of the cache key.
+        months (list): The months requested, e.g. ['2026-09', '2026-10'].
+        compute (callable): Called with the months missing from the cache; returns the
+            results of each of them, by month.
+
+    Returns:
+        dict: The results of every month, by month.
+    """
+    versions = get_bucket_versions(months)
+    keys = {month: f'analytics:{name}:{month}:{versions[month]}' for month in months}
+    cached = cache.get_many(keys.values())
+    results = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [month for month in months if month not in results]
+    if missing:
+        computed = compute(missing)
+        cache.set_many({keys[month]: computed[month] for month in missing}, timeout=settings.ANALYTICS_CACHE_TTL)
+        results.update(computed)
+    return results
+
+
+def deleting_inquiry_months():
+    """
+    Month buckets of the inquiries being deleted, by inquiry ID.
+
+    Filled from `pre_delete`, so the proposals deleted with an inquiry find its month
+    without a query per proposal.
+    """
+    if not hasattr(_local, 'inquiries'):
+        _local.inquiries = {}
+    return _local.inquiries
@@ -0,0 +1,164 @@
+from decimal import Decimal
+from django.db import connections
+from django.db.models import Count, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, TruncMonth
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from .buckets import month_start, next_month
+
+CENTS = Decimal('0.01')
+
+
+def in_months(field, months):
+    """
+    Build a filter matching a datetime field to any of the given month buckets.
+
+    Each month is a `created_at` range, so the query reads the `created_at` indexes.
+    """
+    condition = Q()
+    for month in months:
+        condition |= Q(**{f'{field}__gte': month_start(month), f'{field}__lt': month_start(next_month(month))})
+    return condition
+
+
+def with_month_totals(queryset, totals, rank_by=None):
+    """
+    Run a query grouped by `month` and `group_id`, adding per-month totals with window functions.
+
+    The ORM cannot apply a window function to an aggregate, so the grouped query is wrapped
+    in one outer SELECT computing `SUM(<column>) OVER (PARTITION BY month)` as
+    `month_<column>` for every column of `totals`, and the `rank` of each group within its
+    month by `rank_by`, highest first.
+
+    Args:
+        queryset (QuerySet): A `values()` queryset with `month`, `group_id` and the aggregates.
+        totals (tuple): The aggregate columns to total per month.
+        rank_by (str): The aggregate column to rank groups by, if any.
+
+    Returns:
+        list: One dict per group, ordered by month and rank.
+    """
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    sql, params = queryset.order_by().query.sql_with_params()
+    month = f't.{quote("month")}'
+    columns = ['t.*'] + [
+        f'SUM(t.{quote(column)}) OVER (PARTITION BY {month}) AS {quote("month_" + column)}' for column in totals
+    ]
+    order = [month]
+    if rank_by:
+        columns.append(f'RANK() OVER (PARTITION BY {month} ORDER BY t.{quote(rank_by)} DESC) AS {quote("rank")}')
+        order.append(quote('rank'))
+    order.append(f't.{quote("group_id")}')
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(columns)} FROM ({sql}) t ORDER BY {", ".join(order)}', params)
+        names = [column[0] for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+    for row in rows:
+        # Raw rows skip the ORM converters: SQLite returns the month as text, PostgreSQL as a datetime.
+        row['month'] = str(row['month'])[:7]
+    return rows
+
+
+def to_money(value):
+    return str(Decimal(str(value or 0)).quantize(CENTS))
+
+
+def revenue(months, by, agent=None):
+    """
+    Compute the accepted-proposal revenue of each month, per sales agent or per service.
+
+    Proposals are bucketed by their creation month. Per service, the cost of a proposal is
+    split evenly over its services, so the services of a month add up to its revenue;
+    proposals without services are left out of that breakdown.
+
+    Args:
+        months (list): The months to compute.
+        by (str): 'agent' or 'service'.
+        agent (int): Only count the proposals of this sales agent.
+
+    Returns:
+        dict: For every month, its `revenue` and the `breakdown` rows (`id`, `revenue`,
+            `proposals`, `share` of the month and `rank`).
+    """
+    if by == 'agent':
+        queryset = Proposals.objects.filter(in_months('created_at', months), status='Accepted')
+        if agent is not None:
+            queryset = queryset.filter(inquiry__assigned_sales_agent=agent)
+        queryset = queryset.values(
+            month=TruncMonth('created_at'), group_id=F('inquiry__assigned_sales_agent')
+        ).annotate(revenue=Sum('cost'), proposals=Count('pk'))
+    else:
+        through = Proposals.services.through
+        services_per_proposal = through.objects.filter(proposals=OuterRef('proposals')).order_by().values(
+            'proposals'
+        ).annotate(count=Count('pk')).values('count')
+        queryset = through.objects.filter(
+            in_months('proposals__created_at', months), proposals__status='Accepted'
+        )
+        if agent is not None:
+            queryset = queryset.filter(proposals__inquiry__assigned_sales_agent=agent)
+        # Divided as floats: SQLite stores whole costs as integers and would divide them as such.
+        share_of_cost = ExpressionWrapper(
+            Cast('proposals__cost', FloatField()) / Subquery(services_per_proposal), output_field=FloatField()
+        )
+        queryset = queryset.values(
+            month=TruncMonth('proposals__created_at'), group_id=F('service')
+        ).annotate(revenue=Sum(share_of_cost), proposals=Count('proposals'))
+
+    results = {month: {'revenue': '0.00', 'breakdown': []} for month in months}
+    for row in with_month_totals(queryset, totals=('revenue',), rank_by='revenue'):
+        month_revenue = Decimal(str(row['month_revenue']))
+        results[row['month']]['revenue'] = to_money(month_revenue)
+        results[row['month']]['breakdown'].append({
+            'id': row['group_id'],
+            'revenue': to_money(row['revenue']),
+            'proposals': row['proposals'],
+            'share': round(float(Decimal(str(row['revenue'])) / month_revenue), 4) if month_revenue else None,
+            'rank': row['rank'],
+        })
+    return results
+
+
+def rate(converted, inquiries):
+    return round(converted / inquiries, 4) if inquiries else None
+
+
+def conversion(months, agent=None):
+    """
+    Compute the inquiry-to-accepted-proposal conversion of each month, per sales agent.
+
+    Inquiries are bucketed by their creation month; an inquiry is converted when at least
+    one of its proposals is accepted, whenever that happened.
+
+    Args:
+        months (list): The months to compute.
+        agent (int): Only count the inquiries of this sales agent.
+
+    Returns:
+        dict: For every month, its `inquiries`, `converted` and `rate`, and the `breakdown`
+            rows (`id`, `inquiries`, `converted`, `rate`).
+    """
+    queryset = Inquiries.objects.filter(in_months('created_at', months))
+    if agent is not None:
+        queryset = queryset.filter(assigned_sales_agent=agent)
+    queryset = queryset.values(month=TruncMonth('created_at'), group_id=F('assigned_sales_agent')).annotate(
+        inquiries=Count('pk', distinct=True),
+        converted=Count('pk', filter=Q(proposals__status='Accepted'), distinct=True),
+    )
+
+    results = {month: {'inquiries': 0, 'converted': 0, 'rate': None, 'breakdown': []} for month in months}
+    for row in with_month_totals(queryset, totals=('inquiries', 'converted')):
+        month = results[row['month']]
+        month.update({
+            'inquiries': row['month_inquiries'],
+            'converted': row['month_converted'],
+            'rate': rate(row['month_converted'], row['month_inquiries']),
+        })
+        month['breakdown'].append({
+            'id': row['group_id'],
+            'inquiries': row['inquiries'],
+            'converted': row['converted'],
+            'rate': rate(row['converted'], row['inquiries']),
+        })
+    return results
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from sync.changes import proposal_inquiry
+from .buckets import bump_buckets, deleting_inquiry_months, month_of
+
+
+def inquiry_month(proposal):
+    """
+    Return the month bucket of a proposal's inquiry, which its conversion is counted in.
+    """
+    if not Proposals.inquiry.is_cached(proposal) and proposal.inquiry_id in deleting_inquiry_months():
+        return deleting_inquiry_months()[proposal.inquiry_id]
+    inquiry = proposal_inquiry(proposal)
+    return month_of(inquiry.created_at) if inquiry else None
+
+
+def inquiry_changed(sender, instance, raw=False, **kwargs):
+    """
+    Invalidate the conversion of the month an inquiry was created in.
+    """
+    if raw:
+        return
+    bump_buckets([month_of(instance.created_at)])
+    if kwargs['signal'] is post_delete:
+        deleting_inquiry_months().pop(instance.pk, None)
+
+
+def proposal_changed(sender, instance, raw=False, **kwargs):
+    """
+    Invalidate the revenue of the month a proposal was created in and the conversion of its
+    inquiry's month. A proposal moved to another inquiry leaves the previous inquiry's month
+    cached until it expires.
+    """
+    if raw:
+        return
+    bump_buckets(month for month in (month_of(instance.created_at), inquiry_month(instance)) if month)
+
+
+def remember_deleting_inquiry(sender, instance, **kwargs):
+    deleting_inquiry_months()[instance.pk] = month_of(instance.created_at)
+
+
+post_save.connect(inquiry_changed, sender=Inquiries, dispatch_uid='analytics_inquiry_saved')
+post_delete.connect(inquiry_changed, sender=Inquiries, dispatch_uid='analytics_inquiry_deleted')
+pre_delete.connect(remember_deleting_inquiry, sender=Inquiries, dispatch_uid='analytics_remember_deleting_inquiry')
+post_save.connect(proposal_changed, sender=Proposals, dispatch_uid='analytics_proposal_saved')
+post_delete.connect(proposal_changed, sender=Proposals, dispatch_uid='analytics_proposal_deleted')
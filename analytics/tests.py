@@ -0,0 +1,108 @@
+from datetime import timedelta
+from importlib import import_module
+from django.apps import apps
+from django.utils import timezone
+from core.testing import QueryBudgetTestCase
+from accounts.models import CustomUser
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from sync.models import Change
+from .buckets import month_of, month_range, month_start
+
+
+class AnalyticsTests(QueryBudgetTestCase):
+    """
+    Revenue and conversion analytics are computed per month with grouped queries and cached per month.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.current = month_of(timezone.now())
+        cls.previous = month_range(f'{int(cls.current[:4]) - 1}-{cls.current[5:]}', cls.current)[-2]
+        for proposal, cost in zip(cls.proposals[:3], ('100.00', '300.00', '50.00')):
+            proposal.status, proposal.cost = 'Accepted', cost
+            proposal.save()
+        cls.proposals[1].services.set(cls.services[:2])
+        # The last accepted proposal and its inquiry were created the month before.
+        last_month = month_start(cls.previous) + timedelta(days=1)
+        Proposals.objects.filter(pk=cls.proposals[2].pk).update(created_at=last_month)
+        Inquiries.objects.filter(pk=cls.inquiries[2].pk).update(created_at=last_month)
+
+    def get_months(self, url, budget=2, **params):
+        response = self.assertQueryBudget(budget, 'get', url, {'from': self.previous, 'to': self.current, **params})
+        return {month['month']: month for month in response.data['data']['months']}
+
+    def test_revenue_by_agent(self):
+        months = self.get_months('/api/analytics/revenue/')
+        self.assertEqual(months[self.current]['revenue'], '400.00')
+        self.assertEqual(months[self.current]['agents'], [{
+            'id': self.agent.pk, 'username': self.agent.username,
+            'revenue': '400.00', 'proposals': 2, 'share': 1.0, 'rank': 1,
+        }])
+        self.assertEqual(months[self.previous]['revenue'], '50.00')
+
+    def test_revenue_by_service_splits_cost(self):
+        months = self.get_months('/api/analytics/revenue/', by='service')
+        services = {row['name']: row for row in months[self.current]['services']}
+        # 100.00 over three services, 300.00 over two.
+        self.assertEqual(services[self.services[0].name]['revenue'], '183.33')
+        self.assertEqual(services[self.services[0].name]['rank'], 1)
+        self.assertEqual(services[self.services[2].name]['revenue'], '33.33')
+        self.assertEqual(services[self.services[2].name]['rank'], 3)
+        self.assertEqual(months[self.current]['revenue'], '400.00')
+
+    def test_conversion(self):
+        months = self.get_months('/api/analytics/conversion/')
+        self.assertEqual(
+            {key: months[self.current][key] for key in ('inquiries', 'converted', 'rate')},
+            {'inquiries': self.rows - 1, 'converted': 2, 'rate': 0.5},
+        )
+        self.assertEqual(months[self.previous]['agents'][0]['rate'], 1.0)
+
+    def test_only_changed_months_are_recomputed(self):
+        self.get_months('/api/analytics/revenue/')
+        # Cached: only the names are read.
+        self.get_months('/api/analytics/revenue/', budget=1)
+
+        # Not saved through the model, so the previous month stays cached.
+        Proposals.objects.filter(pk=self.proposals[2].pk).update(cost='75.00')
+        proposal = self.proposals[3]
+        proposal.status = 'Accepted'
+        proposal.save()
+        months = self.get_months('/api/analytics/revenue/')
+        self.assertEqual(months[self.current]['revenue'], '500.00')
+        self.assertEqual(months[self.previous]['revenue'], '50.00')
+
+    def test_sales_agent_sees_own_pipeline(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        self.client.force_authenticate(other_agent)
+        months = self.get_months('/api/analytics/revenue/', budget=1)
+        self.assertEqual(months[self.current], {'month': self.current, 'revenue': '0.00', 'agents': []})
+
+    def test_default_range_is_last_twelve_months(self):
+        data = self.client.get('/api/analytics/conversion/').data['data']
+        self.assertEqual(data['to'], self.current)
+        self.assertEqual(len(data['months']), 12)
+
+    def test_invalid_parameters(self):
+        for params in ({'from': '2026-13'}, {'to': 'latest'}, {'from': '2026-05', 'to': '2026-01'}, {'from': '2000-01', 'to': '2026-01'}):
+            response = self.client.get('/api/analytics/conversion/', params)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/analytics/revenue/', {'by': 'customer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_created_at_backfilled_from_the_change_log(self):
+        backfill = import_module('inquiries.migrations.0005_inquiries_created_at').backfill_created_at
+        first, second, third = self.inquiries[:3]
+        logged, updated = month_start(self.previous), timezone.now()
+        Inquiries.objects.filter(pk__in=[first.pk, second.pk, third.pk]).update(updated_at=updated)
+        Change.objects.filter(resource='inquiries', object_id=first.pk).update(created_at=logged)
+        # Logged after its last save: the log was installed after the row was written.
+        Change.objects.filter(resource='inquiries', object_id=second.pk).update(created_at=updated + timedelta(days=1))
+        Change.objects.filter(resource='inquiries', object_id=third.pk).delete()
+        backfill(apps, None)
+        created = dict(Inquiries.objects.values_list('pk', 'created_at'))
+        self.assertEqual([created[first.pk], created[second.pk], created[third.pk]], [logged, updated, updated])
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ConversionView, RevenueView
+
+urlpatterns = [
+    path('analytics/revenue/', RevenueView.as_view(), name='analytics-revenue'),
+    path('analytics/conversion/', ConversionView.as_view(), name='analytics-conversion'),
+]
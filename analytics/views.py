@@ -0,0 +1,137 @@
+import re
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.views import APIView
+from accounts.models import CustomUser
+from accounts.permissions import IsAdminOrSalesAgent
+from core.envelope import envelope_response
+from core.replicas import ReplicaReadMixin
+from services.models import Service
+from .buckets import cached_buckets, month_of, month_range
+from .queries import conversion, revenue
+
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+# Model and field naming the rows of each breakdown.
+BREAKDOWNS = {
+    'agent': ('agents', CustomUser, 'username'),
+    'service': ('services', Service, 'name'),
+}
+
+
+class AnalyticsView(ReplicaReadMixin, APIView):
+    """
+    Base view for analytics over a range of months.
+
+    `?from=` and `?to=` select the months (`YYYY-MM`, both included, at most
+    `ANALYTICS_MAX_MONTHS`); by default the last 12 months up to the current one. Every
+    month is computed with one grouped query and cached on its own (see
+    `analytics.buckets.cached_buckets`). Admins see every sales agent, sales agents only
+    their own inquiries and proposals.
+
+    Permission Classes:
+        - IsAdminOrSalesAgent: Admins and sales agents can read analytics.
+    """
+    permission_classes = [IsAdminOrSalesAgent]
+
+    def get_months(self):
+        """
+        Parse the requested range of months.
+
+        Returns:
+            list: The months, oldest first; None when the range is invalid.
+        """
+        last = self.request.query_params.get('to') or month_of(timezone.now())
+        if not MONTH_PATTERN.match(last):
+            return None
+        first = self.request.query_params.get('from') or month_range(f'{int(last[:4]) - 1}-{last[5:]}', last)[1]
+        if not MONTH_PATTERN.match(first) or first > last:
+            return None
+        months = month_range(first, last)
+        return months if len(months) <= settings.ANALYTICS_MAX_MONTHS else None
+
+    def get_agent(self):
+        """
+        Return the sales agent the analytics are scoped to; None for admins.
+        """
+        return None if self.request.user.role == 'admin' else self.request.user.pk
+
+    def invalid_months(self):
+        return envelope_response(
+            400, f"Invalid month range: use from and to as YYYY-MM, at most {settings.ANALYTICS_MAX_MONTHS} months.",
+            data=None,
+        )
+
+    def name_breakdown(self, results, by):
+        """
+        Replace the `breakdown` of every month with its named rows, with one query for the names.
+        """
+        key, model, field = BREAKDOWNS[by]
+        ids = {row['id'] for month in results for row in month['breakdown']}
+        names = dict(model.objects.filter(pk__in=ids).values_list('pk', field)) if ids else {}
+        for month in results:
+            month[key] = [{'id': row['id'], field: names.get(row['id']), **row} for row in month.pop('breakdown')]
+        return results
+
+
+class RevenueView(AnalyticsView):
+    """
+    API view returning the revenue of accepted proposals per month, per sales agent or per service.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to return the accepted-proposal revenue of a range of months.
+
+        `?by=agent` (default) or `?by=service` selects the breakdown. Each month has its
+        total `revenue` and, per agent or service, the `revenue`, the number of `proposals`,
+        the `share` of the month's revenue and the `rank` within the month.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A DRF Response object with the revenue, or an error for invalid parameters.
+        """
+        months, by = self.get_months(), request.query_params.get('by', 'agent')
+        if months is None:
+            return self.invalid_months()
+        if by not in BREAKDOWNS:
+            return envelope_response(400, "Invalid breakdown: use by=agent or by=service.", data=None)
+
+        agent = self.get_agent()
+        buckets = cached_buckets(
+            f'revenue:{by}:{agent or "all"}', months, lambda missing: revenue(missing, by, agent)
+        )
+        results = self.name_breakdown([{'month': month, **buckets[month]} for month in months], by)
+        data = {'from': months[0], 'to': months[-1], 'by': by, 'months': results}
+        return envelope_response(200, "Revenue retrieved successfully.", data=data)
+
+
+class ConversionView(AnalyticsView):
+    """
+    API view returning the share of inquiries that got an accepted proposal, per month and sales agent.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to return the conversion of the inquiries created in a range of months.
+
+        Each month has the number of `inquiries` created, how many were `converted` (have an
+        accepted proposal) and the conversion `rate`, in total and per sales agent. The rate
+        is null for months without inquiries.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A DRF Response object with the conversion, or an error for invalid parameters.
+        """
+        months = self.get_months()
+        if months is None:
+            return self.invalid_months()
+
+        agent = self.get_agent()
+        buckets = cached_buckets(f'conversion:{agent or "all"}', months, lambda missing: conversion(missing, agent))
+        results = self.name_breakdown([{'month': month, **buckets[month]} for month in months], 'agent')
+        data = {'from': months[0], 'to': months[-1], 'months': results}
+        return envelope_response(200, "Conversion retrieved successfully.", data=data)
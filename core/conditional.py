@@ -0,0 +1,173 @@
+import hashlib
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+class ConditionalResponse(Exception):
+    """
+    Raised from `initial` to answer a conditional request before the view runs.
+    """
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def weak_etag(*parts):
+    """
+    Build a weak ETag from the values that identify a version of a response.
+
+    Returns:
+        str: The quoted ETag, e.g. `W/"5d41402abc4b2a76b9719d911017c592"`.
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def loaded_related(instance, path):
+    """
+    Follow `path` (e.g. 'inquiry__customer') through relations that are already loaded.
+
+    Returns:
+        Model: The related instance, or None when a step was not loaded (or is empty).
+    """
+    for name in path.split('__'):
+        if instance is None or name not in instance._state.fields_cache:
+            return None
+        instance = instance._state.fields_cache[name]
+    return instance
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin answering `If-None-Match` and `If-Modified-Since` on `list` and `retrieve`.
+
+    The validators are built from the rows the action serves: the primary key and
+    `updated_at` of each row on the page, and of the relations in `etag_related` that were
+    loaded with it (relations that are not loaded are rendered as primary keys, which
+    `updated_at` already covers). List pages also depend on whether there is a next or
+    previous page.
+
+    - Without a conditional header, nothing extra is queried: the validators are taken
+      from the rows `paginate_queryset` or `get_object` loaded for the response.
+    - With one, the page (or row) is loaded once without its prefetches before the view
+      runs, so a match is answered with one query and nothing serialized.
+
+    The ETag also covers the full request path (pagination, search and sparse fieldsets),
+    the user (whose role scopes the queryset) and `get_etag_versions()`. A matching request
+    gets an empty 304 response; other responses carry the `ETag` and `Last-Modified` headers.
+    Lists have no `Last-Modified`, since a date cannot tell that rows were deleted.
+    """
+    conditional_actions = ('list', 'retrieve')
+    etag_related = ()
+
+    def get_etag_versions(self):
+        """
+        Return extra values the representation depends on, such as cache versions.
+        """
+        return ()
+
+    def is_conditional_get(self):
+        """
+        Tell whether the current request is a GET or HEAD of one of the `conditional_actions`.
+        """
+        return self.request.method in ('GET', 'HEAD') and self.action in self.conditional_actions
+
+    def get_validators_for(self, rows, paginator=None):
+        """
+        Compute the validators of a response serving `rows`.
+
+        Args:
+            rows (list): The rows on the page, or the retrieved row.
+            paginator (BasePagination, optional): The paginator that loaded a list page; the
+                view's paginator by default.
+
+        Returns:
+            tuple: The ETag and the last modification datetime (None for lists).
+        """
+        versions, dates = [], []
+        for row in rows:
+            loaded = [row, *(loaded_related(row, path) for path in self.etag_related)]
+            stamps = [instance.__dict__.get('updated_at') if instance is not None else None for instance in loaded]
+            versions.append((row.pk, *stamps))
+            dates.extend(stamps)
+        if self.action == 'list':
+            paginator = paginator or self.paginator
+            versions.append((getattr(paginator, 'has_next', None), getattr(paginator, 'has_previous', None)))
+
+        etag = weak_etag(self.request.get_full_path(), self.request.user.pk, versions, *self.get_etag_versions())
+        if self.action != 'retrieve':
+            return etag, None
+        return etag, max((date for date in dates if date is not None), default=None)
+
+    def get_conditional_validators(self):
+        """
+        Compute the validators of a conditional list or retrieve request, before the view runs.
+
+        The served rows are loaded with their joins but without their prefetches, which do
+        not take part in the validators.
+
+        Returns:
+            tuple: The ETag and the last modification datetime (None for lists); both None
+                when the request has no conditional header or the requested row does not
+                exist, so the view answers as usual.
+        """
+        if not any(header in self.request.META for header in CONDITIONAL_HEADERS):
+            return None, None
+        queryset = self.get_queryset().prefetch_related(None)
+        if self.action == 'list':
+            # A paginator of its own: CursorPagination keeps state between calls.
+            paginator = self.pagination_class()
+            return self.get_validators_for(paginator.paginate_queryset(queryset, self.request, view=self) or [], paginator)
+
+        queryset = self.filter_queryset(queryset)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            row = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).first()
+        except (ValueError, DjangoValidationError):
+            return None, None
+        if row is None:
+            return None, None
+        return self.get_validators_for([row])
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if self.is_conditional_get() and not self.conditional_validators[0]:
+            self.conditional_validators = self.get_validators_for(page or [])
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.is_conditional_get() and not self.conditional_validators[0]:
+            self.conditional_validators = self.get_validators_for([instance])
+        return instance
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None, None
+        if self.is_conditional_get():
+            etag, last_modified = self.conditional_validators = self.get_conditional_validators()
+            if etag is None:
+                return
+            response = get_conditional_response(
+                request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+            )
+            if response is not None:
+                raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag, last_modified = getattr(self, 'conditional_validators', None) or (None, None)
+        if etag and response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
@@ -0,0 +1,31 @@
+from django.db import connections
+
+
+def connection_stats():
+    """
+    Describes how each configured database reuses its connections.
+
+    For databases using a psycopg connection pool the pool's own counters are included
+    (`pool_size`, `pool_available`, `requests_waiting`, `requests_wait_ms`, ...). Other
+    databases report their persistent connection settings and whether the current
+    thread holds an open connection.
+
+    Returns:
+        list: One dictionary per database alias.
+    """
+    stats = []
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        entry = {
+            'alias': alias,
+            'vendor': connection.vendor,
+            'pooled': pool is not None,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'connected': connection.connection is not None,
+        }
+        if pool is not None:
+            entry['pool'] = pool.get_stats()
+        stats.append(entry)
+    return stats
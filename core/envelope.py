@@ -1,6 +1,6 @@
-from rest_framework.response import Response
-from rest_framework import status
 from django.utils import timezone
+from rest_framework.response import Response
+
 
 def custom_response(status_code, message, data=None):
     """
@@ -9,7 +9,7 @@ def custom_response(status_code, message, data=None):
     :param status_code: HTTP status code for the response
     :param message: Custom message for the response
     :param data: Actual data to include in the response (default is None)
-    :return: DRF Response object with standardized format
+    :return: Dictionary with standardized format
     """
     response_data = {
         "status": "success" if status_code < 400 else "error",
@@ -18,4 +18,16 @@ def custom_response(status_code, message, data=None):
         "timestamp": timezone.now().isoformat(),
         "data": data
     }
-    return Response(response_data, status=status_code)
+    return response_data
+
+
+def envelope_response(status_code, message, data=None):
+    """
+    Generates a standardized API response wrapped in a DRF `Response`.
+
+    :param status_code: HTTP status code for the response
+    :param message: Custom message for the response
+    :param data: Actual data to include in the response (default is None)
+    :return: DRF Response object with standardized format
+    """
+    return Response(custom_response(status_code, message, data), status=status_code)
@@ -0,0 +1,115 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key related field that resolves IDs in batches instead of one `get()` per ID.
+
+    - With `many=True`, the whole submitted list is resolved with a single `pk__in` query.
+    - When the field is used in a bulk payload, `BulkRelatedListSerializer` primes it with the
+      IDs of every item first, so the entire batch costs one query per field.
+
+    Validation errors use the same messages as `PrimaryKeyRelatedField`.
+
+    Methods:
+        prime(values): Loads the objects for a batch of raw IDs with one query.
+        lookup(pks): Returns the objects for the given primary keys, using primed objects first.
+        to_internal_value(data): Resolves a single ID to its object.
+    """
+    _primed = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        """
+        Convert a submitted value to a primary key of the related model.
+
+        Raises:
+            ValidationError: If the value has the wrong type for a primary key.
+        """
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+    def prime(self, values):
+        """
+        Load the objects for a batch of raw IDs with one query and keep them for later lookups.
+
+        Values that are not valid primary keys are skipped; they are reported when the
+        individual items are validated.
+
+        Args:
+            values (iterable): The raw IDs submitted for this field across a payload.
+        """
+        pks = set()
+        for value in values:
+            try:
+                pks.add(self.to_pk(value))
+            except serializers.ValidationError:
+                continue
+        self._primed = self.get_queryset().in_bulk(pks) if pks else {}
+
+    def lookup(self, pks):
+        """
+        Return the objects for the given primary keys.
+
+        Args:
+            pks (list): The primary keys to resolve.
+
+        Returns:
+            dict: The found objects keyed by primary key. Missing keys are absent.
+        """
+        primed = self._primed or {}
+        objects = {pk: primed[pk] for pk in pks if pk in primed}
+        missing = [pk for pk in pks if pk not in objects]
+        if missing and self._primed is None:
+            objects.update(self.get_queryset().in_bulk(missing))
+        return objects
+
+    def to_internal_value(self, data):
+        pk = self.to_pk(data)
+        obj = self.lookup([pk]).get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Many related field that resolves the whole list of IDs with a single `pk__in` query.
+
+    Objects are returned in the submitted order with duplicates removed. Every missing ID
+    gets its own `does_not_exist` message.
+    """
+
+    def prime(self, values):
+        self.child_relation.prime(pk for value in values if isinstance(value, (list, tuple)) for pk in value)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        pks = list(dict.fromkeys(self.child_relation.to_pk(item) for item in data))
+        objects = self.child_relation.lookup(pks)
+        missing = [pk for pk in pks if pk not in objects]
+        if missing:
+            raise serializers.ValidationError([
+                self.child_relation.error_messages['does_not_exist'].format(pk_value=pk)
+                for pk in missing
+            ], code='does_not_exist')
+        return [objects[pk] for pk in pks]
@@ -0,0 +1,130 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from .metrics import FRAGMENT_CACHE
+
+
+class FragmentCache:
+    """
+    Cache of the serialized representation of single rows, keyed by `(model, pk, version)`.
+
+    Every row has a version number in the cache, changed by `invalidate` when the row is
+    saved or deleted (see `core.signals`); fragments stored under an older version are not
+    read again and expire after `FRAGMENT_CACHE_TTL` seconds. The fragments live in the
+    `fragments` cache alias.
+
+    Lookups are batched: the versions and fragments of all requested rows are read with two
+    `get_many` calls, and the misses are serialized together and stored with one
+    `set_many`. Fragments already loaded for a serializer context are memoized in it, so
+    rows repeated within a response are looked up once. Hits and misses are counted per
+    model in the `travel_crm_fragment_cache_total` metric.
+    """
+    context_key = 'fragments'
+
+    @property
+    def cache(self):
+        return caches['fragments']
+
+    @staticmethod
+    def label(model):
+        return model._meta.label_lower
+
+    def version_key(self, model, pk):
+        return f'fragments:version:{self.label(model)}:{pk}'
+
+    def fragment_key(self, serializer_class, pk, version):
+        return f'fragments:{self.label(serializer_class.Meta.model)}:{serializer_class.__name__}:{pk}:{version}'
+
+    def invalidate(self, model, pk):
+        """
+        Move a row to a new version, so its cached fragments are no longer used.
+
+        Args:
+            model (Model): The model of the row.
+            pk: The primary key of the saved or deleted row.
+        """
+        key = self.version_key(model, pk)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Unknown or evicted version: start from a value no fragment was stored under.
+            self.cache.set(key, time.time_ns(), settings.FRAGMENT_CACHE_TTL)
+
+    def get_versions(self, model, pks):
+        keys = {self.version_key(model, pk): pk for pk in pks}
+        versions = {keys[key]: version for key, version in self.cache.get_many(keys).items()}
+        missing = {key: pk for key, pk in keys.items() if pk not in versions}
+        if missing:
+            version = time.time_ns()
+            self.cache.set_many({key: version for key in missing}, settings.FRAGMENT_CACHE_TTL)
+            versions.update({pk: version for pk in missing.values()})
+        return versions
+
+    def memo(self, context):
+        if context is None:
+            return {}
+        return context.setdefault(self.context_key, {})
+
+    def prime(self, serializer_class, instances, context=None):
+        """
+        Load the fragments of the given rows into the context memo.
+
+        Args:
+            serializer_class (Serializer): The model serializer producing the fragments.
+            instances (iterable): The rows; None values and duplicates are skipped.
+            context (dict, optional): The calling serializer's context.
+
+        Returns:
+            dict: The memo, mapping `(serializer class, pk)` to the fragment.
+        """
+        memo = self.memo(context)
+        model = serializer_class.Meta.model
+        pending = {}
+        for instance in instances:
+            if instance is not None and (serializer_class, instance.pk) not in memo:
+                pending[instance.pk] = instance
+        if not pending:
+            return memo
+
+        versions = self.get_versions(model, pending)
+        keys = {self.fragment_key(serializer_class, pk, versions[pk]): pk for pk in pending}
+        for key, fragment in self.cache.get_many(keys).items():
+            memo[(serializer_class, keys[key])] = fragment
+        missing = [instance for pk, instance in pending.items() if (serializer_class, pk) not in memo]
+        FRAGMENT_CACHE.labels(self.label(model), 'hit').inc(len(pending) - len(missing))
+
+        if missing:
+            FRAGMENT_CACHE.labels(self.label(model), 'miss').inc(len(missing))
+            fragments = {}
+            for instance, representation in zip(missing, serializer_class(missing, many=True).data):
+                fragment = memo[(serializer_class, instance.pk)] = dict(representation)
+                fragments[self.fragment_key(serializer_class, instance.pk, versions[instance.pk])] = fragment
+            self.cache.set_many(fragments, settings.FRAGMENT_CACHE_TTL)
+        return memo
+
+    def representations(self, serializer_class, instances, context=None):
+        """
+        Return the serialized representation of rows, from the cache where possible.
+
+        Args:
+            serializer_class (Serializer): The model serializer producing the fragments.
+            instances (iterable): The rows to represent.
+            context (dict, optional): The calling serializer's context.
+
+        Returns:
+            list: A copy of each row's fragment, in order.
+        """
+        instances = list(instances)
+        memo = self.prime(serializer_class, instances, context)
+        return [dict(memo[(serializer_class, instance.pk)]) for instance in instances]
+
+    def representation(self, serializer_class, instance, context=None):
+        """
+        Return the serialized representation of one row, or None when there is no row.
+        """
+        if instance is None:
+            return None
+        return self.representations(serializer_class, [instance], context)[0]
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,260 @@
+import json
+import secrets
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from accounts.models import CustomUser
+from accounts.serializers import CustomTokenObtainPairSerializer
+from core.middleware import QueryTimer
+from services.models import Service
+
+ACTIONS = ['create', 'retrieve', 'update', 'partial_update', 'list', 'export', 'destroy']
+
+
+def _service_payload(run, i, ids):
+    return {'name': f'Benchmark service {run}-{i}', 'description': 'Created by benchmark_api.', 'price': '100'}
+
+
+def _customer_payload(run, i, ids):
+    return {
+        'name': f'Benchmark customer {i}', 'email': f'bench-{run}-{i}@example.com',
+        'phone_no': '+10000000000', 'address': 'Created by benchmark_api.',
+    }
+
+
+def _inquiry_payload(run, i, ids):
+    return {
+        'details': f'Benchmark inquiry {run}-{i}', 'status': 'Open',
+        'customer': ids['customers'][i % len(ids['customers'])], 'services': ids['services'][:3],
+    }
+
+
+def _proposal_payload(run, i, ids):
+    return {
+        'inquiry': ids['inquiries'][i % len(ids['inquiries'])], 'details': f'Benchmark proposal {run}-{i}',
+        'status': 'Pending', 'cost': '100.00', 'services': ids['services'][:3],
+    }
+
+
+# Resources in creation order; rows created by the run are destroyed in reverse order.
+RESOURCES = [
+    {'name': 'services', 'url': '/api/services/', 'payload': _service_payload, 'partial': 'description'},
+    {'name': 'customers', 'url': '/api/customers/', 'payload': _customer_payload, 'partial': 'address'},
+    {'name': 'inquiries', 'url': '/api/inquiries/', 'payload': _inquiry_payload, 'partial': 'details', 'requires': 'customers'},
+    {'name': 'proposals', 'url': '/api/proposals/', 'payload': _proposal_payload, 'partial': 'details', 'requires': 'inquiries'},
+]
+EXPORTABLE = {'customers', 'inquiries', 'proposals'}
+
+
+def summarize(samples, elapsed):
+    """
+    Reduce the samples of one action to latency percentiles and query counts.
+
+    Query counts only cover successful requests, since error pages can run unrelated queries.
+
+    Args:
+        samples (list): `(status_code, seconds, queries)` tuples.
+        elapsed (float): Wall clock seconds spent on the action.
+
+    Returns:
+        dict: The summary included in the report.
+    """
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    queries = [count for status, _, count in samples if status < 400] or [count for _, _, count in samples]
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for status, _, _ in samples if status >= 400),
+        'p50_ms': round(p50, 2),
+        'p95_ms': round(p95, 2),
+        'p99_ms': round(p99, 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'max_ms': round(latencies[-1], 2),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+        'requests_per_second': round(len(samples) / elapsed, 1) if elapsed else None,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Drive every viewset action through the Django test client and report latency and queries.
+
+    For services, customers, inquiries and proposals the command creates `--requests` rows
+    through the API, then retrieves, updates, partially updates, lists and exports, and
+    finally deletes the rows it created. Requests of one action run on `--concurrency`
+    threads, each with its own client and database connection, authenticated with a JWT of
+    `--username` (an admin by default, so every action is permitted).
+
+    The report lists p50/p95/p99 latency and the SQL query count of every `resource.action`.
+    It can be written as JSON with `--output` and compared with an earlier report with
+    `--compare`. Run it against a seeded database (see `seed_data`) for meaningful numbers;
+    exports read the whole table on every request.
+    """
+    help = 'Benchmark every API action and report latency percentiles and query counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Requests per action (default: 50).')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients (default: 4).')
+        parser.add_argument('--username', help='User to authenticate as (default: the first active admin).')
+        parser.add_argument(
+            '--actions', default=','.join(ACTIONS),
+            help=f"Comma separated actions to run (default: {','.join(ACTIONS)}).",
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--compare', help='Earlier JSON report to compare the results with.')
+
+    def handle(self, *args, **options):
+        actions = [action.strip() for action in options['actions'].split(',') if action.strip()]
+        unknown = set(actions) - set(ACTIONS)
+        if unknown:
+            raise CommandError(f"Unknown actions: {', '.join(sorted(unknown))}.")
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive.')
+
+        users = CustomUser.objects.filter(is_active=True)
+        if options['username']:
+            user = users.filter(username=options['username']).first()
+        else:
+            user = users.filter(role='admin').order_by('pk').first()
+        if user is None:
+            raise CommandError('No active user to authenticate as; create an admin or pass --username.')
+
+        self.authorization = f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'
+        self.concurrency = options['concurrency']
+        self.local = threading.local()
+        run = secrets.token_hex(4)
+        count = options['requests']
+
+        ids = {'services': list(Service.objects.order_by('pk').values_list('pk', flat=True)[:3])}
+        results = {}
+        created_ids = {}
+        for resource in RESOURCES:
+            name, url = resource['name'], resource['url']
+            created = []
+            if 'create' in actions and not ids.get(resource.get('requires'), True):
+                self.stdout.write(self.style.WARNING(f"{name}: no {resource['requires']} to link, skipping create."))
+            elif 'create' in actions:
+                samples, elapsed, responses = self.run_requests([
+                    ('post', url, resource['payload'](run, i, ids)) for i in range(count)
+                ])
+                results[f'{name}.create'] = summarize(samples, elapsed)
+                created = [response.data['data']['id'] for response in responses if response.status_code == 201]
+            ids[name] = (created + ids.get(name, []))[:3] if name == 'services' else created
+            created_ids[name] = created
+
+            if created:
+                detail = [f'{url}{created[i % len(created)]}/' for i in range(count)]
+                if 'retrieve' in actions:
+                    results[f'{name}.retrieve'] = summarize(*self.run_requests([('get', u, None) for u in detail])[:2])
+                if 'update' in actions:
+                    results[f'{name}.update'] = summarize(*self.run_requests([
+                        ('put', u, resource['payload'](run, count + i, ids)) for i, u in enumerate(detail)
+                    ])[:2])
+                if 'partial_update' in actions:
+                    results[f'{name}.partial_update'] = summarize(*self.run_requests([
+                        ('patch', u, {resource['partial']: 'Updated by benchmark_api.'}) for u in detail
+                    ])[:2])
+            elif set(actions) & {'retrieve', 'update', 'partial_update'}:
+                self.stdout.write(self.style.WARNING(f'{name}: no rows created, skipping the detail actions.'))
+
+            if 'list' in actions:
+                results[f'{name}.list'] = summarize(*self.run_requests([('get', url, None)] * count)[:2])
+            if 'export' in actions and name in EXPORTABLE:
+                results[f'{name}.export'] = summarize(*self.run_requests([('get', f'{url}export/', None)] * count)[:2])
+
+        if 'destroy' in actions:
+            for resource in reversed(RESOURCES):
+                if created_ids[resource['name']]:
+                    results[f"{resource['name']}.destroy"] = summarize(*self.run_requests([
+                        ('delete', f"{resource['url']}{pk}/", None) for pk in created_ids[resource['name']]
+                    ])[:2])
+
+        report = {
+            'meta': {
+                'generated_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'username': user.username,
+                'role': user.role,
+                'requests': count,
+                'concurrency': self.concurrency,
+            },
+            'results': results,
+        }
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+        self.print_report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def get_client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=self.authorization)
+        return client
+
+    def send(self, request):
+        method, url, data = request
+        client = self.get_client()
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            if data is None:
+                response = getattr(client, method)(url)
+            else:
+                response = getattr(client, method)(url, json.dumps(data), content_type='application/json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, (response.status_code, time.perf_counter() - start, timer.queries)
+
+    def send_in_thread(self, request):
+        try:
+            return self.send(request)
+        finally:
+            # Connections opened by pool threads are not closed by request_finished.
+            connections.close_all()
+
+    def run_requests(self, requests):
+        """
+        Send the requests on `--concurrency` threads.
+
+        Returns:
+            tuple: The samples, the wall clock seconds and the responses.
+        """
+        start = time.perf_counter()
+        if self.concurrency == 1:
+            outcomes = [self.send(request) for request in requests]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                outcomes = list(executor.map(self.send_in_thread, requests))
+        elapsed = time.perf_counter() - start
+        return [sample for _, sample in outcomes], elapsed, [response for response, _ in outcomes]
+
+    def print_report(self, results, baseline=None):
+        header = f"{'action':<28}{'reqs':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+        if baseline is not None:
+            header += f"{'p95 delta':>12}{'queries delta':>15}"
+        self.stdout.write(header)
+        for key, row in results.items():
+            line = (
+                f"{key:<28}{row['requests']:>6}{row['errors']:>8}{row['p50_ms']:>10.2f}"
+                f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['queries_max']:>9}"
+            )
+            previous = (baseline or {}).get(key)
+            if previous:
+                p95_delta = (row['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+                line += f"{p95_delta:>+11.1f}%{row['queries_max'] - previous['queries_max']:>+15}"
+            self.stdout.write(self.style.ERROR(line) if row['errors'] else line)
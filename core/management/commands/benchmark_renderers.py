@@ -0,0 +1,81 @@
+import json
+import time
+from contextlib import nullcontext
+from decimal import Decimal
+from unittest import mock
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core import renderers
+from core.envelope import custom_response
+from core.renderers import FastJSONRenderer, RenderedJSON
+
+
+def build_payload(rows):
+    """
+    Build an envelope shaped like a page of `InquirySerializer` output.
+    """
+    now = timezone.now()
+    services = [
+        {'id': i, 'name': f'Service {i}', 'description': 'Guided tour with transfers ' * 4, 'price': Decimal('149.99')}
+        for i in range(5)
+    ]
+    data = [
+        {
+            'id': i,
+            'details': f'Family trip for inquiry {i}, flexible dates, prefers beach resorts.',
+            'status': 'Open',
+            'created_at': now,
+            'customer': {
+                'id': i, 'name': f'Customer {i}', 'email': f'customer{i}@example.com',
+                'phone_no': '+10000000000', 'address': '221B Baker Street, London', 'assigned_sales_agent': 1,
+            },
+            'assigned_sales_agent': {'username': 'agent', 'email': 'agent@example.com', 'role': 'sales_agent'},
+            'services': services,
+        }
+        for i in range(rows)
+    ]
+    return custom_response(status_code=200, message='Inquiries retrieved successfully.', data=data)
+
+
+class Command(BaseCommand):
+    """
+    Compare the JSON rendering paths on a synthetic list response.
+
+    Renders the same envelope with DRF's `JSONRenderer` (the current path), `FastJSONRenderer`
+    with orjson, `FastJSONRenderer` with its standard library fallback, and `FastJSONRenderer`
+    writing a pre-rendered `data` payload, and reports the time per response.
+    """
+    help = 'Benchmark the JSON renderers against the default DRF renderer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows in the rendered list (default: 1000).')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per renderer (default: 20).')
+
+    def handle(self, *args, **options):
+        payload = build_payload(options['rows'])
+        pre_rendered = dict(payload, data=RenderedJSON(renderers.dumps(payload['data'])))
+        expected = json.loads(JSONRenderer().render(payload))
+
+        cases = [('DRF JSONRenderer', JSONRenderer().render, payload, False)]
+        if renderers.orjson is not None:
+            cases.append(('FastJSONRenderer (orjson)', FastJSONRenderer().render, payload, False))
+        cases.append(('FastJSONRenderer (stdlib)', FastJSONRenderer().render, payload, True))
+        cases.append(('FastJSONRenderer (pre-rendered data)', FastJSONRenderer().render, pre_rendered, False))
+
+        baseline = None
+        self.stdout.write(f"{'renderer':<40}{'ms/response':>12}{'MB/s':>10}{'speedup':>10}")
+        for label, render, data, force_stdlib in cases:
+            with mock.patch.object(renderers, 'orjson', None) if force_stdlib else nullcontext():
+                output = render(data)
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    render(data)
+                elapsed = (time.perf_counter() - start) / options['repeat']
+
+            if json.loads(output) != expected:
+                self.stdout.write(self.style.WARNING(f'{label}: output differs from JSONRenderer'))
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f'{label:<40}{elapsed * 1000:>12.2f}{len(output) / elapsed / 1e6:>10.1f}{baseline / elapsed:>9.1f}x'
+            )
@@ -0,0 +1,105 @@
+import re
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import CustomUser
+from customer.views import CustomerViewSet
+from inquiries.views import InquiryViewSet
+from proposal.views import ProposalViewSet
+from services.views import ServiceViewSet
+
+VIEWSETS = [CustomerViewSet, InquiryViewSet, ProposalViewSet, ServiceViewSet]
+ROLES = ['admin', 'sales_agent']
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    """
+    Run EXPLAIN on the list query of every viewset and flag sequential scans on large tables.
+
+    For each viewset and role the command builds the queryset returned by `get_queryset()`
+    for the list action, applies the keyset page ordering and limit, and inspects the plan.
+    Full table scans on tables with at least `--min-rows` rows are reported as warnings.
+
+    On SQLite an unfiltered list is planned as a rowid-ordered `SCAN` that stops at the page
+    limit; it is still reported, so the command is most meaningful against PostgreSQL.
+    """
+    help = "Run EXPLAIN on each viewset's get_queryset() and flag sequential scans on large tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=10000,
+            help='Only flag sequential scans on tables with at least this many rows (default: 10000).',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full plan of every query.',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Exit with an error if any sequential scan was flagged.',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        pattern = SEQ_SCAN_PATTERNS.get(vendor)
+        if pattern is None:
+            raise CommandError(f'EXPLAIN analysis is not supported for the {vendor} backend.')
+
+        table_rows = self.get_table_rows(vendor)
+        flagged = 0
+        for viewset in VIEWSETS:
+            for role in ROLES:
+                queryset = self.get_list_queryset(viewset, role)
+                plan = queryset.explain()
+                label = f'{viewset.__name__} ({role})'
+                if options['verbose_plans']:
+                    self.stdout.write(f'{label}\n{plan}\n')
+
+                scans = sorted({
+                    table for table in pattern.findall(plan)
+                    if table_rows.get(table, 0) >= options['min_rows']
+                })
+                if scans:
+                    flagged += 1
+                    details = ', '.join(f'{table} (~{table_rows[table]} rows)' for table in scans)
+                    self.stdout.write(self.style.WARNING(f'{label}: sequential scan on {details}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{label}: OK'))
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f'{flagged} list queries use sequential scans on large tables.')
+
+    def get_list_queryset(self, viewset, role):
+        """
+        Build the queryset a list request would run for a user with the given role.
+
+        The user is the first existing user with that role, or an unsaved stand-in so the
+        plan can be inspected on an empty database.
+        """
+        user = CustomUser.objects.filter(role=role).order_by('pk').first() or CustomUser(pk=0, role=role)
+        request = Request(APIRequestFactory().get('/'))
+        request.user = user
+        view = viewset(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+        return view.get_queryset().order_by('id')[:page_size + 1]
+
+    def get_table_rows(self, vendor):
+        """
+        Return the (estimated) number of rows per table.
+        """
+        with connection.cursor() as cursor:
+            if vendor == 'postgresql':
+                cursor.execute("SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r'")
+                return dict(cursor.fetchall())
+            rows = {}
+            for table in connection.introspection.table_names(cursor):
+                cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                rows[table] = cursor.fetchone()[0]
+            return rows
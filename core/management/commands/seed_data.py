@@ -0,0 +1,176 @@
+import random
+import secrets
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.models import CustomUser
+from customer.models import Customer
+from analytics.buckets import bump_buckets, month_of
+from dashboard.rollup import count_rows
+from inquiries.models import Inquiries
+from proposal.costing import line_total, quantize
+from proposal.models import Proposals
+from services.cache import bump_catalog_version
+from services.models import Service
+from sync.changes import log_changes
+
+DESTINATIONS = ['Bali', 'Lisbon', 'Kyoto', 'Cape Town', 'Reykjavik', 'Cusco', 'Marrakesh', 'Queenstown']
+TRIPS = ['honeymoon', 'family holiday', 'business trip', 'school tour', 'anniversary', 'trekking trip']
+SERVICES = ['Flights', 'Hotel', 'Airport transfer', 'Guided tour', 'Travel insurance', 'Car rental', 'Visa support']
+
+
+class Command(BaseCommand):
+    """
+    Seed the database with a synthetic, production-sized CRM graph.
+
+    Sales agents, services, customers, inquiries and proposals are inserted with
+    `bulk_create`, customers `--chunk-size` at a time together with their inquiries,
+    proposals and service links, so memory use does not grow with the number of rows.
+    Each inquiry and proposal links between 1 and `2 * --fan-out - 1` services.
+
+    Every run adds new rows; emails and usernames carry a per-run prefix so runs can be
+    repeated against the same database. The primary keys of inserted rows must be returned
+    by the database, which PostgreSQL and SQLite 3.35+ do. The rows are added to the sync
+    change log and the dashboard rollup, and invalidate the cached analytics of their month,
+    like rows created through the API. Proposal costs are derived from the prices of their
+    services, like `proposal.costing` does.
+    """
+    help = 'Seed customers, inquiries, proposals and services in bulk for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=100000, help='Customers to create (default: 100000).')
+        parser.add_argument('--agents', type=int, default=20, help='Sales agents owning the customers (default: 20).')
+        parser.add_argument('--services', type=int, default=200, help='Services in the catalog (default: 200).')
+        parser.add_argument(
+            '--inquiries-per-customer', type=int, default=2,
+            help='Average inquiries per customer (default: 2).',
+        )
+        parser.add_argument(
+            '--proposal-ratio', type=float, default=0.6,
+            help='Share of inquiries that get a proposal (default: 0.6).',
+        )
+        parser.add_argument('--fan-out', type=int, default=3, help='Average services per inquiry and proposal (default: 3).')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Customers inserted per batch (default: 2000).')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a reproducible dataset.')
+
+    def handle(self, *args, **options):
+        if options['customers'] < 0 or options['agents'] < 1 or options['services'] < 1 or options['fan_out'] < 1:
+            raise CommandError('--agents, --services and --fan-out must be positive and --customers not negative.')
+
+        self.random = random.Random(options['seed'])
+        self.run = secrets.token_hex(4)
+        self.fan_out = options['fan_out']
+
+        agents = self.create_agents(options['agents'])
+        self.prices = self.create_services(options['services'])
+        self.service_ids = list(self.prices)
+
+        created = {'customers': 0, 'inquiries': 0, 'proposals': 0, 'links': 0}
+        remaining = options['customers']
+        while remaining > 0:
+            size = min(remaining, options['chunk_size'])
+            with transaction.atomic():
+                counts = self.create_chunk(
+                    size, agents, options['inquiries_per_customer'], options['proposal_ratio'],
+                    offset=created['customers'],
+                )
+            for key, value in counts.items():
+                created[key] += value
+            remaining -= size
+            self.stdout.write(f"{created['customers']}/{options['customers']} customers seeded")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(agents)} sales agents, {len(self.prices)} services, {created['customers']} customers, "
+            f"{created['inquiries']} inquiries, {created['proposals']} proposals and {created['links']} service links."
+        ))
+
+    def create_agents(self, count):
+        password = make_password('password')
+        agents = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f'seed-{self.run}-agent{i}', email=f'seed-{self.run}-agent{i}@example.com',
+                role='sales_agent', password=password,
+            )
+            for i in range(count)
+        ])
+        return [agent.pk for agent in agents]
+
+    def create_services(self, count):
+        services = Service.objects.bulk_create([
+            Service(
+                name=f'{self.random.choice(SERVICES)} {i}',
+                description=f'{self.random.choice(SERVICES)} in {self.random.choice(DESTINATIONS)}.',
+                price=str(self.random.randint(50, 5000)),
+            )
+            for i in range(count)
+        ])
+        # bulk_create does not send post_save, so the cached catalog is invalidated here.
+        bump_catalog_version()
+        log_changes('services', 'create', [(service.pk, None) for service in services])
+        return {service.pk: service.price for service in services}
+
+    def pick_services(self):
+        count = min(self.random.randint(1, 2 * self.fan_out - 1), len(self.service_ids))
+        return self.random.sample(self.service_ids, count)
+
+    def create_chunk(self, size, agents, inquiries_per_customer, proposal_ratio, offset):
+        customers = Customer.objects.bulk_create([
+            Customer(
+                name=f'Customer {offset + i}',
+                email=f'seed-{self.run}-{offset + i}@example.com',
+                phone_no=f'+1{self.random.randint(10**9, 10**10 - 1)}',
+                address=f'{self.random.randint(1, 999)} Main Street, {self.random.choice(DESTINATIONS)}',
+                assigned_sales_agent_id=self.random.choice(agents),
+            )
+            for i in range(size)
+        ])
+
+        inquiries = Inquiries.objects.bulk_create([
+            Inquiries(
+                details=f'{self.random.choice(TRIPS).capitalize()} to {self.random.choice(DESTINATIONS)} '
+                        f'for {self.random.randint(1, 8)} travellers.',
+                status=self.random.choice(Inquiries.STATUS_CHOICES)[0],
+                customer_id=customer.pk,
+                assigned_sales_agent_id=customer.assigned_sales_agent_id,
+            )
+            for customer in customers
+            for _ in range(self.random.randint(0, 2 * inquiries_per_customer))
+        ])
+        inquiry_links = [
+            Inquiries.services.through(inquiries_id=inquiry.pk, service_id=service_id)
+            for inquiry in inquiries
+            for service_id in self.pick_services()
+        ]
+        Inquiries.services.through.objects.bulk_create(inquiry_links)
+
+        proposed = [(inquiry, self.pick_services()) for inquiry in inquiries if self.random.random() < proposal_ratio]
+        proposals = Proposals.objects.bulk_create([
+            Proposals(
+                inquiry_id=inquiry.pk,
+                details=f'Proposal for {inquiry.details.lower()}',
+                status=self.random.choice(Proposals.STATUS_CHOICES)[0],
+                cost=quantize(sum(line_total(self.prices[service_id]) for service_id in service_ids)),
+            )
+            for inquiry, service_ids in proposed
+        ])
+        proposal_links = [
+            Proposals.services.through(proposals_id=proposal.pk, service_id=service_id)
+            for proposal, (_, service_ids) in zip(proposals, proposed)
+            for service_id in service_ids
+        ]
+        Proposals.services.through.objects.bulk_create(proposal_links)
+
+        agents = {inquiry.pk: inquiry.assigned_sales_agent_id for inquiry in inquiries}
+        log_changes('customers', 'create', [(customer.pk, customer.assigned_sales_agent_id) for customer in customers])
+        log_changes('inquiries', 'create', [(inquiry.pk, inquiry.assigned_sales_agent_id) for inquiry in inquiries])
+        log_changes('proposals', 'create', [(proposal.pk, agents[proposal.inquiry_id]) for proposal in proposals])
+        count_rows('inquiries', [(inquiry.assigned_sales_agent_id, inquiry.status, 0) for inquiry in inquiries])
+        count_rows('proposals', [(agents[p.inquiry_id], p.status, p.cost) for p in proposals])
+        bump_buckets(month_of(row.created_at) for row in inquiries + proposals)
+
+        return {
+            'customers': len(customers),
+            'inquiries': len(inquiries),
+            'proposals': len(proposals),
+            'links': len(inquiry_links) + len(proposal_links),
+        }
@@ -0,0 +1,66 @@
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py), every worker writes its samples
+# to memory-mapped files in that directory and `render_metrics` aggregates all of them.
+
+REQUESTS = Counter(
+    'travel_crm_requests',
+    'HTTP requests by resolved URL name, method and status code.',
+    ['view', 'method', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'travel_crm_request_duration_seconds',
+    'Time spent producing the response, including a streamed body.',
+    ['view', 'method'],
+)
+REQUEST_QUERIES = Histogram(
+    'travel_crm_request_queries',
+    'SQL queries executed per request.',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, float('inf')),
+)
+REQUEST_DB_DURATION = Histogram(
+    'travel_crm_request_db_duration_seconds',
+    'Time spent executing SQL queries per request.',
+    ['view', 'method'],
+)
+
+FRAGMENT_CACHE = Counter(
+    'travel_crm_fragment_cache',
+    'Serialized fragment cache lookups by model and result (hit or miss).',
+    ['model', 'result'],
+)
+
+
+def observe_request(view, method, status, duration, queries, db_duration):
+    """
+    Record one request in the request metrics.
+
+    Args:
+        view (str): The resolved URL name of the request.
+        method (str): The HTTP method.
+        status (int): The response status code.
+        duration (float): Seconds spent on the request.
+        queries (int): Number of SQL queries executed.
+        db_duration (float): Seconds spent executing those queries.
+    """
+    REQUESTS.labels(view, method, status).inc()
+    REQUEST_DURATION.labels(view, method).observe(duration)
+    REQUEST_QUERIES.labels(view, method).observe(queries)
+    REQUEST_DB_DURATION.labels(view, method).observe(db_duration)
+
+
+def render_metrics():
+    """
+    Render the metrics of this process, or of all worker processes, in the Prometheus text format.
+
+    Returns:
+        bytes: The exposition text.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,70 @@
+import time
+from contextlib import ExitStack
+from django.db import connections
+from .metrics import observe_request
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting queries and the time spent running them.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL query count and SQL time of every request.
+
+    Requests are labelled with the resolved URL name (for example `inquiries-list`) and the
+    HTTP method, so the label set stays bounded; unresolved paths share the `<unresolved>`
+    label. For streamed responses the measurement continues until the body is consumed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with self._timing_queries(timer):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self._stream(request, response, response.streaming_content, timer, start)
+        else:
+            self._observe(request, response, timer, start)
+        return response
+
+    @staticmethod
+    def _timing_queries(timer):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+        return stack
+
+    def _stream(self, request, response, content, timer, start):
+        try:
+            with self._timing_queries(timer):
+                yield from content
+        finally:
+            self._observe(request, response, timer, start)
+
+    @staticmethod
+    def _observe(request, response, timer, start):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        observe_request(
+            view, request.method, response.status_code,
+            time.perf_counter() - start, timer.queries, timer.duration,
+        )
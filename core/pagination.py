@@ -0,0 +1,68 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor keyset pagination shared by the list endpoints.
+
+    Pages are fetched with `WHERE <sort key> > <position> ORDER BY <sort key> LIMIT n`, so the
+    cost of a page does not depend on how deep into the result set it is, and no COUNT(*)
+    query is ever issued.
+
+    Query parameters:
+        - `cursor`: The opaque cursor taken from the `next` or `previous` link.
+        - `page_size`: Number of results per page, capped at `max_page_size`.
+        - `ordering`: A sort key from the view's `ordering_fields`, optionally prefixed with `-`.
+
+    Attributes:
+        ordering (str): The default sort key, the primary key.
+        page_size_query_param (str): Query parameter used to override the page size.
+        max_page_size (int): The largest page a client can request.
+        ordering_query_param (str): Query parameter used to select the sort key.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering_query_param = 'ordering'
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering for the page, honouring `?ordering=` for indexed sort keys.
+
+        Views declare the keys that are safe to paginate on (i.e. backed by an index) in
+        `ordering_fields`. Any other value falls back to the primary key. Non-primary-key
+        sort keys get the primary key appended as a tie-breaker so the order is stable.
+        Full-text search results (annotated with `search_rank`) are ordered best match first.
+
+        Returns:
+            tuple: The ordering applied to the queryset.
+        """
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id')
+        requested = request.query_params.get(self.ordering_query_param)
+        ordering_fields = getattr(view, 'ordering_fields', ('id',))
+        if not requested or requested.lstrip('-') not in ordering_fields:
+            return (self.ordering,)
+        if requested.lstrip('-') == 'id':
+            return (requested,)
+        tie_breaker = '-id' if requested.startswith('-') else 'id'
+        return (requested, tie_breaker)
+
+    def get_paginated_data(self, data):
+        """
+        Wrap a page of serialized results with its navigation links.
+
+        The result is meant to be used as the `data` of `custom_response`, so the
+        standard envelope is kept for paginated lists.
+
+        Args:
+            data (list): The serialized results of the current page.
+
+        Returns:
+            dict: The `next` and `previous` links and the page `results`.
+        """
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
@@ -0,0 +1,79 @@
+import json
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library is used instead
+    orjson = None
+
+
+class RenderedJSON(bytes):
+    """
+    A value that has already been rendered to JSON bytes.
+
+    When used as the `data` of a `custom_response` envelope, `FastJSONRenderer` writes the
+    bytes into the response as they are instead of encoding the data again.
+    """
+
+
+class _Encoder(JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, RenderedJSON):
+            return json.loads(obj)
+        return super().default(obj)
+
+
+_encoder = _Encoder()
+
+
+def dumps(data, indent=False):
+    """
+    Encode `data` to JSON bytes with orjson, or with the standard library when it is missing.
+
+    Decimals, datetimes, UUIDs, lazy strings and the other types handled by DRF's
+    `JSONEncoder` are encoded by that encoder, so they are formatted exactly as
+    `JSONRenderer` would format them.
+
+    Args:
+        data: The data to encode.
+        indent (bool): Whether to pretty print the output.
+
+    Returns:
+        bytes: The encoded JSON.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=_encoder.default, option=option)
+    else:
+        ret = json.dumps(
+            data, cls=_Encoder, ensure_ascii=False,
+            indent=2 if indent else None, separators=None if indent else (',', ':'),
+        ).encode()
+    # Escape U+2028/U+2029 like DRF's JSONRenderer, so the output is a strict JavaScript subset.
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Opt-in JSON renderer backed by orjson, with a standard library fallback.
+
+    It renders the same JSON as `JSONRenderer` for the API's payloads but is several times
+    faster on large lists. When the envelope's `data` is a `RenderedJSON` value, the envelope
+    fields are encoded on their own and the pre-rendered bytes are appended, so the data is
+    never decoded or walked again.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        if isinstance(data, dict) and isinstance(data.get('data'), RenderedJSON) and not indent:
+            envelope = dumps({key: value for key, value in data.items() if key != 'data'})
+            return b''.join((envelope[:-1], b',"data":', data['data'], b'}'))
+        return dumps(data, indent=indent)
@@ -0,0 +1,186 @@
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.connection import ConnectionDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def current_read_alias():
+    """
+    Return the database alias reads are currently routed to, or None for the primary.
+    """
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from(alias):
+    """
+    Route the reads made inside the block to the given database alias.
+
+    Args:
+        alias (str): The replica alias, or None to read from the primary.
+    """
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to the replica chosen for the current request.
+
+    Reads go to the alias set with `read_from` (normally by `ReplicaReadMixin`); outside of
+    it Django's default routing applies. Writes always go to the primary, including saves of
+    instances that were loaded from a replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary through replication.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaSet:
+    """
+    Round-robin rotation over the replicas listed in `DATABASE_REPLICAS`.
+
+    Each replica is probed with `SELECT 1` at most once every `REPLICA_HEALTH_CHECK_INTERVAL`
+    seconds per process. Replicas that fail the probe, or fail a query, are left out of the
+    rotation until a later probe succeeds.
+    """
+
+    def __init__(self):
+        self._status = {}
+        self._counter = itertools.count()
+
+    def check(self, alias):
+        """
+        Probe a replica.
+
+        Args:
+            alias (str): The replica alias.
+
+        Returns:
+            bool: Whether the replica answered the probe.
+        """
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except (DatabaseError, ConnectionDoesNotExist):
+            logger.warning('Database replica %r failed its health check.', alias, exc_info=True)
+            return False
+        return True
+
+    def is_healthy(self, alias):
+        healthy, checked_at = self._status.get(alias, (False, None))
+        now = time.monotonic()
+        if checked_at is None or now - checked_at >= settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            healthy = self.check(alias)
+            self._status[alias] = (healthy, now)
+        return healthy
+
+    def mark_unhealthy(self, alias):
+        self._status[alias] = (False, time.monotonic())
+
+    def choose(self):
+        """
+        Pick the next healthy replica.
+
+        Returns:
+            str: The replica alias, or None when no replica is configured or healthy.
+        """
+        aliases = [alias for alias in settings.DATABASE_REPLICAS if self.is_healthy(alias)]
+        if not aliases:
+            return None
+        return aliases[next(self._counter) % len(aliases)]
+
+
+replica_set = ReplicaSet()
+
+
+def primary_pin_cache_key(user_id):
+    return f'core:primary-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """
+    Send the user's reads to the primary for `REPLICA_PIN_SECONDS` seconds.
+
+    Called after a write so the user reads their own changes while the replicas catch up.
+    """
+    cache.set(primary_pin_cache_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    return bool(cache.get(primary_pin_cache_key(user.pk)))
+
+
+class ReplicaReadMixin:
+    """
+    Viewset mixin routing safe-method requests to a read replica.
+
+    GET, HEAD and OPTIONS requests read from the next healthy replica unless the user wrote
+    through one of these viewsets during the last `REPLICA_PIN_SECONDS` seconds. Streamed
+    responses keep reading from the same replica while their body is produced. Without
+    configured replicas every request reads from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+            return
+        if request.user.is_authenticated and is_pinned_to_primary(request.user):
+            return
+        self.read_alias = replica_set.choose()
+        if self.read_alias:
+            self._read_alias_token = _read_alias.set(self.read_alias)
+
+    def handle_exception(self, exc):
+        read_alias = getattr(self, 'read_alias', None)
+        if read_alias and isinstance(exc, DatabaseError):
+            replica_set.mark_unhealthy(read_alias)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+            if response.streaming:
+                response.streaming_content = self._stream_from(self.read_alias, response.streaming_content)
+        elif (
+            settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS
+            and response.status_code < 400 and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+        return response
+
+    @staticmethod
+    def _stream_from(alias, content):
+        with read_from(alias):
+            yield from content
@@ -0,0 +1,131 @@
+import re
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'english'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+
+
+def _fts_table(table):
+    return f'{table}_fts'
+
+
+def install_search_index(schema_editor, table, column):
+    """
+    Create the full-text index for a text column. Used from migrations.
+
+    - PostgreSQL: a stored generated `tsvector` column kept in sync by the database,
+      with a GIN index on it.
+    - SQLite: an external-content FTS5 table kept in sync by triggers, so tests and local
+      development can run the same search queries.
+
+    The SQLite part is idempotent. Migrations that make SQLite rebuild the table (which
+    drops its triggers) must call it again afterwards.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The migration schema editor.
+        table (str): The table to index.
+        column (str): The text column to index.
+    """
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce({quote(column)}, ''))) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote(table + '_search_gin')} "
+            f"ON {quote(table)} USING GIN ({SEARCH_VECTOR_COLUMN})"
+        )
+    elif vendor == 'sqlite':
+        fts = _fts_table(table)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {quote(fts)} USING fts5("
+            f"{quote(column)}, content={quote(table)}, content_rowid='id', tokenize='porter unicode61')"
+        )
+        for name in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{fts}_{name}')}")
+        insert = f"INSERT INTO {quote(fts)}(rowid, {quote(column)}) VALUES (new.id, new.{quote(column)});"
+        delete = (
+            f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, {quote(column)}) "
+            f"VALUES ('delete', old.id, old.{quote(column)});"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {quote(f'{fts}_ai')} AFTER INSERT ON {quote(table)} BEGIN {insert} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {quote(f'{fts}_ad')} AFTER DELETE ON {quote(table)} BEGIN {delete} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {quote(f'{fts}_au')} AFTER UPDATE OF {quote(column)} ON {quote(table)} "
+            f"BEGIN {delete} {insert} END"
+        )
+        schema_editor.execute(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')")
+
+
+def uninstall_search_index(schema_editor, table, column):
+    """
+    Drop the full-text index created by `install_search_index`.
+    """
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    if vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote(table + '_search_gin')}")
+        schema_editor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN IF EXISTS {SEARCH_VECTOR_COLUMN}")
+    elif vendor == 'sqlite':
+        fts = _fts_table(table)
+        for name in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{fts}_{name}')}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {quote(fts)}")
+
+
+def _fts5_query(term):
+    """
+    Turn free text into an FTS5 query that matches documents containing every word.
+    Each word is quoted so that FTS5 operators in user input are treated as text.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', term))
+
+
+def full_text_search(queryset, term, column='details'):
+    """
+    Filter a queryset to the rows matching `term` and annotate them with `search_rank`.
+
+    The filter is applied on top of the given queryset, so any role scoping already on it
+    is kept. Higher `search_rank` means a better match.
+
+    Args:
+        queryset (QuerySet): The queryset to search, indexed with `install_search_index`.
+        term (str): The free-text search term.
+        column (str): The indexed text column, used by the fallback for other databases.
+
+    Returns:
+        QuerySet: The matching rows annotated with `search_rank`.
+    """
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.annotate(
+            search_match=RawSQL(f'"{table}".{SEARCH_VECTOR_COLUMN} @@ {tsquery}', (term,), output_field=BooleanField()),
+            search_rank=RawSQL(f'ts_rank("{table}".{SEARCH_VECTOR_COLUMN}, {tsquery})', (term,), output_field=FloatField()),
+        ).filter(search_match=True)
+    if vendor == 'sqlite':
+        fts = _fts_table(table)
+        match = _fts5_query(term)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s', (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f'(SELECT -bm25("{fts}") FROM "{fts}" WHERE "{fts}" MATCH %s AND rowid = "{table}"."id")',
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+    return queryset.filter(**{f'{column}__icontains': term}).annotate(
+        search_rank=RawSQL('1.0', (), output_field=FloatField())
+    )
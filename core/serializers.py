@@ -0,0 +1,98 @@
+from django.db import models, transaction
+from rest_framework import serializers
+from .fields import BulkPrimaryKeyRelatedField, BulkManyRelatedField
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """
+    List serializer for bulk payloads that resolves related IDs once for the whole batch.
+
+    Before the items are validated, every `BulkPrimaryKeyRelatedField` (single or `many=True`)
+    of the child serializer is primed with the IDs submitted across all items, so each related
+    model costs one `IN` query no matter how many items the payload has. Validation errors are
+    still reported per item.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            items = [item for item in data if isinstance(item, dict)]
+            for field in self.child.fields.values():
+                if field.read_only or not isinstance(field, (BulkPrimaryKeyRelatedField, BulkManyRelatedField)):
+                    continue
+                field.prime(item[field.field_name] for item in items if field.field_name in item)
+        return super().to_internal_value(data)
+
+
+class FragmentListSerializer(serializers.ListSerializer):
+    """
+    List serializer that loads the cached fragments of all rows before serializing them.
+
+    The child serializer's `prime_fragments(instances)` is called once with every row, so
+    the nested customers, sales agents and services of a whole page are fetched from the
+    fragment cache in a few batched calls instead of per row.
+    """
+
+    def to_representation(self, data):
+        rows = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.prime_fragments(rows)
+        return super().to_representation(rows)
+
+
+def _current_related_pks(instance, manager):
+    """
+    Return the primary keys currently linked through a many-to-many manager,
+    reading the prefetch cache when the relation was prefetched.
+    """
+    prefetched = getattr(instance, '_prefetched_objects_cache', {})
+    if manager.prefetch_cache_name in prefetched:
+        return {obj.pk for obj in prefetched[manager.prefetch_cache_name]}
+    return set(manager.values_list('pk', flat=True))
+
+
+def save_changed_fields(instance, validated_data):
+    """
+    Persist only the values of `validated_data` that differ from `instance`.
+
+    Changed concrete fields are written with `save(update_fields=...)`; foreign keys are
+    compared by ID so the related rows are never loaded. Many-to-many fields are diffed
+    against the current links and only the added and removed links are written. When
+    nothing changed, no query is issued at all; otherwise `auto_now` fields (such as
+    `updated_at`) are saved too, also when only links changed.
+
+    Args:
+        instance (Model): The instance being updated.
+        validated_data (dict): The validated data from the serializer.
+
+    Returns:
+        list: The names of the fields that changed.
+    """
+    changed_fields = []
+    many_to_many_changes = []
+    for name, value in validated_data.items():
+        field = instance._meta.get_field(name)
+        if field.many_to_many:
+            manager = getattr(instance, name)
+            current = _current_related_pks(instance, manager)
+            target = {obj.pk for obj in value}
+            if current != target:
+                many_to_many_changes.append((name, manager, current - target, target - current))
+            continue
+
+        new_value = value.pk if field.is_relation and value is not None else value
+        if getattr(instance, field.attname) != new_value:
+            setattr(instance, name, value)
+            changed_fields.append(name)
+
+    if not changed_fields and not many_to_many_changes:
+        return []
+
+    timestamps = [field.name for field in instance._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    with transaction.atomic():
+        if changed_fields or timestamps:
+            instance.save(update_fields=changed_fields + timestamps)
+        for name, manager, removed, added in many_to_many_changes:
+            if removed:
+                manager.remove(*removed)
+            if added:
+                manager.add(*added)
+    return changed_fields + [name for name, *_ in many_to_many_changes]
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from accounts.models import CustomUser
+from customer.models import Customer
+from services.models import Service
+from .fragments import fragment_cache
+
+# Models whose serialized representation is cached as a fragment.
+FRAGMENT_MODELS = [Customer, CustomUser, Service]
+
+
+def invalidate_fragment(sender, instance, **kwargs):
+    """
+    Drop the cached fragments of a row when it is saved or deleted.
+
+    The row's version is changed again on commit, so a fragment stored by another request
+    from the old row while the transaction was open is not served afterwards.
+    """
+    model, pk = type(instance), instance.pk
+    fragment_cache.invalidate(model, pk)
+    transaction.on_commit(lambda: fragment_cache.invalidate(model, pk))
+
+
+for model in FRAGMENT_MODELS:
+    post_save.connect(invalidate_fragment, sender=model, dispatch_uid=f'invalidate_fragment_{model._meta.label_lower}')
+    post_delete.connect(invalidate_fragment, sender=model, dispatch_uid=f'invalidate_fragment_{model._meta.label_lower}')
@@ -0,0 +1,128 @@
+"""
+Sparse fieldsets (`?fields=`) and opt-in expansion (`?expand=`) of nested resources.
+
+Both parameters are comma separated lists of field paths, parsed into trees such as
+`{'id': {}, 'customer': {'name': {}}}` for `fields=id,customer.name`. Without either
+parameter responses keep their full nested shape. With one of them, relations come back
+as primary keys unless they are expanded, either in `expand` or by a dotted path in
+`fields`. Unknown names are ignored.
+"""
+
+# Marks serializer arguments that were not passed, as opposed to passed as None.
+UNSET = object()
+
+
+def parse_paths(value):
+    """
+    Parse `a,b.c,b.d` into `{'a': {}, 'b': {'c': {}, 'd': {}}}`.
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _expand_dotted(fields, expand):
+    for name, nested in fields.items():
+        if nested:
+            _expand_dotted(nested, expand.setdefault(name, {}))
+
+
+def parse_sparse_fieldset(query_params):
+    """
+    Read the `fields` and `expand` query parameters.
+
+    Args:
+        query_params (QueryDict): The request's query parameters.
+
+    Returns:
+        dict: `fields` and `expand` trees; both None when neither parameter was given.
+    """
+    fields = query_params.get('fields')
+    expand = query_params.get('expand')
+    if fields is None and expand is None:
+        return {'fields': None, 'expand': None}
+    fields = parse_paths(fields) if fields else None
+    expand = parse_paths(expand or '')
+    if fields:
+        _expand_dotted(fields, expand)
+    return {'fields': fields, 'expand': expand}
+
+
+def is_requested(fields, name):
+    return not fields or name in fields
+
+
+def is_expanded(fields, expand, name):
+    return is_requested(fields, name) and (expand is None or name in expand)
+
+
+def nested_fields(fields, name):
+    return fields.get(name) or None if fields else None
+
+
+def nested_expand(expand, name):
+    return None if expand is None else expand.get(name, {})
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin dropping unrequested fields and telling which relations to expand.
+
+    The `fields` and `expand` trees are taken from the serializer context, as set by
+    `SparseFieldsetViewMixin`, or passed explicitly to nested serializers.
+    """
+
+    def __init__(self, *args, fields=UNSET, expand=UNSET, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = self.context.get('fields') if fields is UNSET else fields
+        self.expand = self.context.get('expand') if expand is UNSET else expand
+        if self.sparse_fields:
+            for name in [name for name in self.fields if name not in self.sparse_fields]:
+                self.fields.pop(name)
+
+    def is_expanded(self, name):
+        return name in self.fields and is_expanded(self.sparse_fields, self.expand, name)
+
+    def nested_fields(self, name):
+        return nested_fields(self.sparse_fields, name)
+
+    def nested_expand(self, name):
+        return nested_expand(self.expand, name)
+
+    def trim(self, name, representation):
+        """
+        Keep only the requested fields of an expanded relation's representation.
+
+        Args:
+            name (str): The relation field name.
+            representation (dict or list): The nested representation, or a list of them.
+
+        Returns:
+            dict or list: The trimmed representation.
+        """
+        fields = self.nested_fields(name)
+        if fields is None or representation is None:
+            return representation
+        if isinstance(representation, list):
+            return [{key: value for key, value in item.items() if key in fields} for item in representation]
+        return {key: value for key, value in representation.items() if key in fields}
+
+
+class SparseFieldsetViewMixin:
+    """
+    Viewset mixin reading `?fields=` and `?expand=` on the actions that render rows.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve', 'export')
+
+    def get_sparse_fieldset(self):
+        if self.action not in self.sparse_fieldset_actions:
+            return {'fields': None, 'expand': None}
+        return parse_sparse_fieldset(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_sparse_fieldset())
+        return context
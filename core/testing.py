@@ -0,0 +1,89 @@
+from django.core.cache import caches
+from rest_framework.test import APITestCase
+from accounts.models import CustomUser
+from customer.models import Customer
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from services.models import Service
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Base test case for asserting how many SQL queries an API endpoint issues.
+
+    `setUpTestData` seeds a small but fully linked CRM graph (customers, inquiries,
+    proposals and services with many-to-many fan-out) for one admin and one sales agent,
+    so that any per-row query in a serializer shows up as a blown budget.
+
+    Attributes:
+        rows (int): Number of customers, inquiries and proposals seeded per sales agent.
+        fan_out (int): Number of services linked to every inquiry and proposal.
+    """
+    rows = 5
+    fan_out = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@example.com', role='admin', password='password'
+        )
+        cls.agent = CustomUser.objects.create_user(
+            username='agent', email='agent@example.com', role='sales_agent', password='password'
+        )
+        cls.services = [
+            Service.objects.create(name=f'Service {i}', description='Test service', price='100')
+            for i in range(cls.fan_out)
+        ]
+        cls.customers = []
+        cls.inquiries = []
+        cls.proposals = []
+        for i in range(cls.rows):
+            customer = Customer.objects.create(
+                name=f'Customer {i}',
+                email=f'customer{i}@example.com',
+                phone_no='0000000000',
+                address='Test address',
+                assigned_sales_agent=cls.agent,
+            )
+            inquiry = Inquiries.objects.create(
+                details=f'Inquiry {i}', customer=customer, assigned_sales_agent=cls.agent
+            )
+            inquiry.services.set(cls.services)
+            proposal = Proposals.objects.create(
+                inquiry=inquiry, details=f'Proposal {i}', status='Pending', cost='100.00'
+            )
+            proposal.services.set(cls.services)
+            cls.customers.append(customer)
+            cls.inquiries.append(inquiry)
+            cls.proposals.append(proposal)
+
+    def setUp(self):
+        # Cached responses and catalog versions must not leak between tests.
+        for cache in caches.all():
+            cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def assertQueryBudget(self, budget, method, url, data=None, status_code=200, **extra):
+        """
+        Call an endpoint and assert it issued exactly `budget` queries.
+
+        Streaming responses are consumed inside the budget, since their queries only run
+        while the body is produced; the body is available as `response.streamed_content`.
+
+        Args:
+            budget (int): The expected number of SQL queries.
+            method (str): The HTTP method name, e.g. 'get' or 'patch'.
+            url (str): The URL to call.
+            data (dict, optional): The request payload.
+            status_code (int): The expected HTTP status code.
+            **extra: Request headers, as WSGI environ keys (e.g. `HTTP_IF_NONE_MATCH`).
+
+        Returns:
+            Response: The response returned by the endpoint.
+        """
+        with self.assertNumQueries(budget):
+            response = getattr(self.client, method)(url, data, format='json', **extra)
+            if response.streaming:
+                response.streamed_content = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', None))
+        return response
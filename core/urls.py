@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import DatabaseStatsView, MetricsView
+
+urlpatterns = [
+    path('db/stats/', DatabaseStatsView.as_view(), name='database_stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
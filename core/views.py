@@ -0,0 +1,57 @@
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.views import APIView
+from accounts.permissions import IsAdmin
+from core.db import connection_stats
+from core.envelope import envelope_response
+from core.metrics import render_metrics
+
+
+class DatabaseStatsView(APIView):
+    """
+    API view exposing database connection and pool statistics.
+
+    Used to size gunicorn workers against the connection pool: every worker process holds
+    its own pool, so the statistics describe the worker that served the request.
+
+    Permission Classes:
+        - IsAdmin: Ensures that only admin users can access this endpoint.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to retrieve the connection statistics.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A DRF Response object with one entry per database alias.
+        """
+        return envelope_response(200, "Database statistics retrieved successfully.", data=connection_stats())
+
+
+class MetricsView(APIView):
+    """
+    API view exposing the request metrics in the Prometheus text format.
+
+    The response is not wrapped in the API envelope so Prometheus can scrape it directly,
+    authenticating with an admin access token.
+
+    Permission Classes:
+        - IsAdmin: Ensures that only admin users can access this endpoint.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to render the metrics of all worker processes.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: The metrics in the Prometheus exposition format.
+        """
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
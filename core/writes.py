@@ -0,0 +1,51 @@
+import threading
+from contextlib import contextmanager
+from django.db import transaction
+
+_local = threading.local()
+
+
+@contextmanager
+def batched_writes(using=None):
+    """
+    Collect the bookkeeping writes of the receivers run inside the block and write them once.
+
+    Deleting a customer cascades to its inquiries and proposals, and the receivers of each
+    deleted row log a change, move the pipeline rollup and invalidate analytics buckets.
+    Inside the block those writes are queued with `defer_write` and flushed when it ends,
+    one call per kind of write, in the same transaction as the rows. Nested blocks are
+    flushed by the outermost one; nothing is written when the block raises.
+
+    Args:
+        using (str, optional): The database alias of the transaction.
+    """
+    if getattr(_local, 'queued', None) is not None:
+        yield
+        return
+    _local.queued = {}
+    try:
+        with transaction.atomic(using=using, savepoint=False):
+            yield
+            queued, _local.queued = _local.queued, None
+            for flush, items in queued.items():
+                flush(items)
+    finally:
+        _local.queued = None
+
+
+def defer_write(flush, items):
+    """
+    Write `items` with `flush(items)`, at the end of the current `batched_writes` block.
+
+    The items queued for the same `flush` during a block are passed to it together, in the
+    order they were queued. Outside a block, `flush` is called right away.
+
+    Args:
+        flush (callable): Writes a list of items, e.g. with one INSERT.
+        items (iterable): The items to write.
+    """
+    queued = getattr(_local, 'queued', None)
+    if queued is None:
+        flush(list(items))
+    else:
+        queued.setdefault(flush, []).extend(items)
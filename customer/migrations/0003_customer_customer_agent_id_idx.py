@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0002_customer_assigned_sales_agent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['assigned_sales_agent', 'id'], name='customer_agent_id_idx'),
+        ),
+    ]
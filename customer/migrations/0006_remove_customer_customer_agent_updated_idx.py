@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0005_customer_created_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customer_agent_updated_idx',
+        ),
+    ]
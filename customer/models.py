@@ -11,6 +11,8 @@ class Customer(models.Model):
         phone_no (str): The phone number of the customer.
         address (str): The residential address of the customer.
         assigned_sales_agent (ForeignKey): The sales agent assigned to this customer, linked to the CustomUser model. This field is optional.
+        created_at (DateTimeField): When the customer was created.
+        updated_at (DateTimeField): When the customer was last saved, used to validate cached responses.
 
     Methods:
         __str__(): Returns the string representation of the customer, which is their name.
@@ -20,6 +22,14 @@ class Customer(models.Model):
     phone_no = models.CharField(max_length=15)
     address = models.TextField()
     assigned_sales_agent = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name="customers")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Sales agents list their own customers in primary key order (keyset pagination).
+            models.Index(fields=['assigned_sales_agent', 'id'], name='customer_agent_id_idx'),
+        ]
     
     def __str__(self) :
         """
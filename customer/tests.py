@@ -1,3 +1,25 @@
-from django.test import TestCase
+from core.testing import QueryBudgetTestCase
 
-# Create your tests here.
+
+class CustomerQueryBudgetTests(QueryBudgetTestCase):
+    """
+    The customer endpoints must not issue per-row queries.
+    """
+
+    def test_list_query_budget(self):
+        response = self.assertQueryBudget(1, 'get', '/api/customers/')
+        self.assertEqual(len(response.data['data']['results']), self.rows)
+
+    def test_retrieve_query_budget(self):
+        self.assertQueryBudget(1, 'get', f'/api/customers/{self.customers[0].pk}/')
+
+    def test_export_csv(self):
+        response = self.assertQueryBudget(1, 'get', '/api/customers/export/', {'output': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = response.streamed_content.decode().splitlines()
+        self.assertEqual(lines[0], 'id,name,email,phone_no,address,assigned_sales_agent')
+        self.assertEqual(len(lines), self.rows + 1)
+
+    def test_export_rejects_unknown_format(self):
+        response = self.client.get('/api/customers/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
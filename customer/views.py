@@ -1,12 +1,17 @@
 from rest_framework import viewsets
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from .models import Customer
 from .serializers import CustomerSerializer
 from accounts.permissions import IsAdmin, IsSalesAgent
-from .utils import custom_response  
+from core.envelope import custom_response
+from core.writes import batched_writes
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
+from core.export import EXPORT_CONTENT_TYPES, iter_serialized_rows, streaming_export_response
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Customer data.
 
@@ -17,6 +22,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     permission_classes = [IsAdmin | IsSalesAgent]
     queryset = Customer.objects.all()
+    export_chunk_size = 500
 
     def get_queryset(self):
         """
@@ -32,7 +38,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         if user.role == 'admin':
             return Customer.objects.all()
         elif user.role == 'sales_agent':
-            return Customer.objects.filter(assigned_sales_agent=user)
+            return Customer.objects.filter(assigned_sales_agent=user.pk)
         return Customer.objects.none()
 
     def list(self, request, *args, **kwargs):
@@ -41,17 +47,19 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
         Admins can retrieve all customer records.
         Sales agents can retrieve only their assigned customers.
+        Results are returned one page at a time using keyset pagination (`?cursor=`, `?page_size=`).
 
         Returns:
-            Response: A response containing the list of customers or a message if no customers are found.
+            Response: A response containing a page of customers or a message if no customers are found.
         """
         queryset = self.get_queryset()
-        if queryset.exists():
-            serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        if page:
+            serializer = self.get_serializer(page, many=True)
             response_data = custom_response(
                 status_code=200,
                 message="Customers retrieved successfully.",
-                data=serializer.data
+                data=self.paginator.get_paginated_data(serializer.data)
             )
             return Response(response_data, status=status.HTTP_200_OK)
         else:
@@ -94,13 +102,14 @@ class CustomerViewSet(viewsets.ModelViewSet):
         """
         Save a new customer instance.
 
-        Sets the `assigned_sales_agent` field to the current user.
+        Sets the `assigned_sales_agent` field to the current user. The user may be a token
+        user without a database row, so the foreign key is set by ID.
 
         Args:
             serializer (CustomerSerializer): The serializer instance used to validate and save the customer data.
         """
         user = self.request.user
-        serializer.save(assigned_sales_agent=user)
+        serializer.save(assigned_sales_agent_id=user.pk)
 
     def create(self, request, *args, **kwargs):
         """
@@ -145,7 +154,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
         user = self.request.user
-        if user.role == 'sales_agent' and instance.assigned_sales_agent != user:
+        if user.role == 'sales_agent' and instance.assigned_sales_agent_id != user.pk:
             response_data = custom_response(
                 status_code=403,
                 message='You do not have permission to update this customer.',
@@ -185,7 +194,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         """        
         instance = self.get_object()
         user = self.request.user
-        if user.role == 'sales_agent' and instance.assigned_sales_agent != user:
+        if user.role == 'sales_agent' and instance.assigned_sales_agent_id != user.pk:
             response_data = custom_response(
                 status_code=403,
                 message='You do not have permission to update this customer.',
@@ -226,7 +235,9 @@ class CustomerViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         user = self.request.user
         if user.role == 'admin':
-            instance.delete()
+            # The cascade's change log entries and rollup deltas are written together.
+            with batched_writes():
+                instance.delete()
             response_data = custom_response(
                 status_code=200,
                 message="Customer successfully deleted.",
@@ -240,3 +251,35 @@ class CustomerViewSet(viewsets.ModelViewSet):
                 data=None
             )
             return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every customer visible to the user as NDJSON or CSV.
+
+        The rows are scoped by `get_queryset`, read through a server-side cursor and
+        serialized chunk by chunk, so memory use stays flat no matter how many rows are exported.
+
+        Query Parameters:
+            output (str): `ndjson` (default) or `csv`.
+
+        Returns:
+            StreamingHttpResponse: The streamed export, or an error response for an unknown format.
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_CONTENT_TYPES:
+            response_data = custom_response(
+                status_code=400,
+                message=f"Unsupported export format. Use one of: {', '.join(EXPORT_CONTENT_TYPES)}.",
+                data=None
+            )
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = iter_serialized_rows(
+            self.get_queryset(),
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            chunk_size=self.export_chunk_size,
+        )
+        return streaming_export_response(rows, output, filename='customers')
+
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from dashboard.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    """
+    Recompute the pipeline rollup behind `/api/dashboard/` from the inquiries and proposals.
+
+    The rollup is maintained on every save and delete; rebuild it after writes that send no
+    signals (`queryset.update()`, raw SQL) or to repair drift. It runs one grouped query per
+    resource and replaces the table in one transaction, holding a lock on it.
+    """
+    help = 'Rebuild the per-agent pipeline totals of the dashboard.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f'Dashboard rebuilt: {rows} rollup rows.'))
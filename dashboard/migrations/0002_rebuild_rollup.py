@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:50
+
+from django.db import migrations
+
+
+def rebuild(apps, schema_editor):
+    """
+    Fill the rollup from the existing inquiries and proposals.
+    """
+    from dashboard.rollup import rebuild_rollup
+
+    rebuild_rollup(apps)
+
+
+def clear(apps, schema_editor):
+    apps.get_model('dashboard', 'PipelineRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('inquiries', '0004_inquiries_updated_at'),
+        ('proposal', '0004_proposals_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild, clear),
+    ]
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import models
+
+class PipelineRollup(models.Model):
+    """
+    Running totals of a sales agent's inquiries or proposals in one status.
+
+    The rows are kept up to date from the inquiry and proposal signals (see
+    `dashboard.signals`), so the dashboard reads one row per agent and status instead of
+    counting the pipeline. `manage.py rebuild_dashboard` recomputes them from scratch.
+
+    Attributes:
+        RESOURCE_CHOICES (list): The counted resources, named like their API endpoints.
+        resource (CharField): Whether the row counts inquiries or proposals.
+        agent (ForeignKey): The sales agent the inquiries (or the inquiries of the proposals) are assigned to.
+        status (CharField): The inquiry or proposal status.
+        count (IntegerField): The number of rows in this status.
+        value (DecimalField): The total cost of the proposals in this status; 0 for inquiries.
+    """
+    RESOURCE_CHOICES = [
+        ('inquiries', 'inquiries'),
+        ('proposals', 'proposals'),
+    ]
+
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            # One row per key; also serves the dashboard of a single agent.
+            models.UniqueConstraint(fields=['agent', 'resource', 'status'], name='dashboard_rollup_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.resource} {self.status} of agent {self.agent_id}: {self.count}'
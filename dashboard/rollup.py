@@ -0,0 +1,151 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.apps import apps as global_apps
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F, Sum
+from core.writes import defer_write
+from sync.changes import SYNCED_MODELS, owner
+from .models import PipelineRollup
+
+
+def to_decimal(value):
+    """
+    Return a proposal cost as a Decimal; costs assigned from payloads may still be strings.
+    """
+    if value is None:
+        return Decimal(0)
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class RollupDeltas:
+    """
+    Changes to the pipeline rollup collected for one write, applied together.
+
+    Deltas of the same key are summed first, so moving a row within a key (e.g. editing
+    an inquiry's details) writes nothing.
+    """
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: [0, Decimal(0)])
+
+    def add(self, resource, agent, status, count, value=0):
+        """
+        Add rows to (or, with a negative count, remove rows from) a key.
+
+        Args:
+            resource (str): 'inquiries' or 'proposals'.
+            agent (int): The sales agent ID; rows without an agent are not counted.
+            status (str): The inquiry or proposal status.
+            count (int): The number of rows added.
+            value (Decimal): The cost added.
+        """
+        if agent is None:
+            return
+        delta = self.deltas[resource, agent, status]
+        delta[0] += count
+        delta[1] += to_decimal(value)
+
+    def apply(self):
+        """
+        Write the deltas with one UPDATE per changed key.
+
+        Within `batched_writes`, the deltas of the whole block are summed and written at its end.
+        """
+        defer_write(write_deltas, list(self.deltas.items()))
+        self.deltas.clear()
+
+
+def write_deltas(deltas):
+    """
+    Sum `(key, (count, value))` deltas and write them with one UPDATE per changed key.
+
+    A key seen for the first time is inserted instead; when another request inserts
+    the same key first, the unique constraint fails and the row is updated after all.
+    Keys are written in a fixed order so concurrent writes lock the rows in the same order.
+    """
+    totals = defaultdict(lambda: [0, Decimal(0)])
+    for key, (count, value) in deltas:
+        totals[key][0] += count
+        totals[key][1] += value
+    for (resource, agent, status), (count, value) in sorted(totals.items()):
+        if not count and not value:
+            continue
+        key = {'resource': resource, 'agent_id': agent, 'status': status}
+        changes = {'count': F('count') + count, 'value': F('value') + value}
+        if PipelineRollup.objects.filter(**key).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                PipelineRollup.objects.create(**key, count=count, value=value)
+        except IntegrityError:
+            PipelineRollup.objects.filter(**key).update(**changes)
+
+
+def count_rows(resource, rows):
+    """
+    Add inserted rows to the rollup.
+
+    Args:
+        resource (str): 'inquiries' or 'proposals'.
+        rows (iterable): `(agent_id, status, cost)` triples; the cost is 0 for inquiries.
+    """
+    deltas = RollupDeltas()
+    for agent, status, value in rows:
+        deltas.add(resource, agent, status, 1, value)
+    deltas.apply()
+
+
+def count_created(instances):
+    """
+    Add rows inserted without `post_save`, e.g. with `bulk_create`, to the rollup.
+
+    Args:
+        instances (list): Saved inquiries, or saved proposals whose inquiry is cached.
+    """
+    if instances:
+        count_rows(
+            SYNCED_MODELS[type(instances[0])],
+            [(owner(instance), instance.status, getattr(instance, 'cost', 0)) for instance in instances],
+        )
+
+
+def rebuild_rollup(apps=global_apps):
+    """
+    Recompute the whole rollup with one grouped query per resource.
+
+    The table is locked first (on SQLite, deleting its rows takes the database write lock),
+    so writes to the rollup wait for the rebuild instead of being overwritten by it; the
+    inquiries and proposals are read after the lock is taken. Every delta is written in the
+    transaction of the row it counts, so no row is counted twice: a transaction that wrote
+    to the rollup holds the lock until it commits, and its row is then read by the grouped
+    queries, while one that did not yet has its row hidden from them and adds its delta after
+    the rebuild. Used by `manage.py rebuild_dashboard` and the migration creating the table.
+
+    Args:
+        apps (Apps): The app registry, the historical one when run from a migration.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    rollup = apps.get_model('dashboard', 'PipelineRollup')
+    inquiries = apps.get_model('inquiries', 'Inquiries').objects.values_list(
+        'assigned_sales_agent', 'status'
+    ).annotate(count=Count('pk')).order_by()
+    proposals = apps.get_model('proposal', 'Proposals').objects.values_list(
+        'inquiry__assigned_sales_agent', 'status'
+    ).annotate(count=Count('pk'), value=Sum('cost')).order_by()
+    connection = connections[router.db_for_write(rollup)]
+    with transaction.atomic(using=connection.alias):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(rollup._meta.db_table)} IN EXCLUSIVE MODE')
+        rollup.objects.all().delete()
+        rows = [
+            rollup(resource='inquiries', agent_id=agent, status=status, count=count)
+            for agent, status, count in inquiries
+        ] + [
+            rollup(resource='proposals', agent_id=agent, status=status, count=count, value=value)
+            for agent, status, count, value in proposals
+        ]
+        rollup.objects.bulk_create(rows)
+    return len(rows)
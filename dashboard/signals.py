@@ -0,0 +1,119 @@
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from sync.changes import inquiry_agent, owner
+from .rollup import RollupDeltas, to_decimal
+
+# Fields deciding the rollup key and value of a row.
+STATE_FIELDS = {
+    Inquiries: ('assigned_sales_agent_id', 'status'),
+    Proposals: ('inquiry_id', 'status', 'cost'),
+}
+
+
+def load_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    """
+    Read the stored state of a row about to be updated.
+
+    The instance already holds the new values, so the stored ones are read, and the row
+    locked until the save commits, with the rollup delta written in the same transaction
+    (see `Inquiries.save`). Nothing is read on creation or when `update_fields` leaves the
+    state fields alone, and loaded rows carry no state at all.
+    """
+    instance._rollup_state = None
+    if raw or instance._state.adding:
+        return
+    fields = STATE_FIELDS[sender]
+    if update_fields is not None:
+        # `update_fields` may name a foreign key by its field name or its column (`attname`).
+        names = {name for field in fields for name in (field, sender._meta.get_field(field).name)}
+        if not names & update_fields:
+            return
+    instance._rollup_state = sender._base_manager.db_manager(using).select_for_update().filter(
+        pk=instance.pk
+    ).values_list(*fields).first()
+
+
+def load_deleted_state(sender, instance, using=None, **kwargs):
+    """
+    Read the state of a row about to be deleted, from the row itself when it was loaded in full.
+    """
+    fields = STATE_FIELDS[sender]
+    if all(field in instance.__dict__ for field in fields):
+        instance._rollup_state = tuple(instance.__dict__[field] for field in fields)
+    else:
+        instance._rollup_state = sender._base_manager.db_manager(using).filter(
+            pk=instance.pk
+        ).values_list(*fields).first()
+
+
+def inquiry_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Move a saved inquiry to its current agent and status.
+
+    A reassigned inquiry moves the totals of its proposals to the new agent as well.
+    """
+    if raw:
+        return
+    agent, status = instance.assigned_sales_agent_id, instance.status
+    previous = instance._rollup_state
+    deltas = RollupDeltas()
+    if created:
+        deltas.add('inquiries', agent, status, 1)
+    elif previous is not None:
+        previous_agent, previous_status = previous
+        deltas.add('inquiries', previous_agent, previous_status, -1)
+        deltas.add('inquiries', agent, status, 1)
+        if previous_agent != agent:
+            totals = instance.proposals.values_list('status').annotate(count=Count('pk'), value=Sum('cost')).order_by()
+            for proposal_status, count, value in totals:
+                deltas.add('proposals', previous_agent, proposal_status, -count, -value)
+                deltas.add('proposals', agent, proposal_status, count, value)
+    deltas.apply()
+
+
+def proposal_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Move a saved proposal to its current agent and status, and update its cost.
+    """
+    if raw:
+        return
+    current = (instance.inquiry_id, instance.status, to_decimal(instance.cost))
+    previous = instance._rollup_state
+    if not created and (previous is None or previous[:2] + (to_decimal(previous[2]),) == current):
+        return
+    agent = owner(instance)
+    deltas = RollupDeltas()
+    deltas.add('proposals', agent, instance.status, 1, current[2])
+    if not created:
+        previous_inquiry, previous_status, previous_cost = previous
+        previous_agent = agent if previous_inquiry == instance.inquiry_id else inquiry_agent(previous_inquiry)
+        deltas.add('proposals', previous_agent, previous_status, -1, -to_decimal(previous_cost))
+    deltas.apply()
+
+
+def row_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted inquiry or proposal from the rollup.
+    """
+    state = instance._rollup_state
+    if state is None:
+        return
+    deltas = RollupDeltas()
+    if sender is Inquiries:
+        agent, status = state
+        deltas.add('inquiries', agent, status, -1)
+    else:
+        _, status, cost = state
+        deltas.add('proposals', owner(instance), status, -1, -to_decimal(cost))
+    deltas.apply()
+
+
+for model in STATE_FIELDS:
+    label = model._meta.label_lower
+    pre_save.connect(load_state, sender=model, dispatch_uid=f'rollup_load_state_{label}')
+    pre_delete.connect(load_deleted_state, sender=model, dispatch_uid=f'rollup_load_deleted_state_{label}')
+    post_delete.connect(row_deleted, sender=model, dispatch_uid=f'rollup_row_deleted_{label}')
+post_save.connect(inquiry_saved, sender=Inquiries, dispatch_uid='rollup_inquiry_saved')
+post_save.connect(proposal_saved, sender=Proposals, dispatch_uid='rollup_proposal_saved')
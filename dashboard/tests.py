@@ -0,0 +1,126 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from core.testing import QueryBudgetTestCase
+from accounts.models import CustomUser
+from customer.models import Customer
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from .models import PipelineRollup
+from .rollup import rebuild_rollup
+
+
+class DashboardTests(QueryBudgetTestCase):
+    """
+    `/api/dashboard/` reads per-agent pipeline totals from the rollup kept up to date by signals.
+    """
+
+    def rollup(self):
+        return {
+            (row.resource, row.agent_id, row.status): (row.count, row.value)
+            for row in PipelineRollup.objects.all() if row.count or row.value
+        }
+
+    def assertRollupMatchesRebuild(self):
+        incremental = self.rollup()
+        rebuild_rollup()
+        self.assertEqual(incremental, self.rollup())
+
+    def test_dashboard(self):
+        response = self.assertQueryBudget(1, 'get', '/api/dashboard/')
+        [entry] = response.data['data']
+        self.assertEqual(entry['agent'], {'id': self.agent.pk, 'username': self.agent.username})
+        self.assertEqual(entry['inquiries'], {'Open': self.rows, 'In Progress': 0, 'Closed': 0})
+        self.assertEqual(entry['proposals']['Pending'], {'count': self.rows, 'value': f'{100 * self.rows}.00'})
+        self.assertEqual(entry['proposals']['Accepted'], {'count': 0, 'value': '0.00'})
+
+    def test_sales_agent_sees_only_themselves(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        Inquiries.objects.create(details='Other', customer=self.customers[0], assigned_sales_agent=other_agent)
+        self.assertEqual(len(self.client.get('/api/dashboard/').data['data']), 2)
+        self.client.force_authenticate(other_agent)
+        response = self.assertQueryBudget(1, 'get', '/api/dashboard/')
+        self.assertEqual([entry['agent']['id'] for entry in response.data['data']], [other_agent.pk])
+
+    def test_agents_without_rows_are_left_out(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        inquiry = Inquiries.objects.create(details='Other', customer=self.customers[0], assigned_sales_agent=other_agent)
+        inquiry.delete()
+        response = self.assertQueryBudget(1, 'get', '/api/dashboard/')
+        self.assertEqual([entry['agent']['id'] for entry in response.data['data']], [self.agent.pk])
+
+    def test_writes_through_the_api_keep_the_rollup_exact(self):
+        self.client.force_authenticate(self.agent)
+        inquiry, proposal = self.inquiries[0], self.proposals[0]
+        self.client.patch(f'/api/inquiries/{inquiry.pk}/', {'status': 'Closed'}, format='json')
+        self.client.patch(f'/api/proposals/{proposal.pk}/', {
+            'status': 'Accepted', 'lines': [{'service': self.services[0].pk, 'price_override': '799.50'}],
+        }, format='json')
+        self.client.post('/api/inquiries/bulk/', [
+            {'details': 'Bulk', 'customer': self.customers[1].pk, 'services': [self.services[0].pk]},
+        ], format='json')
+        self.client.force_authenticate(self.admin)
+        self.client.delete(f'/api/proposals/{self.proposals[1].pk}/')
+        self.client.delete(f'/api/customers/{self.customers[2].pk}/')
+        self.assertRollupMatchesRebuild()
+        self.assertEqual(self.rollup()['proposals', self.agent.pk, 'Accepted'], (1, 999.5))
+
+    def test_reassignment_moves_proposals(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        inquiry = self.inquiries[0]
+        inquiry.assigned_sales_agent = other_agent
+        inquiry.save()
+        proposal = self.proposals[1]
+        proposal.inquiry = inquiry
+        proposal.save()
+        self.assertEqual(self.rollup()['proposals', other_agent.pk, 'Pending'], (2, 200))
+        self.assertRollupMatchesRebuild()
+
+    def test_deferred_rows_are_diffed_against_the_database(self):
+        proposal = Proposals.objects.only('pk').get(pk=self.proposals[0].pk)
+        proposal.status = 'Rejected'
+        proposal.save(update_fields=['status'])
+        self.assertEqual(self.rollup()['proposals', self.agent.pk, 'Rejected'], (1, 100))
+        self.assertRollupMatchesRebuild()
+
+    def test_stale_rows_are_diffed_against_the_database(self):
+        stale = Proposals.objects.get(pk=self.proposals[0].pk)
+        current = Proposals.objects.get(pk=self.proposals[0].pk)
+        current.status = 'Accepted'
+        current.save()
+        stale.status = 'Rejected'
+        stale.save()
+        self.assertNotIn(('proposals', self.agent.pk, 'Accepted'), self.rollup())
+        self.assertRollupMatchesRebuild()
+
+    def test_rebuild_command(self):
+        Inquiries.objects.filter(pk=self.inquiries[0].pk).update(status='Closed')
+        out = StringIO()
+        call_command('rebuild_dashboard', stdout=out)
+        self.assertIn('Dashboard rebuilt', out.getvalue())
+        self.assertEqual(self.rollup()['inquiries', self.agent.pk, 'Closed'], (1, 0))
+
+
+class RollupTransactionTests(TransactionTestCase):
+    """
+    Rollup deltas are written in the transaction of the row they count.
+    """
+
+    def test_failed_delta_rolls_back_the_row(self):
+        agent = CustomUser.objects.create_user(
+            username='agent', email='agent@example.com', role='sales_agent', password='password'
+        )
+        customer = Customer.objects.create(
+            name='Customer', email='customer@example.com', phone_no='0000000000', address='Test address',
+        )
+        with mock.patch('dashboard.signals.RollupDeltas.apply', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Inquiries.objects.create(details='Lost', customer=customer, assigned_sales_agent=agent)
+        self.assertFalse(Inquiries.objects.exists())
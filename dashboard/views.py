@@ -0,0 +1,60 @@
+from rest_framework.views import APIView
+from accounts.permissions import IsAdminOrSalesAgent
+from core.envelope import envelope_response
+from core.replicas import ReplicaReadMixin
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from .models import PipelineRollup
+
+STATUSES = {
+    'inquiries': [status for status, _ in Inquiries.STATUS_CHOICES],
+    'proposals': [status for status, _ in Proposals.STATUS_CHOICES],
+}
+
+
+class DashboardView(ReplicaReadMixin, APIView):
+    """
+    API view returning the pipeline of every sales agent: inquiries and proposals per status.
+
+    The totals are read from the `PipelineRollup` table with one query, so the cost of the
+    dashboard depends on the number of agents, not on the size of the pipeline.
+
+    Permission Classes:
+        - IsAdminOrSalesAgent: Admins see every sales agent, sales agents only themselves.
+    """
+    permission_classes = [IsAdminOrSalesAgent]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to return the pipeline totals per sales agent.
+
+        Every agent with inquiries gets the number of inquiries in each status, and the
+        number and total cost of proposals in each status. Statuses without rows are 0.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A DRF Response object with one entry per sales agent, by agent ID.
+        """
+        # Keys whose rows were all removed stay in the table at zero; a rebuild drops them.
+        queryset = PipelineRollup.objects.exclude(count=0, value=0).select_related('agent').only(
+            'resource', 'status', 'count', 'value', 'agent__id', 'agent__username'
+        ).order_by('agent_id')
+        if request.user.role != 'admin':
+            queryset = queryset.filter(agent=request.user.pk)
+
+        agents = {}
+        for row in queryset:
+            entry = agents.get(row.agent_id)
+            if entry is None:
+                entry = agents[row.agent_id] = {
+                    'agent': {'id': row.agent_id, 'username': row.agent.username},
+                    'inquiries': dict.fromkeys(STATUSES['inquiries'], 0),
+                    'proposals': {status: {'count': 0, 'value': '0.00'} for status in STATUSES['proposals']},
+                }
+            if row.resource == 'inquiries':
+                entry['inquiries'][row.status] = row.count
+            else:
+                entry['proposals'][row.status] = {'count': row.count, 'value': f'{row.value:.2f}'}
+        return envelope_response(200, "Dashboard retrieved successfully.", data=list(agents.values()))
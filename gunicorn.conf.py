@@ -0,0 +1,20 @@
+import os
+import shutil
+import tempfile
+
+# Workers share their metrics through memory-mapped files in this directory. It has to be
+# set before prometheus_client is imported, which happens when the workers load the app.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'travel-crm-metrics'))
+
+
+def on_starting(server):
+    # Start from an empty directory so samples of a previous run are not reported.
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 09:12
+
+from django.db import migrations
+from core.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor, 'inquiries_inquiries', 'details')
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor, 'inquiries_inquiries', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0003_customer_customer_agent_id_idx'),
+        ('inquiries', '0002_inquiries_search_index'),
+        ('services', '0005_alter_service_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['assigned_sales_agent', 'id'], name='inquiry_agent_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['assigned_sales_agent', 'status'], name='inquiry_agent_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(condition=models.Q(('status', 'Open')), fields=['assigned_sales_agent', 'id'], name='inquiry_agent_open_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:58
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from core.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite adds the column by rebuilding the table, which drops the full-text triggers.
+    install_search_index(schema_editor, 'inquiries_inquiries', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0003_inquiries_inquiry_agent_id_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inquiries',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['assigned_sales_agent', 'updated_at'], name='inquiry_agent_updated_idx'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
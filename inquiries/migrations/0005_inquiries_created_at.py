@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-17 00:12
+"""
+Add `created_at`, backfilled from the sync change log.
+
+An existing inquiry gets the time of its earliest change log entry, or its `updated_at` when
+that is earlier: rows that existed before the change log were logged by its backfill, at the
+time the log was installed. Rows without any entry (written with `queryset.update()` or raw SQL
+only) fall back to `updated_at`. Either way a row gets the earliest time it is known to have
+existed and stays in the analytics buckets, which leaving it NULL would have dropped it from.
+"""
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Min
+from core.search import install_search_index
+
+
+def backfill_created_at(apps, schema_editor):
+    model = apps.get_model('inquiries', 'Inquiries')
+    first_logged = dict(
+        apps.get_model('sync', 'Change').objects.filter(resource='inquiries').order_by()
+        .values_list('object_id').annotate(first=Min('created_at'))
+    )
+    rows = []
+    for row in model.objects.only('updated_at').order_by('pk').iterator(chunk_size=1000):
+        logged = first_logged.get(row.pk)
+        row.created_at = min(logged, row.updated_at) if logged else row.updated_at
+        rows.append(row)
+        if len(rows) == 1000:
+            model.objects.bulk_update(rows, ['created_at'])
+            rows = []
+    model.objects.bulk_update(rows, ['created_at'])
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite adds the column by rebuilding the table, which drops the full-text triggers.
+    install_search_index(schema_editor, 'inquiries_inquiries', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0004_inquiries_updated_at'),
+        ('sync', '0002_backfill_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inquiries',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['created_at'], name='inquiry_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['assigned_sales_agent', 'created_at'], name='inquiry_agent_created_idx'),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-17 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from core.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite alters the foreign key by rebuilding the table, which drops the full-text triggers.
+    install_search_index(schema_editor, 'inquiries_inquiries', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0005_inquiries_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inquiries',
+            name='inquiry_agent_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='inquiries',
+            name='inquiry_agent_open_idx',
+        ),
+        migrations.AlterField(
+            model_name='inquiries',
+            name='assigned_sales_agent',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
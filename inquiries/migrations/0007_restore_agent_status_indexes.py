@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0006_drop_redundant_agent_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(fields=['assigned_sales_agent', 'status'], name='inquiry_agent_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiries',
+            index=models.Index(condition=models.Q(('status', 'Open')), fields=['assigned_sales_agent', 'id'], name='inquiry_agent_open_idx'),
+        ),
+    ]
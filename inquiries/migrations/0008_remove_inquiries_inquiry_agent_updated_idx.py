@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0007_restore_agent_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inquiries',
+            name='inquiry_agent_updated_idx',
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
 from customer.models import Customer
 from services.models import Service
@@ -14,8 +14,11 @@ class Inquiries(models.Model):
         customer (ForeignKey): A foreign key linking to the Customer model, representing the customer who made the inquiry.
         assigned_sales_agent (ForeignKey): A foreign key linking to the user model, representing the sales agent assigned to the inquiry.
         services (ManyToManyField): A many-to-many relationship linking to the Service model, representing the services related to the inquiry.
+        created_at (DateTimeField): When the inquiry was created; analytics bucket inquiries by it.
+        updated_at (DateTimeField): When the inquiry was last saved, used to validate cached responses.
 
     Methods:
+        save(): Saves the inquiry in one transaction with the writes of its `post_save` receivers.
         __str__(): Returns a string representation of the inquiry, including its ID and status.
     """
     STATUS_CHOICES =[
@@ -27,9 +30,36 @@ class Inquiries(models.Model):
     details = models.TextField()
     status = models.CharField(max_length=20,choices=STATUS_CHOICES,default='Open')
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
-    assigned_sales_agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Not indexed on its own: the `(assigned_sales_agent, ...)` indexes below serve its lookups.
+    assigned_sales_agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
     services = models.ManyToManyField(Service,related_name='inquiries')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Sales agents list their own inquiries in primary key order (keyset pagination).
+            models.Index(fields=['assigned_sales_agent', 'id'], name='inquiry_agent_id_idx'),
+            # Dashboards filter an agent's inquiries by status.
+            models.Index(fields=['assigned_sales_agent', 'status'], name='inquiry_agent_status_idx'),
+            # The open pipeline is a small slice of the table and is read the most.
+            models.Index(fields=['assigned_sales_agent', 'id'], condition=models.Q(status='Open'), name='inquiry_agent_open_idx'),
+            # Conversion analytics read the inquiries created in a month, for everyone or one agent.
+            models.Index(fields=['created_at'], name='inquiry_created_idx'),
+            models.Index(fields=['assigned_sales_agent', 'created_at'], name='inquiry_agent_created_idx'),
+        ]
     
+    def save(self, *args, **kwargs):
+        """
+        Save the inquiry in one transaction with the writes of its `post_save` receivers.
+
+        The dashboard rollup, the change log and the analytics buckets are kept by receivers,
+        so they commit, or roll back, together with the row.
+        """
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         """
         Return the string representation of the inquiry status.
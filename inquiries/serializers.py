@@ -1,20 +1,29 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Inquiries
 from customer.models import Customer
 from services.models import Service
 from accounts.models import CustomUser
 from customer.serializers import CustomerSerializer
-from services.serializers import ServiceSerializer
+from services.cache import service_catalog
 from accounts.serializers import SalesAgentSerializer
-
-class InquirySerializer(serializers.ModelSerializer):
+from core.fields import BulkPrimaryKeyRelatedField
+from core.fragments import fragment_cache
+from core.serializers import BulkRelatedListSerializer, FragmentListSerializer, save_changed_fields
+from core.sparse import SparseFieldsetMixin, is_expanded, is_requested
+from analytics.buckets import bump_buckets, month_of
+from dashboard.rollup import count_created
+from sync.changes import log_created
+
+class InquirySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for handling Inquiry instances, including creation, updating, and representation.
 
     Attributes:
-        customer (PrimaryKeyRelatedField): Represents the ID of the customer making the inquiry.
-        assigned_sales_agent (PrimaryKeyRelatedField, optional): Represents the ID of the sales agent assigned to the inquiry.
-        services (PrimaryKeyRelatedField): Represents the IDs of the services related to the inquiry.
+        customer (BulkPrimaryKeyRelatedField): Represents the ID of the customer making the inquiry.
+        assigned_sales_agent (BulkPrimaryKeyRelatedField, optional): Represents the ID of the sales agent assigned to the inquiry.
+        services (BulkPrimaryKeyRelatedField): Represents the IDs of the services related to the inquiry, resolved with one query.
 
     Meta:
         model (Inquiries): The model associated with this serializer.
@@ -23,15 +32,50 @@ class InquirySerializer(serializers.ModelSerializer):
     Methods:
         create(validated_data): Handles the creation of an Inquiry instance and associates the provided services.
         update(instance, validated_data): Updates an existing Inquiry instance with the provided data.
+        setup_eager_loading(queryset, prefix, fields, expand): Adds the select/prefetch calls needed to serialize a queryset without N+1 queries.
+        prime_fragments(inquiries): Loads the cached customer and sales agent fragments of many inquiries at once.
         to_representation(instance): Customizes the representation of an Inquiry instance to include nested serialized data for customer, assigned_sales_agent, and services.
+
+    With `fields` and `expand` trees (see `core.sparse`), only the requested fields are
+    rendered and relations that are not expanded are rendered as primary keys.
     """
-    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all()) 
-    assigned_sales_agent = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all(), required=False)
-    services = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all(), many=True)  
+    customer = BulkPrimaryKeyRelatedField(queryset=Customer.objects.all())
+    assigned_sales_agent = BulkPrimaryKeyRelatedField(queryset=CustomUser.objects.all(), required=False)
+    services = BulkPrimaryKeyRelatedField(queryset=Service.objects.all(), many=True)
 
     class Meta:
         model = Inquiries
         fields = ['id', 'details', 'status', 'customer', 'assigned_sales_agent', 'services']
+        list_serializer_class = FragmentListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset, prefix='', fields=None, expand=None):
+        """
+        Attach the joins and prefetches needed by `to_representation` to a queryset.
+
+        Only the relations that will be rendered are loaded: expanded relations are joined or
+        prefetched, services rendered as primary keys prefetch only their IDs, and customer
+        and sales agent primary keys are read from the inquiry row itself.
+
+        Args:
+            queryset (QuerySet): The queryset whose rows will be serialized.
+            prefix (str): Lookup prefix used when the inquiries are reached through a relation (e.g. 'inquiry__').
+            fields (dict, optional): The requested fields tree; None renders every field.
+            expand (dict, optional): The expanded relations tree; None expands every relation.
+
+        Returns:
+            QuerySet: The queryset loading the rendered relations in a constant number of queries.
+        """
+        related = [
+            f'{prefix}{name}' for name in ('customer', 'assigned_sales_agent') if is_expanded(fields, expand, name)
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        if is_expanded(fields, expand, 'services'):
+            queryset = queryset.prefetch_related(f'{prefix}services')
+        elif is_requested(fields, 'services'):
+            queryset = queryset.prefetch_related(Prefetch(f'{prefix}services', queryset=Service.objects.only('pk')))
+        return queryset
 
     def create(self, validated_data):
         """
@@ -54,6 +98,10 @@ class InquirySerializer(serializers.ModelSerializer):
         """
         Update an existing Inquiry instance with the provided data.
 
+        Only the fields whose values changed are written, and the services are updated by
+        adding and removing the changed links. A request that changes nothing does not
+        write to the database.
+
         Args:
             instance (Inquiry): The Inquiry instance to update.
             validated_data (dict): The validated data for updating the Inquiry.
@@ -61,25 +109,31 @@ class InquirySerializer(serializers.ModelSerializer):
         Returns:
             Inquiry: The updated Inquiry instance.
         """
-        instance.details = validated_data.get('details', instance.details)
-        instance.status = validated_data.get('status', instance.status)
-        
-        if 'customer' in validated_data:
-            instance.customer = validated_data['customer']
-
-        if 'assigned_sales_agent' in validated_data:
-            instance.assigned_sales_agent = validated_data['assigned_sales_agent']
-        
-        if 'services' in validated_data:
-            instance.services.set(validated_data['services'])
-        
-        instance.save()
+        save_changed_fields(instance, validated_data)
         return instance
 
+    def prime_fragments(self, inquiries):
+        """
+        Load the cached customer and sales agent fragments of many inquiries at once.
+
+        Args:
+            inquiries (list): The Inquiry instances about to be serialized.
+        """
+        if self.is_expanded('customer'):
+            fragment_cache.prime(CustomerSerializer, [inquiry.customer for inquiry in inquiries], self.context)
+        if self.is_expanded('assigned_sales_agent'):
+            fragment_cache.prime(
+                SalesAgentSerializer, [inquiry.assigned_sales_agent for inquiry in inquiries], self.context
+            )
+
     def to_representation(self, instance):
         """
         Customize the representation of the Inquiry instance to include nested serialized data.
 
+        The customer and sales agent come from the fragment cache and the services from the
+        in-process service catalog cache. Relations that are not expanded keep the primary
+        keys rendered by their fields.
+
         Args:
             instance (Inquiry): The Inquiry instance to serialize.
 
@@ -87,7 +141,76 @@ class InquirySerializer(serializers.ModelSerializer):
             dict: A dictionary representation of the Inquiry instance with nested data.
         """        
         representation = super().to_representation(instance)
-        representation['customer'] = CustomerSerializer(instance.customer).data
-        representation['assigned_sales_agent'] = SalesAgentSerializer(instance.assigned_sales_agent).data if instance.assigned_sales_agent else None
-        representation['services'] = ServiceSerializer(instance.services.all(), many=True).data
+        if self.is_expanded('customer'):
+            representation['customer'] = self.trim('customer', fragment_cache.representation(
+                CustomerSerializer, instance.customer, self.context
+            ))
+        if self.is_expanded('assigned_sales_agent'):
+            representation['assigned_sales_agent'] = self.trim('assigned_sales_agent', fragment_cache.representation(
+                SalesAgentSerializer, instance.assigned_sales_agent, self.context
+            ))
+        if self.is_expanded('services'):
+            representation['services'] = self.trim(
+                'services', service_catalog.representations(instance.services.all(), self.context)
+            )
         return representation
+
+
+class InquiryBulkListSerializer(BulkRelatedListSerializer):
+    """
+    List serializer that validates and creates a batch of inquiries with a fixed number of queries.
+
+    Related primary keys of the whole batch are resolved with one `IN` query per model (see
+    `BulkRelatedListSerializer`), the inquiries are inserted with `bulk_create` and all the
+    service links are written with a single `bulk_create` on the many-to-many through table,
+    inside one transaction. `bulk_create` sends no `post_save`, so the new inquiries are
+    added to the sync change log with one more INSERT, to the dashboard rollup with one
+    UPDATE per agent and status, and the cached analytics of their month are invalidated.
+
+    Methods:
+        create(validated_data): Inserts the inquiries and their service links in one transaction.
+    """
+
+    def create(self, validated_data):
+        """
+        Create all inquiries of the batch and link their services.
+
+        Args:
+            validated_data (list): The validated data of every item.
+
+        Returns:
+            list: The newly created Inquiry instances.
+        """
+        services_per_item = [item.pop('services') for item in validated_data]
+        through = Inquiries.services.through
+        with transaction.atomic():
+            inquiries = Inquiries.objects.bulk_create([Inquiries(**item) for item in validated_data])
+            through.objects.bulk_create([
+                through(inquiries_id=inquiry.pk, service_id=service.pk)
+                for inquiry, services in zip(inquiries, services_per_item)
+                for service in services
+            ])
+            log_created(inquiries)
+            count_created(inquiries)
+            bump_buckets(month_of(inquiry.created_at) for inquiry in inquiries)
+        return inquiries
+
+
+class InquiryBulkCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one item of a bulk inquiry payload.
+
+    Customer and service IDs are resolved for the whole batch at once by
+    `InquiryBulkListSerializer`, instead of one lookup per ID.
+
+    Attributes:
+        customer (BulkPrimaryKeyRelatedField): The ID of the customer making the inquiry.
+        services (BulkPrimaryKeyRelatedField): The IDs of the services related to the inquiry.
+    """
+    customer = BulkPrimaryKeyRelatedField(queryset=Customer.objects.all())
+    services = BulkPrimaryKeyRelatedField(queryset=Service.objects.all(), many=True)
+
+    class Meta:
+        model = Inquiries
+        fields = ['details', 'status', 'customer', 'services']
+        list_serializer_class = InquiryBulkListSerializer
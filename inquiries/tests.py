@@ -1,3 +1,261 @@
-from django.test import TestCase
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.testing import QueryBudgetTestCase
+from accounts.models import CustomUser
+from proposal.models import Proposals
+from .models import Inquiries
 
-# Create your tests here.
+
+class InquiryQueryBudgetTests(QueryBudgetTestCase):
+    """
+    The inquiry endpoints must load the nested customer, sales agent and services
+    in a constant number of queries, regardless of how many inquiries are returned.
+    """
+
+    def test_list_query_budget(self):
+        response = self.assertQueryBudget(2, 'get', '/api/inquiries/')
+        self.assertEqual(len(response.data['data']['results']), self.rows)
+        self.assertEqual(len(response.data['data']['results'][0]['services']), self.fan_out)
+
+    def test_list_query_budget_as_sales_agent(self):
+        self.client.force_authenticate(self.agent)
+        self.assertQueryBudget(2, 'get', '/api/inquiries/')
+
+    def test_retrieve_query_budget(self):
+        response = self.assertQueryBudget(2, 'get', f'/api/inquiries/{self.inquiries[0].pk}/')
+        self.assertEqual(response.data['data']['customer']['id'], self.customers[0].pk)
+
+    def test_export_query_budget(self):
+        response = self.assertQueryBudget(2, 'get', '/api/inquiries/export/')
+        rows = [json.loads(line) for line in response.streamed_content.decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [inquiry.pk for inquiry in self.inquiries])
+        self.assertEqual(len(rows[0]['services']), self.fan_out)
+
+    def test_bulk_create_query_budget(self):
+        payload = [
+            {'details': f'Bulk {i}', 'customer': customer.pk, 'services': [s.pk for s in self.services]}
+            for i, customer in enumerate(self.customers)
+        ]
+        # 2 lookups, 2 inserts, 1 change log insert, savepoint + release, 2 queries to render the result,
+        # and the admin's first dashboard rollup row: update, savepoint, insert and release
+        response = self.assertQueryBudget(13, 'post', '/api/inquiries/bulk/', payload, status_code=201)
+        created = response.data['data']
+        self.assertEqual([row['details'] for row in created], [item['details'] for item in payload])
+        self.assertEqual(len(created[0]['services']), self.fan_out)
+        self.assertEqual(created[0]['assigned_sales_agent']['username'], self.admin.username)
+
+    def test_bulk_create_reports_errors_per_item(self):
+        payload = [
+            {'details': 'Valid', 'customer': self.customers[0].pk, 'services': [self.services[0].pk]},
+            {'details': 'Invalid', 'customer': 0, 'services': [self.services[0].pk, 0]},
+        ]
+        response = self.client.post('/api/inquiries/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['data']
+        self.assertEqual(errors[0], {})
+        self.assertEqual(set(errors[1]), {'customer', 'services'})
+        self.assertEqual(Inquiries.objects.count(), self.rows)
+
+    def test_create_query_budget(self):
+        payload = {
+            'details': 'New inquiry',
+            'customer': self.customers[0].pk,
+            'services': [s.pk for s in self.services],
+        }
+        # 1 customer lookup and 1 lookup for all services, regardless of how many are submitted
+        self.assertQueryBudget(13, 'post', '/api/inquiries/', payload, status_code=201)
+
+    def test_create_reports_every_missing_service(self):
+        payload = {'details': 'New inquiry', 'customer': self.customers[0].pk, 'services': [self.services[0].pk, 998, 999]}
+        response = self.client.post('/api/inquiries/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['data']['services'], [
+            'Invalid pk "998" - object does not exist.',
+            'Invalid pk "999" - object does not exist.',
+        ])
+
+    def test_noop_partial_update_does_not_write(self):
+        inquiry = self.inquiries[0]
+        payload = {'status': inquiry.status, 'services': [s.pk for s in self.services]}
+        # the object lookup with its services prefetch, and 1 lookup to validate the services
+        self.assertQueryBudget(3, 'patch', f'/api/inquiries/{inquiry.pk}/', payload)
+
+    def test_partial_update_writes_only_changed_columns(self):
+        inquiry = self.inquiries[0]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/inquiries/{inquiry.pk}/', {'status': 'Closed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        updates = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('UPDATE "inquiries_inquiries"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "status" = ', updates[0])
+        self.assertNotIn('"details"', updates[0])
+
+    def test_partial_update_diffs_services(self):
+        inquiry = self.inquiries[0]
+        kept, removed = self.services[0], self.services[1]
+        payload = {'services': [kept.pk]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/inquiries/{inquiry.pk}/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(inquiry.services.values_list('pk', flat=True)), [kept.pk])
+        writes = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and 'sync_change' not in q['sql']
+        ]
+        # the link is deleted and only the modification timestamp of the inquiry is written
+        self.assertEqual(len(writes), 2)
+        self.assertIn('SET "updated_at" = ', writes[0])
+        self.assertNotIn('"status"', writes[0])
+        self.assertTrue(writes[1].startswith('DELETE'))
+        self.assertIn(str(removed.pk), writes[1])
+
+
+class InquirySearchTests(QueryBudgetTestCase):
+    """
+    `?search=` matches inquiry details through the full-text index, ranked by relevance.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.inquiries[0].details = 'Honeymoon trip to the Maldives'
+        cls.inquiries[0].save()
+        cls.inquiries[1].details = 'Maldives family trip, Maldives resort with Maldives diving'
+        cls.inquiries[1].save()
+
+    def search(self, term):
+        response = self.assertQueryBudget(2, 'get', '/api/inquiries/', {'search': term})
+        return [row['id'] for row in response.data['data']['results']]
+
+    def test_ranked_matches(self):
+        self.assertEqual(self.search('maldives'), [self.inquiries[1].pk, self.inquiries[0].pk])
+
+    def test_ranked_matches_paginate(self):
+        page = self.client.get('/api/inquiries/', {'search': 'maldives', 'page_size': 1}).data['data']
+        self.assertEqual([row['id'] for row in page['results']], [self.inquiries[1].pk])
+        page = self.client.get(page['next']).data['data']
+        self.assertEqual([row['id'] for row in page['results']], [self.inquiries[0].pk])
+        self.assertIsNone(page['next'])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search('honeymoon maldives'), [self.inquiries[0].pk])
+
+    def test_stemmed_match(self):
+        self.assertCountEqual(self.search('trips'), [self.inquiries[0].pk, self.inquiries[1].pk])
+
+    def test_updates_and_deletes_are_indexed(self):
+        self.inquiries[0].details = 'Safari in Kenya'
+        self.inquiries[0].save()
+        self.inquiries[1].delete()
+        self.assertEqual(self.client.get('/api/inquiries/', {'search': 'maldives'}).data['data'], [])
+        self.assertEqual(self.search('kenya'), [self.inquiries[0].pk])
+
+    def test_scoped_to_sales_agent(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        self.client.force_authenticate(other_agent)
+        response = self.client.get('/api/inquiries/', {'search': 'maldives'})
+        self.assertEqual(response.data['data'], [])
+
+
+class InquirySparseFieldsetTests(QueryBudgetTestCase):
+    """
+    `?fields=` and `?expand=` trim the inquiry representation and the queries behind it.
+    """
+
+    def test_fields_without_relations_query_only_inquiries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/inquiries/', {'fields': 'id,status'})
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['data']['results']
+        self.assertEqual(rows[0], {'id': self.inquiries[0].pk, 'status': self.inquiries[0].status})
+        [query] = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT "inquiries_inquiries"')]
+        self.assertNotIn('JOIN', query)
+
+    def test_dotted_field_expands_relation(self):
+        response = self.assertQueryBudget(1, 'get', '/api/inquiries/', {'fields': 'id,status,customer.name'})
+        row = response.data['data']['results'][0]
+        self.assertEqual(row, {
+            'id': self.inquiries[0].pk,
+            'status': self.inquiries[0].status,
+            'customer': {'name': self.customers[0].name},
+        })
+
+    def test_unexpanded_relations_are_primary_keys(self):
+        response = self.assertQueryBudget(2, 'get', f'/api/inquiries/{self.inquiries[0].pk}/', {'expand': 'customer'})
+        data = response.data['data']
+        self.assertEqual(data['customer']['id'], self.customers[0].pk)
+        self.assertEqual(data['assigned_sales_agent'], self.agent.pk)
+        self.assertCountEqual(data['services'], [service.pk for service in self.inquiries[0].services.all()])
+
+    def test_export_honours_fields(self):
+        response = self.assertQueryBudget(1, 'get', '/api/inquiries/export/', {'fields': 'id,customer'})
+        rows = [json.loads(line) for line in response.streamed_content.decode().splitlines()]
+        self.assertEqual(rows[0], {'id': self.inquiries[0].pk, 'customer': self.customers[0].pk})
+
+    def test_writes_ignore_fields(self):
+        response = self.client.patch(
+            f'/api/inquiries/{self.inquiries[0].pk}/?fields=id', {'details': 'Updated'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['customer']['id'], self.customers[0].pk)
+
+
+class InquiryConversionTests(QueryBudgetTestCase):
+    """
+    `convert-to-proposal` turns an inquiry into a priced proposal in one request.
+    """
+
+    def convert(self, inquiry, data=None, status_code=201, budget=None):
+        url = f'/api/inquiries/{inquiry.pk}/convert-to-proposal/'
+        if budget is not None:
+            return self.assertQueryBudget(budget, 'post', url, data, status_code=status_code).data
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status_code)
+        return response.data
+
+    def test_convert_query_budget(self):
+        inquiry = self.inquiries[0]
+        # the inquiry and its services; then, in one transaction, the proposal with its change log entry
+        # and rollup row, the lines, and the inquiry (its stored status read and locked first) with its
+        # change log entry and two rollup rows, the agent's first 'In Progress' row costing an update,
+        # savepoint, insert and release
+        data = self.convert(inquiry, {'details': 'Two weeks in Bali'}, budget=16)['data']
+        proposal = Proposals.objects.get(pk=data['id'])
+        self.assertEqual(data, {
+            'id': proposal.pk,
+            'inquiry': {'id': inquiry.pk, 'status': 'In Progress'},
+            'services': [service.pk for service in self.services],
+            'status': 'Pending',
+            'cost': '300.00',
+        })
+        self.assertEqual(proposal.details, 'Two weeks in Bali')
+        self.assertCountEqual(proposal.services.values_list('pk', flat=True), data['services'])
+        self.assertEqual(Inquiries.objects.get(pk=inquiry.pk).status, 'In Progress')
+
+    def test_details_default_to_the_inquiry(self):
+        data = self.convert(self.inquiries[0])['data']
+        self.assertEqual(Proposals.objects.get(pk=data['id']).details, self.inquiries[0].details)
+
+    def test_scoped_to_sales_agent(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        self.client.force_authenticate(other_agent)
+        self.convert(self.inquiries[0], status_code=404)
+        self.client.force_authenticate(self.agent)
+        self.convert(self.inquiries[0])
+
+    def test_inquiries_that_cannot_be_converted(self):
+        closed, empty = self.inquiries[0], self.inquiries[1]
+        Inquiries.objects.filter(pk=closed.pk).update(status='Closed')
+        empty.services.clear()
+        self.convert(closed, status_code=400)
+        self.convert(empty, status_code=400)
+        self.convert(self.inquiries[2], {'details': ''}, status_code=400)
+        self.assertEqual(Proposals.objects.count(), self.rows)
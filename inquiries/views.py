@@ -1,11 +1,20 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from .models import Inquiries
-from .serializers import InquirySerializer
+from .serializers import InquirySerializer, InquiryBulkCreateSerializer
 from accounts.permissions import IsAdminOrSalesAgent
-from .utils import custom_response  
+from core.envelope import custom_response
+from core.writes import batched_writes
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
+from core.sparse import SparseFieldsetViewMixin
+from core.export import EXPORT_CONTENT_TYPES, iter_serialized_rows, streaming_export_response
+from core.search import full_text_search
+from services.cache import get_catalog_version
+from proposal.conversion import convert_inquiry
 
-class InquiryViewSet(viewsets.ModelViewSet):
+class InquiryViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     A ViewSet for managing Inquiry data.
 
@@ -18,6 +27,8 @@ class InquiryViewSet(viewsets.ModelViewSet):
         serializer_class (InquirySerializer): The serializer class used for converting Inquiry instances to and from JSON.
         permission_classes (list): List of permission classes used to restrict access to the viewset's actions.
         queryset (QuerySet): The base queryset for the viewset.
+        eager_loading_actions (tuple): Actions whose querysets prefetch the nested customer, sales agent and services.
+        etag_related (tuple): Nested relations whose changes change the ETag of list and retrieve responses.
 
     Methods:
         get_queryset(): Returns the queryset based on the user's role. Admins see all inquiries, sales agents see only their assigned inquiries.
@@ -27,46 +38,76 @@ class InquiryViewSet(viewsets.ModelViewSet):
         update(request, *args, **kwargs): Update an existing inquiry. Admins can update any inquiry; sales agents can only update their assigned inquiries.
         partial_update(request, *args, **kwargs): Partially update an existing inquiry.
         destroy(request, *args, **kwargs): Delete an inquiry. Admins have full delete permissions; sales agents cannot delete inquiries.
+        export(request, *args, **kwargs): Stream all inquiries visible to the user as NDJSON or CSV.
+        bulk_create(request, *args, **kwargs): Create a batch of inquiries in one transaction.
+        convert_to_proposal(request, *args, **kwargs): Create a proposal from an inquiry and its services.
     """
     serializer_class = InquirySerializer
     permission_classes = [IsAdminOrSalesAgent]
     queryset = Inquiries.objects.all()
+    eager_loading_actions = ('list', 'retrieve', 'update', 'partial_update', 'export')
+    etag_related = ('customer', 'assigned_sales_agent')
+    export_chunk_size = 500
+    bulk_create_max_items = 1000
 
     def get_queryset(self):
         """
         Returns the queryset of inquiries based on the user's role.
 
         Admins can view all inquiries. Sales agents can only view inquiries assigned to them.
+        On the list action, `?search=` narrows the result to inquiries whose details match the
+        search term, ranked by relevance.
+        For actions that serialize inquiries, the nested relations are loaded up front so the
+        number of queries does not grow with the number of rows. With `?fields=` or `?expand=`,
+        only the rendered relations are loaded.
 
         Returns:
             QuerySet: The filtered queryset of inquiries.
         """        
         user = self.request.user
         if user.role == 'admin':
-            return Inquiries.objects.all()
+            queryset = Inquiries.objects.all()
         elif user.role == 'sales_agent':
-            return Inquiries.objects.filter(assigned_sales_agent=user)
-        return Inquiries.objects.none()
+            queryset = Inquiries.objects.filter(assigned_sales_agent=user.pk)
+        else:
+            return Inquiries.objects.none()
+
+        search = self.request.query_params.get('search')
+        if self.action == 'list' and search:
+            queryset = full_text_search(queryset, search)
+
+        if self.action in self.eager_loading_actions:
+            queryset = self.get_serializer_class().setup_eager_loading(queryset, **self.get_sparse_fieldset())
+        return queryset
+
+    def get_etag_versions(self):
+        # The nested services come from the service catalog.
+        return (get_catalog_version(),)
 
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of inquiries.
 
         Retrieves and returns a list of inquiries based on the user's role.
+        With `?search=<keywords>`, only inquiries whose details match are returned, best match first.
+        Results are returned one page at a time using keyset pagination (`?cursor=`, `?page_size=`).
+        `?fields=id,status,customer.name` limits the rendered fields and `?expand=customer,services`
+        selects the relations rendered as nested objects; the others are rendered as IDs.
 
         Args:
             request (Request): The HTTP request object.
 
         Returns:
-            Response: The HTTP response object containing the list of inquiries or an appropriate message.
+            Response: The HTTP response object containing a page of inquiries or an appropriate message.
         """
         queryset = self.get_queryset()
-        if queryset.exists():
-            serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        if page:
+            serializer = self.get_serializer(page, many=True)
             response_data = custom_response(
                 status_code=200,
                 message="Inquiries retrieved successfully.",
-                data=serializer.data
+                data=self.paginator.get_paginated_data(serializer.data)
             )
             return Response(response_data, status=status.HTTP_200_OK)
         else:
@@ -111,9 +152,13 @@ class InquiryViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """
         Save the inquiry with the assigned_sales_agent field set.
+
+        The current user always becomes the assigned sales agent. The user may be a token
+        user without a database row, so the foreign key is set by ID.
         """
         user = self.request.user
-        serializer.save(assigned_sales_agent=user)
+        serializer.validated_data.pop('assigned_sales_agent', None)
+        serializer.save(assigned_sales_agent_id=user.pk)
 
     def create(self, request, *args, **kwargs):
         """
@@ -253,10 +298,141 @@ class InquiryViewSet(viewsets.ModelViewSet):
             )
             return Response(response_data, status=status.HTTP_403_FORBIDDEN)
         
-        instance.delete()
+        # The proposals deleted with the inquiry are logged and counted together with it.
+        with batched_writes():
+            instance.delete()
         response_data = custom_response(
             status_code=200,
             message="Inquiry successfully deleted.",
             data=None
         )            
         return Response(response_data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every inquiry visible to the user as NDJSON or CSV.
+
+        The rows are scoped by `get_queryset`, read through a server-side cursor and
+        serialized chunk by chunk, so memory use stays flat no matter how many rows are exported.
+
+        Query Parameters:
+            output (str): `ndjson` (default) or `csv`.
+
+        Returns:
+            StreamingHttpResponse: The streamed export, or an error response for an unknown format.
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_CONTENT_TYPES:
+            response_data = custom_response(
+                status_code=400,
+                message=f"Unsupported export format. Use one of: {', '.join(EXPORT_CONTENT_TYPES)}.",
+                data=None
+            )
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = iter_serialized_rows(
+            self.get_queryset(),
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            chunk_size=self.export_chunk_size,
+        )
+        return streaming_export_response(rows, output, filename='inquiries')
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Create a batch of inquiries in one request.
+
+        The payload is a list of inquiry objects. Customer and service IDs of the whole batch are
+        validated with one query per model, and the inquiries and their service links are inserted
+        with batched INSERTs inside one transaction. If any item is invalid nothing is created and
+        the errors are reported per item, in the same order as the payload.
+
+        Args:
+            request (Request): The HTTP request object containing the list of inquiries.
+
+        Returns:
+            Response: The HTTP response object containing the created inquiries or the per-item errors.
+        """
+        serializer = InquiryBulkCreateSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=self.bulk_create_max_items,
+            context=self.get_serializer_context(),
+        )
+        if serializer.is_valid():
+            inquiries = serializer.save(assigned_sales_agent_id=request.user.pk)
+            queryset = InquirySerializer.setup_eager_loading(
+                Inquiries.objects.filter(pk__in=[inquiry.pk for inquiry in inquiries])
+            ).order_by('pk')
+            response_data = custom_response(
+                status_code=201,
+                message="Inquiries created successfully.",
+                data=InquirySerializer(queryset, many=True, context=self.get_serializer_context()).data
+            )
+            return Response(response_data, status=status.HTTP_201_CREATED)
+        else:
+            response_data = custom_response(
+                status_code=400,
+                message="Invalid or missing fields.",
+                data=serializer.errors
+            )
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['post'], url_path='convert-to-proposal')
+    def convert_to_proposal(self, request, *args, **kwargs):
+        """
+        Create a proposal from an inquiry in one request.
+
+        The proposal gets the inquiry's services, is priced from the service catalog and starts
+        as Pending; the inquiry moves to In Progress. Everything is written in one transaction,
+        the service links with one INSERT. The response only has the IDs of the proposal, its
+        services and inquiry, its cost and the statuses.
+
+        Args:
+            request (Request): The HTTP request object, optionally with the proposal `details`.
+
+        Returns:
+            Response: The HTTP response object containing the created proposal or an error message.
+        """
+        try:
+            inquiry = self.get_object()
+        except:
+            response_data = custom_response(
+                status_code=404,
+                message='Inquiry not found.',
+                data=None
+            )
+            return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+
+        services = list(inquiry.services.all())
+        details = request.data.get('details') if isinstance(request.data, dict) else None
+        if inquiry.status == 'Closed':
+            message = 'Closed inquiries cannot be converted to a proposal.'
+        elif not services:
+            message = 'The inquiry has no services to propose.'
+        elif len({service.currency for service in services}) > 1:
+            message = 'All services of a proposal must be priced in the same currency.'
+        elif details is not None and (not isinstance(details, str) or not details.strip()):
+            message = 'The proposal details must be a non-empty string.'
+        else:
+            message = None
+        if message:
+            response_data = custom_response(status_code=400, message=message, data=None)
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        proposal = convert_inquiry(inquiry, services, details)
+        response_data = custom_response(
+            status_code=201,
+            message="Proposal created successfully.",
+            data={
+                'id': proposal.pk,
+                'inquiry': {'id': inquiry.pk, 'status': inquiry.status},
+                'services': [service.pk for service in services],
+                'status': proposal.status,
+                'cost': str(proposal.cost),
+            }
+        )
+        return Response(response_data, status=status.HTTP_201_CREATED)
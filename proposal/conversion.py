@@ -0,0 +1,35 @@
+from django.db import transaction
+from .costing import proposal_cost
+from .models import Proposals, ProposalService
+
+CONVERTED_INQUIRY_STATUS = 'In Progress'
+
+
+def convert_inquiry(inquiry, services, details=None):
+    """
+    Create a Pending proposal for an inquiry, with the inquiry's services priced from the catalog.
+
+    The proposal, its lines (one INSERT) and the inquiry's move to 'In Progress' are written
+    in one transaction. The inquiry is cached on the proposal, so the write receivers do not
+    look it up again.
+
+    Args:
+        inquiry (Inquiries): The inquiry to convert.
+        services (list): The inquiry's services, with their prices.
+        details (str, optional): The proposal details; defaults to the inquiry's details.
+
+    Returns:
+        Proposals: The created proposal.
+    """
+    with transaction.atomic():
+        proposal = Proposals.objects.create(
+            inquiry=inquiry,
+            details=details or inquiry.details,
+            status='Pending',
+            cost=proposal_cost(services),
+        )
+        ProposalService.objects.bulk_create([ProposalService(proposals=proposal, service=service) for service in services])
+        if inquiry.status != CONVERTED_INQUIRY_STATUS:
+            inquiry.status = CONVERTED_INQUIRY_STATUS
+            inquiry.save(update_fields=['status', 'updated_at'])
+    return proposal
@@ -0,0 +1,166 @@
+from decimal import ROUND_HALF_UP, Decimal
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from analytics.buckets import bump_buckets, month_of
+from dashboard.rollup import RollupDeltas, to_decimal
+from sync.changes import log_changes
+from .models import Proposals, ProposalService
+
+HUNDRED = Decimal(100)
+CENT = Decimal('0.01')
+
+
+def quantize(total):
+    """
+    Round a summed `price * (100 - discount)` to the cost of a proposal.
+    """
+    return (to_decimal(total) / HUNDRED).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_total(price, price_override=None, discount=0):
+    """
+    Return `price * (100 - discount)` of one line, before dividing by 100 and rounding.
+
+    The price override replaces the service's price; a line without either costs nothing.
+    """
+    price = price_override if price_override is not None else price
+    if price is None:
+        return Decimal(0)
+    return to_decimal(price) * (HUNDRED - to_decimal(discount))
+
+
+def proposal_cost(services, adjustments=None):
+    """
+    Compute the cost of a proposal from loaded services, without a query.
+
+    Args:
+        services (iterable): The Service instances of the proposal.
+        adjustments (dict, optional): `(price_override, discount)` by service ID, for adjusted lines.
+
+    Returns:
+        Decimal: The cost, rounded to cents like `reprice` does.
+    """
+    adjustments = adjustments or {}
+    return quantize(sum(
+        (line_total(service.price, *adjustments.get(service.pk, (None, 0))) for service in services), Decimal(0)
+    ))
+
+
+def line_total_expression(prefix=''):
+    """
+    Return the SQL expression of `line_total` for the lines reached through `prefix`.
+
+    Nothing is divided in SQL: SQLite stores whole prices as integers and would divide them as such.
+    """
+    price = Coalesce(F(f'{prefix}price_override'), F(f'{prefix}service__price'), Value(Decimal(0)))
+    return ExpressionWrapper(
+        price * (Value(HUNDRED) - F(f'{prefix}discount')), output_field=DecimalField(max_digits=20, decimal_places=4)
+    )
+
+
+def reprice(queryset):
+    """
+    Recompute the cost of proposals from their lines with one aggregate query.
+
+    Only the proposals whose cost changed are written, with one `bulk_update`. As it sends
+    no signals, the changes are logged for sync, and moved in the dashboard rollup and the
+    cached revenue here.
+
+    Args:
+        queryset (QuerySet): The proposals to reprice.
+
+    Returns:
+        int: The number of proposals whose cost changed.
+    """
+    rows = queryset.order_by().values_list(
+        'pk', 'cost', 'status', 'created_at', 'inquiry__assigned_sales_agent_id',
+    ).annotate(computed=Sum(line_total_expression('lines__')))
+
+    now = timezone.now()
+    changed, changes, months = [], [], []
+    deltas = RollupDeltas()
+    for pk, cost, status, created_at, agent, computed in rows:
+        cost, computed = to_decimal(cost), quantize(computed or 0)
+        if computed == cost:
+            continue
+        changed.append(Proposals(pk=pk, cost=computed, updated_at=now))
+        changes.append((pk, agent))
+        months.append(month_of(created_at))
+        deltas.add('proposals', agent, status, 0, computed - cost)
+    if not changed:
+        return 0
+
+    with transaction.atomic(savepoint=False):
+        Proposals.objects.bulk_update(changed, ['cost', 'updated_at'])
+        log_changes('proposals', 'update', changes)
+        deltas.apply()
+    bump_buckets(months)
+    return len(changed)
+
+
+def reprice_open_proposals(batch_size=1000):
+    """
+    Reprice every open (Pending) proposal, `batch_size` proposals per transaction.
+
+    Accepted and rejected proposals keep the cost they were decided on.
+
+    Args:
+        batch_size (int): The number of proposals read and written per batch.
+
+    Returns:
+        int: The number of proposals whose cost changed.
+    """
+    repriced, last = 0, 0
+    while True:
+        ids = list(
+            Proposals.objects.filter(status='Pending', pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return repriced
+        repriced += reprice(Proposals.objects.filter(pk__in=ids))
+        last = ids[-1]
+
+
+def current_adjustments(proposal):
+    """
+    Return the `(price_override, discount)` of a proposal's adjusted lines, by service ID.
+
+    Reads the `adjusted_lines` prefetch when it was loaded.
+    """
+    lines = getattr(proposal, 'adjusted_lines', None)
+    if lines is None:
+        lines = adjusted(proposal.lines.all())
+    return {line.service_id: (line.price_override, line.discount) for line in lines}
+
+
+def adjusted(lines):
+    """
+    Narrow a queryset of lines to those with a price override or a discount.
+    """
+    return lines.exclude(price_override__isnull=True, discount=0)
+
+
+def write_adjustments(proposal, adjustments):
+    """
+    Store the price overrides and discounts of a proposal's lines with one `bulk_update`.
+
+    Lines missing from `adjustments` are reset to the service's price without a discount.
+
+    Args:
+        proposal (Proposals): The proposal, whose links are already saved.
+        adjustments (dict): `(price_override, discount)` by service ID.
+
+    Returns:
+        int: The number of lines written.
+    """
+    lines = []
+    for line in proposal.lines.all():
+        override, discount = adjustments.get(line.service_id, (None, Decimal(0)))
+        if line.price_override != override or line.discount != discount:
+            line.price_override, line.discount = override, discount
+            lines.append(line)
+    if lines:
+        ProposalService.objects.bulk_update(lines, ['price_override', 'discount'])
+    return len(lines)
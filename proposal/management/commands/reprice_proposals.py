@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from proposal.costing import reprice_open_proposals
+
+
+class Command(BaseCommand):
+    """
+    Recompute the cost of every open (Pending) proposal from the current service prices.
+
+    Proposals are repriced when a service's price changes or a service is deleted; run
+    this after catalog changes that send no signals (`queryset.update()`, `bulk_update`,
+    imports). Each batch costs one aggregate query and, when costs changed, one
+    `bulk_update`.
+    """
+    help = 'Reprice all open proposals from the service catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Proposals repriced per transaction (default: 1000).')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        repriced = reprice_open_proposals(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Repriced {repriced} open proposals.'))
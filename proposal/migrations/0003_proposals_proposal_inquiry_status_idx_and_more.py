@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0003_inquiries_inquiry_agent_id_idx_and_more'),
+        ('proposal', '0002_proposals_search_index'),
+        ('services', '0005_alter_service_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposals',
+            index=models.Index(fields=['inquiry', 'status'], name='proposal_inquiry_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposals',
+            index=models.Index(fields=['status', 'id'], name='proposal_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposals',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['inquiry'], name='proposal_pending_idx'),
+        ),
+    ]
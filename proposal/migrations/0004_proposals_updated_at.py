@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:58
+
+import django.utils.timezone
+from django.db import migrations, models
+from core.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite adds the column by rebuilding the table, which drops the full-text triggers.
+    install_search_index(schema_editor, 'proposal_proposals', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposal', '0003_proposals_proposal_inquiry_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposals',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='proposals',
+            index=models.Index(fields=['updated_at'], name='proposal_updated_idx'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:30
+
+from decimal import Decimal
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposal', '0005_proposals_created_at'),
+        ('services', '0010_replace_service_price'),
+    ]
+
+    operations = [
+        # The link table already exists: only the state moves to an explicit model.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ProposalService',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('proposals', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='proposal.proposals')),
+                        ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proposal_lines', to='services.service')),
+                    ],
+                    options={
+                        'db_table': 'proposal_proposals_services',
+                        'unique_together': {('proposals', 'service')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='proposals',
+                    name='services',
+                    field=models.ManyToManyField(through='proposal.ProposalService', to='services.service'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='proposalservice',
+            name='price_override',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0'))]),
+        ),
+        migrations.AddField(
+            model_name='proposalservice',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5, validators=[django.core.validators.MinValueValidator(Decimal('0')), django.core.validators.MaxValueValidator(Decimal('100'))]),
+        ),
+    ]
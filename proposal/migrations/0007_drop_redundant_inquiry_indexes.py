@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from core.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite alters the foreign key by rebuilding the table, which drops the full-text triggers.
+    install_search_index(schema_editor, 'proposal_proposals', 'details')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposal', '0006_proposalservice'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='proposals',
+            name='proposal_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='proposals',
+            name='inquiry',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='proposals', to='inquiries.inquiries'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proposal', '0007_drop_redundant_inquiry_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='proposals',
+            name='proposal_updated_idx',
+        ),
+    ]
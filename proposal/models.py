@@ -1,4 +1,6 @@
-from django.db import models
+from decimal import Decimal
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, router, transaction
 from inquiries.models import Inquiries
 from services.models import Service
 
@@ -10,9 +12,11 @@ class Proposals(models.Model):
         STATUS_CHOICES (list): A list of possible status choices for the proposal.
         inquiry (ForeignKey): The inquiry to which the proposal is related.
         details (TextField): Detailed description of the proposal.
-        services (ManyToManyField): The services included in the proposal.
+        services (ManyToManyField): The services included in the proposal, one `ProposalService` line each.
         status (CharField): Current status of the proposal, with choices including 'Pending', 'Accepted', and 'Rejected'.
-        cost (DecimalField): The cost associated with the proposal.
+        cost (DecimalField): The cost of the proposal, derived from its lines (see `proposal.costing`).
+        created_at (DateTimeField): When the proposal was created; analytics bucket revenue by it.
+        updated_at (DateTimeField): When the proposal was last saved, used to validate cached responses.
     """
     STATUS_CHOICES=[
         ('Pending','pending'),
@@ -20,12 +24,36 @@ class Proposals(models.Model):
         ('Rejected','rejected'),
     ]
     
-    inquiry = models.ForeignKey(Inquiries,on_delete=models.CASCADE,related_name='proposals')
+    # Not indexed on its own: `proposal_inquiry_status_idx` serves its lookups.
+    inquiry = models.ForeignKey(Inquiries,on_delete=models.CASCADE,related_name='proposals',db_index=False)
     details = models.TextField()
-    services = models.ManyToManyField(Service)
+    services = models.ManyToManyField(Service, through='ProposalService')
     status = models.CharField(max_length=10,choices=STATUS_CHOICES)
     cost = models.DecimalField(max_digits=10,decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Sales agents reach proposals through their inquiries, often filtered by status.
+            models.Index(fields=['inquiry', 'status'], name='proposal_inquiry_status_idx'),
+            # Dashboards list proposals by status in primary key order.
+            models.Index(fields=['status', 'id'], name='proposal_status_id_idx'),
+            # Revenue analytics read the accepted proposals created in a month.
+            models.Index(fields=['status', 'created_at'], name='proposal_status_created_idx'),
+        ]
     
+    def save(self, *args, **kwargs):
+        """
+        Save the proposal and run its `post_save` receivers in one transaction.
+
+        The pipeline rollup, change log and revenue buckets those receivers write cannot
+        drift from the row: a failure in any of them rolls the save back.
+        """
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         """
         Return a string representation of the proposal.
@@ -33,4 +61,35 @@ class Proposals(models.Model):
         Returns:
             str: A string representing the proposal, including the inquiry ID.
         """
-        return f'Proposal for Inquiry{self.inquiry.id}'
\ No newline at end of file
+        return f'Proposal for Inquiry{self.inquiry.id}'
+
+
+class ProposalService(models.Model):
+    """
+    One line of a proposal: a service it includes, with an optional price override and discount.
+
+    The table is the one Django created for `Proposals.services`, so the line fields keep the
+    names of the original link columns.
+
+    Attributes:
+        proposals (ForeignKey): The proposal the line belongs to.
+        service (ForeignKey): The service of the line.
+        price_override (DecimalField): The price charged instead of the service's price, if any.
+        discount (DecimalField): The discount on the line, in percent.
+    """
+    proposals = models.ForeignKey(Proposals, on_delete=models.CASCADE, related_name='lines')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='proposal_lines')
+    price_override = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(Decimal('0'))]
+    )
+    discount = models.DecimalField(
+        max_digits=5, decimal_places=2, default=0,
+        validators=[MinValueValidator(Decimal('0')), MaxValueValidator(Decimal('100'))],
+    )
+
+    class Meta:
+        db_table = 'proposal_proposals_services'
+        unique_together = [('proposals', 'service')]
+
+    def __str__(self):
+        return f'Service{self.service_id} in Proposal{self.proposals_id}'
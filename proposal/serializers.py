@@ -1,58 +1,195 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Proposals
+from .costing import adjusted, current_adjustments, proposal_cost, write_adjustments
+from .models import Proposals, ProposalService
 from services.models import Service
 from inquiries.models import Inquiries
-from services.serializers import ServiceSerializer
+from services.cache import service_catalog
 from inquiries.serializers import InquirySerializer
+from core.fields import BulkPrimaryKeyRelatedField
+from core.serializers import FragmentListSerializer, save_changed_fields
+from core.sparse import SparseFieldsetMixin, is_expanded, is_requested, nested_expand, nested_fields
 
-class ProposalSerializer(serializers.ModelSerializer):
-    services = serializers.PrimaryKeyRelatedField(queryset=Service.objects.all(), many=True)
-    inquiry = serializers.PrimaryKeyRelatedField(queryset=Inquiries.objects.all())
+class ProposalLineSerializer(serializers.ModelSerializer):
+    """
+    The price override and discount of one service of a proposal.
+    """
+    # The service is checked against the proposal's services, so it is not looked up again.
+    service = serializers.IntegerField(source='service_id')
+
+    class Meta:
+        model = ProposalService
+        fields = ['service', 'price_override', 'discount']
+
+
+class ProposalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    services = BulkPrimaryKeyRelatedField(queryset=Service.objects.all(), many=True)
+    inquiry = BulkPrimaryKeyRelatedField(queryset=Inquiries.objects.all())
+    # Rendered in `to_representation`: only the adjusted lines, from the `adjusted_lines` prefetch.
+    lines = ProposalLineSerializer(many=True, required=False, write_only=True)
 
     class Meta:
         model = Proposals
-        fields = ['id', 'inquiry', 'details', 'services', 'status', 'cost']
+        fields = ['id', 'inquiry', 'details', 'services', 'lines', 'status', 'cost']
+        read_only_fields = ['cost']
+        list_serializer_class = FragmentListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset, fields=None, expand=None):
+        """
+        Attach the joins and prefetches needed by `to_representation` to a queryset.
+
+        The nested inquiry graph (customer, sales agent and inquiry services) is loaded
+        through `InquirySerializer.setup_eager_loading` so both serializers stay in sync.
+        Relations that are not rendered, or rendered as primary keys, are not loaded.
+
+        Args:
+            queryset (QuerySet): The queryset of proposals that will be serialized.
+            fields (dict, optional): The requested fields tree; None renders every field.
+            expand (dict, optional): The expanded relations tree; None expands every relation.
+
+        Returns:
+            QuerySet: The queryset loading the rendered graph in a constant number of queries.
+        """
+        if is_expanded(fields, expand, 'inquiry'):
+            queryset = InquirySerializer.setup_eager_loading(
+                queryset.select_related('inquiry'), prefix='inquiry__',
+                fields=nested_fields(fields, 'inquiry'), expand=nested_expand(expand, 'inquiry'),
+            )
+        if is_expanded(fields, expand, 'services'):
+            queryset = queryset.prefetch_related('services')
+        elif is_requested(fields, 'services'):
+            queryset = queryset.prefetch_related(Prefetch('services', queryset=Service.objects.only('pk')))
+        if is_requested(fields, 'lines'):
+            queryset = queryset.prefetch_related(
+                Prefetch('lines', queryset=adjusted(ProposalService.objects.all()), to_attr='adjusted_lines')
+            )
+        return queryset
+
+    def validate(self, attrs):
+        """
+        Check that the services share one currency and that each line adjusts one of them, once.
+
+        Args:
+            attrs (dict): The validated fields.
+
+        Returns:
+            dict: The validated fields.
+        """
+        if 'services' in attrs:
+            services = attrs['services']
+        else:
+            services = self.instance.services.all() if self.instance else []
+        if 'services' in attrs and len({service.currency for service in services}) > 1:
+            raise serializers.ValidationError({'services': 'All services of a proposal must be priced in the same currency.'})
+        if 'lines' in attrs:
+            service_ids = {service.pk for service in services}
+            errors, seen = [], set()
+            for line in attrs['lines']:
+                service_id = line['service_id']
+                if service_id not in service_ids:
+                    errors.append(f'Service {service_id} is not one of the proposal\'s services.')
+                elif service_id in seen:
+                    errors.append(f'Service {service_id} is adjusted more than once.')
+                seen.add(service_id)
+            if errors:
+                raise serializers.ValidationError({'lines': errors})
+        return attrs
+
+    @staticmethod
+    def line_adjustments(lines):
+        return {
+            line['service_id']: (line.get('price_override'), line.get('discount', Decimal(0)))
+            for line in lines
+        }
 
     def create(self, validated_data):
         """
         Create a new Proposals instance.
 
+        The cost is computed from the submitted services and line adjustments, and the lines
+        are inserted with one query.
+
         Args:
             validated_data (dict): A dictionary containing the validated data for the proposal. 
-                                   This should include 'details', 'status', 'cost', and 'services'.
+                                   This should include 'details', 'status', 'services' and optionally 'lines'.
 
         Returns:
             Proposals: The created Proposals instance with associated services set.
         """
         services = validated_data.pop('services')
-        proposal = Proposals.objects.create(**validated_data)
-        proposal.services.set(services)
+        adjustments = self.line_adjustments(validated_data.pop('lines', []))
+        validated_data['cost'] = proposal_cost(services, adjustments)
+        with transaction.atomic():
+            proposal = Proposals.objects.create(**validated_data)
+            lines = ProposalService.objects.bulk_create([
+                ProposalService(proposals=proposal, service=service, **dict(zip(
+                    ('price_override', 'discount'), adjustments.get(service.pk, (None, Decimal(0)))
+                )))
+                for service in services
+            ])
+        proposal.adjusted_lines = [line for line in lines if line.service_id in adjustments]
         return proposal
 
     def update(self, instance, validated_data):
         """
         Update an existing Proposals instance.
 
+        Only the fields whose values changed are written, and the services are updated by
+        adding and removing the changed links. When the services or lines change, the cost is
+        recomputed from the prefetched services and lines. Submitted lines replace the
+        adjustments of every line. A request that changes nothing does not write to the database.
+
         Args:
             instance (Proposals): The Proposals instance to update.
             validated_data (dict): A dictionary containing the updated data. 
-                                   This may include 'details', 'status', 'cost', 'inquiry', and 'services'.
+                                   This may include 'details', 'status', 'inquiry', 'services' and 'lines'.
 
         Returns:
             Proposals: The updated Proposals instance.
         """
-        instance.details = validated_data.get('details', instance.details)
-        instance.status = validated_data.get('status', instance.status)
-        instance.cost = validated_data.get('cost', instance.cost)
+        lines = validated_data.pop('lines', None)
+        if 'services' not in validated_data and lines is None:
+            save_changed_fields(instance, validated_data)
+            return instance
 
-        if 'inquiry' in validated_data:
-            instance.inquiry = validated_data['inquiry']
+        services = validated_data.get('services', instance.services.all())
+        service_ids = {service.pk for service in services}
+        adjustments = current_adjustments(instance) if lines is None else self.line_adjustments(lines)
+        adjustments = {pk: adjustment for pk, adjustment in adjustments.items() if pk in service_ids}
+        validated_data['cost'] = proposal_cost(services, adjustments)
+        if lines is None:
+            save_changed_fields(instance, validated_data)
+        else:
+            with transaction.atomic():
+                changed = save_changed_fields(instance, validated_data)
+                if write_adjustments(instance, adjustments) and not changed:
+                    # The cost did not change, but the proposal did: its timestamp marks it for sync and caches.
+                    instance.save(update_fields=['updated_at'])
+        instance.adjusted_lines = [
+            ProposalService(proposals=instance, service_id=pk, price_override=override, discount=discount)
+            for pk, (override, discount) in adjustments.items()
+            if override is not None or discount
+        ]
+        return instance
 
-        if 'services' in validated_data:
-            instance.services.set(validated_data['services'])
+    def prime_fragments(self, proposals):
+        """
+        Load the cached fragments nested in the inquiries of many proposals at once.
 
-        instance.save()
-        return instance
+        Args:
+            proposals (list): The Proposals instances about to be serialized.
+        """
+        if self.is_expanded('inquiry'):
+            self.inquiry_serializer().prime_fragments([proposal.inquiry for proposal in proposals])
+
+    def inquiry_serializer(self, instance=None):
+        return InquirySerializer(
+            instance, context=self.context,
+            fields=self.nested_fields('inquiry'), expand=self.nested_expand('inquiry'),
+        )
 
     def to_representation(self, instance):
         """
@@ -62,9 +199,19 @@ class ProposalSerializer(serializers.ModelSerializer):
             instance (Proposals): The Proposals instance to serialize.
 
         Returns:
-            dict: A dictionary representing the serialized data, including detailed inquiry and services.
+            dict: A dictionary representing the serialized data, including detailed inquiry and services
+                unless they are not expanded.
         """
         representation = super().to_representation(instance)
-        representation['inquiry'] = InquirySerializer(instance.inquiry).data
-        representation['services'] = ServiceSerializer(instance.services.all(), many=True).data
+        if 'lines' in self.fields:
+            lines = getattr(instance, 'adjusted_lines', None)
+            if lines is None:
+                lines = adjusted(instance.lines.all())
+            representation['lines'] = ProposalLineSerializer(sorted(lines, key=lambda line: line.service_id), many=True).data
+        if self.is_expanded('inquiry'):
+            representation['inquiry'] = self.inquiry_serializer(instance.inquiry).data
+        if self.is_expanded('services'):
+            representation['services'] = self.trim(
+                'services', service_catalog.representations(instance.services.all(), self.context)
+            )
         return representation
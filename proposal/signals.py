@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from dashboard.rollup import to_decimal
+from services.models import Service
+from .costing import reprice
+from .models import Proposals, ProposalService
+
+_UNKNOWN = object()
+
+
+def open_proposals_of(service_id):
+    """
+    Return the open (Pending) proposals with a line for a service.
+    """
+    lines = ProposalService.objects.filter(service_id=service_id).values('proposals_id')
+    return Proposals.objects.filter(status='Pending', pk__in=lines)
+
+
+def remember_price(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred price is not loaded.
+    instance._costing_price = instance.__dict__.get('price', _UNKNOWN)
+
+
+def service_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Reprice the open proposals of a service whose price changed.
+    """
+    previous, instance._costing_price = instance._costing_price, instance.price
+    if raw or created:
+        return
+    # A service without a price costs nothing, like a price of 0.
+    if previous is not _UNKNOWN and to_decimal(previous) == to_decimal(instance.price):
+        return
+    reprice(open_proposals_of(instance.pk))
+
+
+def remember_open_proposals(sender, instance, **kwargs):
+    # The lines are deleted with the service, so its proposals are found before.
+    instance._costing_proposals = list(open_proposals_of(instance.pk).values_list('pk', flat=True))
+
+
+def service_deleted(sender, instance, **kwargs):
+    """
+    Reprice the open proposals that lost a line with a deleted service.
+    """
+    if instance._costing_proposals:
+        reprice(Proposals.objects.filter(pk__in=instance._costing_proposals))
+
+
+post_init.connect(remember_price, sender=Service, dispatch_uid='costing_remember_price')
+post_save.connect(service_saved, sender=Service, dispatch_uid='costing_service_saved')
+pre_delete.connect(remember_open_proposals, sender=Service, dispatch_uid='costing_remember_open_proposals')
+post_delete.connect(service_deleted, sender=Service, dispatch_uid='costing_service_deleted')
@@ -1,3 +1,208 @@
-from django.test import TestCase
+import json
+import warnings
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from accounts.models import CustomUser
+from core.testing import QueryBudgetTestCase
+from services.models import Service
+from sync.models import Change
+from .costing import current_adjustments, proposal_cost, reprice
+from .models import Proposals, ProposalService
+from .serializers import ProposalLineSerializer
 
-# Create your tests here.
+
+class ProposalQueryBudgetTests(QueryBudgetTestCase):
+    """
+    The proposal endpoints must load the nested inquiry graph and services in a
+    constant number of queries, regardless of how many proposals are returned.
+    """
+
+    def test_list_query_budget(self):
+        response = self.assertQueryBudget(4, 'get', '/api/proposals/')
+        self.assertEqual(len(response.data['data']['results']), self.rows)
+        self.assertEqual(len(response.data['data']['results'][0]['inquiry']['services']), self.fan_out)
+
+    def test_list_query_budget_as_sales_agent(self):
+        self.client.force_authenticate(self.agent)
+        self.assertQueryBudget(4, 'get', '/api/proposals/')
+
+    def test_retrieve_query_budget(self):
+        response = self.assertQueryBudget(4, 'get', f'/api/proposals/{self.proposals[0].pk}/')
+        self.assertEqual(response.data['data']['inquiry']['id'], self.inquiries[0].pk)
+
+    def test_export_is_scoped_to_sales_agent(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        self.client.force_authenticate(other_agent)
+        response = self.assertQueryBudget(1, 'get', '/api/proposals/export/')
+        self.assertEqual(response.streamed_content, b'')
+
+    def test_export_query_budget(self):
+        response = self.assertQueryBudget(4, 'get', '/api/proposals/export/')
+        rows = [json.loads(line) for line in response.streamed_content.decode().splitlines()]
+        self.assertEqual(len(rows), self.rows)
+        self.assertEqual(len(rows[0]['inquiry']['services']), self.fan_out)
+
+    def test_create_query_budget(self):
+        payload = {
+            'inquiry': self.inquiries[0].pk,
+            'details': 'New proposal',
+            'services': [s.pk for s in self.services],
+            'status': 'Pending',
+        }
+        # 1 inquiry lookup and 1 lookup for all services, regardless of how many are submitted,
+        # and the lines inserted with one query
+        self.assertQueryBudget(14, 'post', '/api/proposals/', payload, status_code=201)
+
+    def test_noop_partial_update_does_not_write(self):
+        proposal = self.proposals[0]
+        payload = {'status': proposal.status, 'inquiry': proposal.inquiry_id}
+        # the object lookup with its prefetches, and 1 lookup to validate the inquiry
+        self.assertQueryBudget(5, 'patch', f'/api/proposals/{proposal.pk}/', payload)
+
+    def test_search_details(self):
+        self.proposals[2].details = 'Ski chalet package in the Alps'
+        self.proposals[2].save()
+        response = self.assertQueryBudget(4, 'get', '/api/proposals/', {'search': 'alps chalet'})
+        self.assertEqual([row['id'] for row in response.data['data']['results']], [self.proposals[2].pk])
+
+
+class ProposalSparseFieldsetTests(QueryBudgetTestCase):
+    """
+    `?fields=` and `?expand=` trim the proposal representation and the queries behind it.
+    """
+
+    def test_unexpanded_inquiry_is_not_loaded(self):
+        response = self.assertQueryBudget(1, 'get', '/api/proposals/', {'fields': 'id,inquiry,status'})
+        row = response.data['data']['results'][0]
+        self.assertEqual(row, {'id': self.proposals[0].pk, 'inquiry': self.inquiries[0].pk, 'status': self.proposals[0].status})
+
+    def test_nested_expand(self):
+        response = self.assertQueryBudget(
+            4, 'get', f'/api/proposals/{self.proposals[0].pk}/', {'expand': 'inquiry.customer'}
+        )
+        data = response.data['data']
+        self.assertEqual(data['inquiry']['id'], self.inquiries[0].pk)
+        self.assertEqual(data['inquiry']['customer']['id'], self.customers[0].pk)
+        self.assertEqual(data['inquiry']['assigned_sales_agent'], self.agent.pk)
+        self.assertTrue(all(isinstance(pk, int) for pk in data['inquiry']['services']))
+        self.assertTrue(all(isinstance(pk, int) for pk in data['services']))
+
+    def test_nested_fields(self):
+        response = self.assertQueryBudget(1, 'get', '/api/proposals/', {'fields': 'id,inquiry.status'})
+        row = response.data['data']['results'][0]
+        self.assertEqual(row, {'id': self.proposals[0].pk, 'inquiry': {'status': self.inquiries[0].status}})
+
+
+class ProposalCostingTests(QueryBudgetTestCase):
+    """
+    Proposal costs are derived from the service prices and the line adjustments.
+    """
+
+    def create(self, **payload):
+        payload = {
+            'inquiry': self.inquiries[0].pk, 'details': 'Costed', 'status': 'Pending',
+            'services': [s.pk for s in self.services], **payload,
+        }
+        return self.client.post('/api/proposals/', payload, format='json')
+
+    def test_cost_is_derived_from_service_prices(self):
+        response = self.create(cost='1.00')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['data']['cost'], '300.00')
+        self.assertEqual(response.data['data']['lines'], [])
+
+    def test_lines_override_prices_and_discount(self):
+        response = self.create(lines=[
+            {'service': self.services[0].pk, 'price_override': '80.00'},
+            {'service': self.services[1].pk, 'discount': '12.5'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        data = response.data['data']
+        self.assertEqual(data['cost'], '267.50')
+        self.assertEqual(data['lines'], [
+            {'service': self.services[0].pk, 'price_override': '80.00', 'discount': '0.00'},
+            {'service': self.services[1].pk, 'price_override': None, 'discount': '12.50'},
+        ])
+        self.assertEqual(self.client.get(f"/api/proposals/{data['id']}/").data['data']['lines'], data['lines'])
+
+    def test_line_bounds_are_decimals(self):
+        # DRF warns when a DecimalField is bounded by an int or a float.
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            fields = ProposalLineSerializer().fields
+        self.assertEqual(fields['price_override'].min_value, Decimal('0'))
+        self.assertEqual((fields['discount'].min_value, fields['discount'].max_value), (Decimal('0'), Decimal('100')))
+
+    def test_lines_must_adjust_the_proposal_services(self):
+        response = self.create(services=[self.services[0].pk], lines=[{'service': self.services[1].pk, 'discount': '10'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('lines', response.data['data'])
+
+    def test_services_must_share_a_currency(self):
+        euro = Service.objects.create(name='Euro service', description='Test service', price='100', currency='EUR')
+        response = self.create(services=[self.services[0].pk, euro.pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('services', response.data['data'])
+
+    def test_changing_services_keeps_adjustments(self):
+        proposal = self.proposals[0]
+        url = f'/api/proposals/{proposal.pk}/'
+        response = self.client.patch(url, {'lines': [{'service': self.services[0].pk, 'discount': '50'}]}, format='json')
+        self.assertEqual(response.data['data']['cost'], '250.00')
+        response = self.client.patch(url, {'services': [self.services[0].pk, self.services[2].pk]}, format='json')
+        self.assertEqual(response.data['data']['cost'], '150.00')
+        self.assertEqual(len(response.data['data']['lines']), 1)
+
+    def test_price_change_reprices_open_proposals(self):
+        accepted = self.proposals[1]
+        Proposals.objects.filter(pk=accepted.pk).update(status='Accepted')
+        changes = Change.objects.count()
+        service = self.services[0]
+        service.price = Decimal('150.00')
+        service.save()
+        costs = dict(Proposals.objects.values_list('pk', 'cost'))
+        self.assertEqual(costs[self.proposals[0].pk], Decimal('350.00'))
+        self.assertEqual(costs[accepted.pk], Decimal('100.00'))
+        self.assertEqual(Change.objects.filter(resource='proposals', action='update').count(), self.rows - 1)
+        self.assertGreater(Change.objects.count(), changes)
+
+    def test_unchanged_price_does_not_reprice(self):
+        service = Service.objects.get(pk=self.services[0].pk)
+        service.name = 'Renamed'
+        with self.assertNumQueries(2):
+            # the update and the sync entry of the service
+            service.save()
+
+    def test_sql_and_python_costs_agree(self):
+        service = self.services[0]
+        service.price = Decimal('33.33')
+        service.save()
+        ProposalService.objects.filter(proposals=self.proposals[0], service=service).update(discount=Decimal('15'))
+        ProposalService.objects.filter(proposals=self.proposals[0], service=self.services[1]).update(
+            price_override=Decimal('19.99'), discount=Decimal('33.33'),
+        )
+        reprice(Proposals.objects.filter(pk=self.proposals[0].pk))
+        proposal = Proposals.objects.get(pk=self.proposals[0].pk)
+        self.assertEqual(proposal.cost, proposal_cost(proposal.services.all(), current_adjustments(proposal)))
+        self.assertEqual(proposal.cost, Decimal('141.66'))
+
+    def test_reprice_command(self):
+        Proposals.objects.update(cost=0)
+        out = StringIO()
+        with self.assertNumQueries(6):
+            # per batch: the IDs and the aggregate, and one bulk update, change log insert and rollup update;
+            # then the empty last batch
+            call_command('reprice_proposals', batch_size=10, stdout=out)
+        self.assertIn(f'Repriced {self.rows} open proposals', out.getvalue())
+        self.assertEqual(set(Proposals.objects.values_list('cost', flat=True)), {Decimal('300.00')})
+
+    def test_currency_cannot_change_on_open_proposals(self):
+        url = f'/api/services/{self.services[0].pk}/'
+        response = self.client.patch(url, {'currency': 'EUR'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('currency', response.data['data'])
+        Proposals.objects.update(status='Accepted')
+        self.assertEqual(self.client.patch(url, {'currency': 'EUR'}, format='json').status_code, 200)
@@ -1,39 +1,71 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from .models import Proposals
 from .serializers import ProposalSerializer
 from accounts.permissions import IsAdminOrSalesAgent
-from .utils import custom_response  
+from core.envelope import custom_response
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
+from core.sparse import SparseFieldsetViewMixin
+from core.export import EXPORT_CONTENT_TYPES, iter_serialized_rows, streaming_export_response
+from core.search import full_text_search
+from services.cache import get_catalog_version
 
-class ProposalViewSet(viewsets.ModelViewSet):
+class ProposalViewSet(SparseFieldsetViewMixin, ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ProposalViewSet to manage proposal data. 
     """    
     serializer_class = ProposalSerializer
     permission_classes = [IsAdminOrSalesAgent]
     queryset = Proposals.objects.all()
+    eager_loading_actions = ('list', 'retrieve', 'update', 'partial_update', 'export')
+    etag_related = ('inquiry', 'inquiry__customer', 'inquiry__assigned_sales_agent')
+    export_chunk_size = 500
 
     def get_queryset(self):
         """
         Retrieve a queryset of proposals based on user role.
         
         Admins have full access, while sales agents can only access proposals related to their inquiries.
+        On the list action, `?search=` narrows the result to proposals whose details match the
+        search term, ranked by relevance.
+        For actions that serialize proposals, the nested inquiry graph and services are loaded up
+        front so the number of queries does not grow with the number of rows. With `?fields=` or
+        `?expand=`, only the rendered relations are loaded.
         
         Returns:
             QuerySet: A queryset of `Proposals` objects.
         """        
         user = self.request.user
         if user.role == 'admin':
-            return Proposals.objects.all()
+            queryset = Proposals.objects.all()
         elif user.role == 'sales_agent':
-            return Proposals.objects.filter(inquiry__assigned_sales_agent=user)
-        return Proposals.objects.none()
+            queryset = Proposals.objects.filter(inquiry__assigned_sales_agent=user.pk)
+        else:
+            return Proposals.objects.none()
+
+        search = self.request.query_params.get('search')
+        if self.action == 'list' and search:
+            queryset = full_text_search(queryset, search)
+
+        if self.action in self.eager_loading_actions:
+            queryset = self.get_serializer_class().setup_eager_loading(queryset, **self.get_sparse_fieldset())
+        return queryset
+
+    def get_etag_versions(self):
+        # The nested services come from the service catalog.
+        return (get_catalog_version(),)
 
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of proposals.
 
         Admin can retrieve all proposals, while sales agents can only retrieve proposals they created.
+        With `?search=<keywords>`, only proposals whose details match are returned, best match first.
+        Results are returned one page at a time using keyset pagination (`?cursor=`, `?page_size=`).
+        `?fields=` limits the rendered fields and `?expand=inquiry.customer,services` selects the
+        relations rendered as nested objects; the others are rendered as IDs.
         
         Args:
             request (Request): The request object.
@@ -42,12 +74,13 @@ class ProposalViewSet(viewsets.ModelViewSet):
             Response: A response containing a list of proposals or a message if no proposals are found.
         """
         queryset = self.get_queryset()
-        if queryset.exists():
-            serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        if page:
+            serializer = self.get_serializer(page, many=True)
             response_data = custom_response(
                 status_code=200,
                 message="Proposals retrieved successfully.",
-                data=serializer.data
+                data=self.paginator.get_paginated_data(serializer.data)
             )
             return Response(response_data, status=status.HTTP_200_OK)
         else:
@@ -242,3 +275,35 @@ class ProposalViewSet(viewsets.ModelViewSet):
             data=None
         )            
         return Response(response_data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every proposal visible to the user as NDJSON or CSV.
+
+        The rows are scoped by `get_queryset`, read through a server-side cursor and
+        serialized chunk by chunk, so memory use stays flat no matter how many rows are exported.
+
+        Query Parameters:
+            output (str): `ndjson` (default) or `csv`.
+
+        Returns:
+            StreamingHttpResponse: The streamed export, or an error response for an unknown format.
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_CONTENT_TYPES:
+            response_data = custom_response(
+                status_code=400,
+                message=f"Unsupported export format. Use one of: {', '.join(EXPORT_CONTENT_TYPES)}.",
+                data=None
+            )
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = iter_serialized_rows(
+            self.get_queryset(),
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            chunk_size=self.export_chunk_size,
+        )
+        return streaming_export_response(rows, output, filename='proposals')
+
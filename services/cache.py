@@ -0,0 +1,140 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from core.fragments import fragment_cache
+from .serializers import ServiceSerializer
+
+CATALOG_VERSION_KEY = 'services:catalog-version'
+
+
+def get_catalog_version():
+    """
+    Return the current version of the service catalog.
+
+    The version lives in the shared cache so every worker sees a bump. When the key is
+    missing (first use or eviction) it starts from the current time, so it never goes back
+    to a version an in-process cache may still hold.
+
+    Returns:
+        int: The catalog version.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Invalidate everything cached for the current catalog version.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+    service_catalog.clear()
+
+
+class ServiceCatalog:
+    """
+    Caches of the service catalog, all keyed on the catalog version.
+
+    - Rendered responses: the JSON bytes of `ServiceViewSet` list pages and details, in the
+      shared cache for `SERVICE_CATALOG_CACHE_TTL` seconds.
+    - Representations: `ServiceSerializer` output by primary key, in an in-process LRU of at
+      most `SERVICE_CATALOG_LRU_SIZE` entries, used for the services nested in inquiries
+      and proposals. Misses are read from the shared fragment cache (`core.fragments`).
+
+    Saving or deleting a `Service` bumps the version (see `services.signals`); entries of
+    older versions are never read again and expire or are evicted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._representations = OrderedDict()
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._representations.clear()
+
+    def rendered_key(self, name, version):
+        digest = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+        return f'services:rendered:{version}:{digest}'
+
+    def get_rendered(self, name):
+        """
+        Return a rendered response stored with `set_rendered`, or None.
+
+        Args:
+            name (str): What was rendered, e.g. the absolute URL of the request.
+
+        Returns:
+            tuple: The stored `(status_code, message, data)`.
+        """
+        return cache.get(self.rendered_key(name, get_catalog_version()))
+
+    def set_rendered(self, name, value, version):
+        """
+        Store a rendered response for the catalog version it was built from.
+
+        Args:
+            name (str): What was rendered, e.g. the absolute URL of the request.
+            value (tuple): The `(status_code, message, data)` to store, `data` being JSON bytes.
+            version (int): The catalog version read before the services were queried.
+        """
+        cache.set(self.rendered_key(name, version), value, settings.SERVICE_CATALOG_CACHE_TTL)
+
+    def representations(self, services, context=None):
+        """
+        Serialize services, reusing the representations cached for the current version.
+
+        Args:
+            services (iterable): `Service` instances, usually prefetched.
+            context (dict, optional): The calling serializer's context. The catalog version is
+                read once and kept there, so serializing many rows reads it only once.
+
+        Returns:
+            list: The `ServiceSerializer` representation of each service, in order.
+        """
+        services = list(services)
+        if context is not None and 'service_catalog_version' in context:
+            version = context['service_catalog_version']
+        else:
+            version = get_catalog_version()
+            if context is not None:
+                context['service_catalog_version'] = version
+        cached = {}
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._version = version
+                self._representations.clear()
+            # A request still on an older version bypasses the cache.
+            if version == self._version:
+                for service in services:
+                    representation = self._representations.get(service.pk)
+                    if representation is not None:
+                        self._representations.move_to_end(service.pk)
+                        cached[service.pk] = representation
+
+        missing = [service for service in services if service.pk not in cached]
+        if missing:
+            for service, representation in zip(missing, fragment_cache.representations(ServiceSerializer, missing)):
+                cached[service.pk] = representation
+            with self._lock:
+                if version == self._version:
+                    for service in missing:
+                        self._representations[service.pk] = cached[service.pk]
+                    while len(self._representations) > settings.SERVICE_CATALOG_LRU_SIZE:
+                        self._representations.popitem(last=False)
+
+        # Copies, so callers may change their representation without touching the cache.
+        return [dict(cached[service.pk]) for service in services]
+
+
+service_catalog = ServiceCatalog()
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-17 00:11
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_created_at(apps, schema_editor):
+    # Existing rows were created at some point before their last save.
+    apps.get_model('services', 'Service').objects.update(created_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_service_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+    ]
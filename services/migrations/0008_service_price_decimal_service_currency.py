@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_service_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='price_decimal',
+            field=models.DecimalField(blank=True, decimal_places=2, default=None, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='currency',
+            field=models.CharField(default='USD', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}$', 'Enter a three-letter ISO 4217 currency code, e.g. USD.')]),
+        ),
+    ]
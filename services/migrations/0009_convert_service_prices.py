@@ -0,0 +1,124 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:06
+"""
+Convert the free-text service prices to decimal amounts and currency codes.
+
+The conversion loses data: text that is not one non-negative amount of at most MAX_PRICE
+(ranges, '2 x 300', 'On request', ...) gets no price. Those services keep their text, which
+0010 moves to `legacy_price` until it is reviewed, and each one is logged with its primary
+key. The text of the services that converted cleanly is dropped.
+"""
+
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from django.db import migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+MAX_PRICE = Decimal('99999999.99')
+SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY'}
+CURRENCIES = {'AED', 'AUD', 'CAD', 'CHF', 'CNY', 'EUR', 'GBP', 'INR', 'JPY', 'NZD', 'SGD', 'THB', 'USD', 'ZAR'}
+
+
+# One amount, optionally with a currency symbol or code before or after it. Thousands are
+# grouped with commas ('1,250.50') or, with a decimal comma, with dots ('1.250,50').
+PRICE = re.compile(
+    r'(?P<prefix>[^\d\s.,]{1,3})?\s*'
+    r'(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d{1,3}(?:\.\d{3})+,\d{1,2}|\d+(?:[.,]\d{1,2})?)'
+    r'\s*(?P<suffix>[^\d\s.,]{1,3})?'
+)
+
+
+def currency_of(token):
+    return SYMBOLS.get(token) or (token if token in CURRENCIES else None)
+
+
+def parse_price(text):
+    """
+    Parse a free-text price such as '100', '1,250.50', '1.250,50', '$99' or 'EUR 80'.
+
+    Returns:
+        tuple: The amount and the currency code, each None when not found. Text that is not
+            a single non-negative amount (ranges, negatives, '2 x 300') gives no amount.
+    """
+    if not text:
+        return None, None
+    text = text.strip().upper()
+    currency = next((code for code in re.findall(r'[A-Z]{3}', text) if code in CURRENCIES), None)
+    currency = currency or next((code for symbol, code in SYMBOLS.items() if symbol in text), None)
+    match = PRICE.fullmatch(text)
+    if not match:
+        return None, currency
+    prefix, suffix = match['prefix'], match['suffix']
+    if (prefix and not currency_of(prefix)) or (suffix and not currency_of(suffix)) or (prefix and suffix):
+        return None, currency
+    number = match['number']
+    if re.fullmatch(r'[\d.]+,\d{1,2}', number):
+        # A decimal comma, possibly after dots grouping the thousands.
+        number = number.replace('.', '').replace(',', '.')
+    else:
+        number = number.replace(',', '')
+    try:
+        amount = Decimal(number).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None, currency
+    return (amount if amount <= MAX_PRICE else None), currency
+
+
+def convert_prices(apps, schema_editor):
+    """
+    Fill the decimal price and the currency from the text price, one batch of services at a time.
+
+    Each batch is committed on its own, so no lock is held on the whole table. The text is
+    cleared once converted; text that could not be converted is kept and logged.
+    """
+    Service = apps.get_model('services', 'Service')
+    last, unconverted = 0, 0
+    while True:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            batch = list(Service.objects.filter(pk__gt=last).order_by('pk').only('pk', 'price', 'currency')[:BATCH_SIZE])
+            if not batch:
+                break
+            for service in batch:
+                service.price_decimal, currency = parse_price(service.price)
+                service.currency = currency or service.currency
+                if service.price_decimal is not None or not (service.price or '').strip():
+                    service.price = None
+                else:
+                    unconverted += 1
+                    logger.warning('Service %s: price %r was not converted, it is kept in legacy_price.', service.pk, service.price)
+            Service.objects.bulk_update(batch, ['price_decimal', 'currency', 'price'])
+        last = batch[-1].pk
+    if unconverted:
+        logger.warning('%d service prices were not converted and are left without a price.', unconverted)
+
+
+def restore_prices(apps, schema_editor):
+    Service = apps.get_model('services', 'Service')
+    last = 0
+    while True:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            batch = list(
+                Service.objects.filter(pk__gt=last).order_by('pk').only('pk', 'price', 'price_decimal')[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for service in batch:
+                if service.price is None and service.price_decimal is not None:
+                    service.price = str(service.price_decimal)
+            Service.objects.bulk_update(batch, ['price'])
+        last = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    # Batches commit separately instead of converting the catalog in one transaction.
+    atomic = False
+
+    dependencies = [
+        ('services', '0008_service_price_decimal_service_currency'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_prices, restore_prices),
+    ]
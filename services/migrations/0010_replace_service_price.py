@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:07
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_convert_service_prices'),
+    ]
+
+    operations = [
+        # The text 0009 could not convert stays for review; the other rows hold NULL.
+        migrations.RenameField(
+            model_name='service',
+            old_name='price',
+            new_name='legacy_price',
+        ),
+        migrations.AlterField(
+            model_name='service',
+            name='legacy_price',
+            field=models.CharField(blank=True, default=None, editable=False, max_length=15, null=True),
+        ),
+        migrations.RenameField(
+            model_name='service',
+            old_name='price_decimal',
+            new_name='price',
+        ),
+        migrations.AlterField(
+            model_name='service',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, default=None, max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0'))]),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['price', 'id'], name='service_price_id_idx'),
+        ),
+    ]
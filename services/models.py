@@ -1,3 +1,5 @@
+from decimal import Decimal
+from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models
 
 class Service(models.Model):
@@ -7,14 +9,34 @@ class Service(models.Model):
     Attributes:
         name (str): The name of the service.
         description (str): A detailed description of the service.
-        price (str, optional): The price of the service. It can be null or blank, with a default value of None.
+        price (DecimalField, optional): The price of the service, in `currency`. Null when the service has no price.
+        currency (str): The ISO 4217 code of the price's currency. Defaults to 'USD'.
+        legacy_price (str, optional): The free-text price the conversion to decimals could not read,
+            kept until it is reviewed. Null for every other service.
+        created_at (DateTimeField): When the service was created.
+        updated_at (DateTimeField): When the service was last saved.
 
     Methods:
         __str__(): Returns the name of the service as its string representation.
     """
     name = models.CharField(max_length=255)
     description = models.TextField()
-    price = models.CharField(max_length=15, null=True, blank=True, default=None) 
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, default=None, validators=[MinValueValidator(Decimal('0'))]
+    )
+    currency = models.CharField(
+        max_length=3, default='USD',
+        validators=[RegexValidator(r'^[A-Z]{3}$', 'Enter a three-letter ISO 4217 currency code, e.g. USD.')],
+    )
+    legacy_price = models.CharField(max_length=15, null=True, blank=True, default=None, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The catalog is filtered by price range and paginated in price order.
+            models.Index(fields=['price', 'id'], name='service_price_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
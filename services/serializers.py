@@ -11,13 +11,24 @@ class ServiceSerializer(serializers.ModelSerializer):
         id (int): The unique identifier of the service.
         name (str): The name of the service.
         description (str): A detailed description of the service.
-        price (str): The price of the service. Can be null or blank.
+        price (Decimal): The price of the service, rendered as a string such as "100.00". Can be null.
+        currency (str): The ISO 4217 code of the price's currency, e.g. "USD". It cannot change
+            while the service is on open proposals, whose costs are sums in one currency.
 
     Methods:
         create(validated_data): Creates a new `Service` instance using the validated data.
         update(instance, validated_data): Updates an existing `Service` instance with the validated data.
+        validate_currency(value): Rejects a currency change while the service is on open proposals.
     """
 
     class Meta:
         model = Service
-        fields = ['id', 'name', 'description','price']
+        fields = ['id', 'name', 'description', 'price', 'currency']
+
+    def validate_currency(self, value):
+        if self.instance is not None and value != self.instance.currency:
+            if self.instance.proposal_lines.filter(proposals__status='Pending').exists():
+                raise serializers.ValidationError(
+                    'The currency cannot change while the service is on pending proposals.'
+                )
+        return value
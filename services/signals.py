@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import bump_catalog_version
+from .models import Service
+
+
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_service_catalog(sender, instance, **kwargs):
+    """
+    Bump the service catalog version when a service is saved or deleted.
+
+    The version is bumped again on commit, so a response cached by another request
+    while the transaction was open, from the old rows, is not served afterwards.
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import json
+import warnings
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from rest_framework.renderers import BrowsableAPIRenderer
+from core.renderers import FastJSONRenderer, RenderedJSON
+from core.testing import QueryBudgetTestCase
+from .cache import service_catalog
+from .models import Service
+from .serializers import ServiceSerializer
+from .views import ServiceViewSet
 
-# Create your tests here.
+
+class ServiceQueryBudgetTests(QueryBudgetTestCase):
+    """
+    The service endpoints must not issue per-row queries.
+    """
+
+    def test_list_query_budget(self):
+        response = self.assertQueryBudget(1, 'get', '/api/services/')
+        self.assertEqual(len(json.loads(response.content)['data']['results']), self.fan_out)
+
+    def test_retrieve_query_budget(self):
+        self.assertQueryBudget(1, 'get', f'/api/services/{self.services[0].pk}/')
+
+
+class ServiceCatalogCacheTests(QueryBudgetTestCase):
+    """
+    Service responses are cached on the catalog version, which every service change bumps.
+    """
+
+    def test_list_and_retrieve_served_from_cache(self):
+        first = self.assertQueryBudget(1, 'get', '/api/services/')
+        cached = self.assertQueryBudget(0, 'get', '/api/services/')
+        self.assertEqual(json.loads(cached.content)['data'], json.loads(first.content)['data'])
+        self.assertQueryBudget(1, 'get', f'/api/services/{self.services[0].pk}/')
+        cached = self.assertQueryBudget(0, 'get', f'/api/services/{self.services[0].pk}/')
+        self.assertEqual(json.loads(cached.content)['data']['name'], self.services[0].name)
+
+    def test_pages_are_cached_separately(self):
+        self.client.get('/api/services/', {'page_size': 1})
+        response = self.assertQueryBudget(1, 'get', '/api/services/', {'page_size': 2})
+        self.assertEqual(len(json.loads(response.content)['data']['results']), 2)
+
+    def test_change_invalidates_cache(self):
+        self.client.get('/api/services/')
+        self.client.get(f'/api/services/{self.services[0].pk}/')
+        self.client.patch(f'/api/services/{self.services[0].pk}/', {'name': 'Renamed'})
+        response = self.assertQueryBudget(1, 'get', '/api/services/')
+        self.assertEqual(json.loads(response.content)['data']['results'][0]['name'], 'Renamed')
+        response = self.assertQueryBudget(1, 'get', f'/api/services/{self.services[0].pk}/')
+        self.assertEqual(json.loads(response.content)['data']['name'], 'Renamed')
+
+    def test_nested_services_follow_catalog(self):
+        self.client.get('/api/inquiries/')
+        self.services[0].name = 'Renamed'
+        self.services[0].save()
+        response = self.client.get(f'/api/inquiries/{self.inquiries[0].pk}/')
+        self.assertIn('Renamed', [service['name'] for service in response.data['data']['services']])
+
+    def test_cached_json_decoded_for_default_renderer(self):
+        self.client.get(f'/api/services/{self.services[0].pk}/')
+        response = self.client.get(f'/api/services/{self.services[0].pk}/')
+        self.assertEqual(response.data['data']['name'], self.services[0].name)
+        self.assertEqual(json.loads(response.content)['data']['name'], self.services[0].name)
+        response = self.client.get('/api/services/', HTTP_ACCEPT='text/html')
+        self.assertContains(response, self.services[0].name)
+
+    @mock.patch.object(ServiceViewSet, 'renderer_classes', [FastJSONRenderer, BrowsableAPIRenderer])
+    def test_cached_json_written_out_by_fast_renderer(self):
+        self.client.get('/api/services/')
+        response = self.client.get('/api/services/')
+        self.assertIsInstance(response.data['data'], RenderedJSON)
+        self.assertEqual(len(json.loads(response.content)['data']['results']), self.fan_out)
+
+    @override_settings(SERVICE_CATALOG_LRU_SIZE=2)
+    def test_representations_lru_is_bounded(self):
+        services = list(Service.objects.order_by('pk'))
+        representations = service_catalog.representations(services)
+        self.assertEqual([r['id'] for r in representations], [s.pk for s in services])
+        self.assertEqual(list(service_catalog._representations), [s.pk for s in services[-2:]])
+        # copies are returned, so callers cannot corrupt the cache
+        representations[-1]['name'] = 'Changed'
+        self.assertEqual(service_catalog.representations(services[-1:])[0]['name'], services[-1].name)
+
+
+class ServicePriceFilterTests(QueryBudgetTestCase):
+    """
+    `?min_price=`, `?max_price=`, `?currency=` and `?ordering=price` slice the catalog in the database.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for service, price in zip(cls.services, ('250.00', '80.50', '1200.00')):
+            service.price = price
+            service.save()
+        cls.unpriced = Service.objects.create(name='On request', description='Test service')
+        cls.euro = Service.objects.create(name='Euro tour', description='Test service', price='90', currency='EUR')
+
+    def names(self, **params):
+        response = self.assertQueryBudget(1, 'get', '/api/services/', params)
+        return [row['name'] for row in json.loads(response.content)['data']['results']]
+
+    def test_price_range(self):
+        self.assertEqual(self.names(min_price='85', max_price='250'), ['Service 0', 'Euro tour'])
+
+    def test_currency(self):
+        self.assertEqual(self.names(currency='eur'), ['Euro tour'])
+
+    def test_ordering_by_price_paginates(self):
+        response = self.client.get('/api/services/', {'ordering': '-price', 'page_size': 2})
+        page = json.loads(response.content)['data']
+        self.assertEqual([row['price'] for row in page['results']], ['1200.00', '250.00'])
+        page = json.loads(self.client.get(page['next']).content)['data']
+        # Unpriced services are left out when ordering by price.
+        self.assertEqual([row['price'] for row in page['results']], ['90.00', '80.50'])
+        self.assertIsNone(page['next'])
+
+    def test_invalid_price_filter(self):
+        response = self.client.get('/api/services/', {'min_price': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_price_is_validated(self):
+        payload = {'name': 'Service', 'description': 'Description', 'price': '-5', 'currency': 'dollars'}
+        response = self.client.post('/api/services/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['data']), {'price', 'currency'})
+
+    def test_price_bounds_are_decimals(self):
+        # DRF warns when a DecimalField is bounded by an int or a float.
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(ServiceSerializer().fields['price'].min_value, Decimal('0'))
+
+
+class ServicePriceConversionTests(SimpleTestCase):
+    """
+    The migration to decimal prices keeps only text that is one non-negative amount.
+    """
+    parse_price = staticmethod(import_module('services.migrations.0009_convert_service_prices').parse_price)
+
+    def test_single_amounts(self):
+        cases = {
+            '100': (Decimal('100.00'), None),
+            '$99': (Decimal('99.00'), 'USD'),
+            'EUR 80': (Decimal('80.00'), 'EUR'),
+            '80 eur': (Decimal('80.00'), 'EUR'),
+            '1,250.50': (Decimal('1250.50'), None),
+            '1.250,50 €': (Decimal('1250.50'), 'EUR'),
+            '12,5': (Decimal('12.50'), None),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.parse_price(text), expected)
+
+    def test_text_that_is_not_one_amount(self):
+        cases = {
+            '100-200': (None, None),
+            '$50 - $80': (None, 'USD'),
+            '2 x 300': (None, None),
+            '-50': (None, None),
+            '1.250': (None, None),
+            '99.999': (None, None),
+            'On request': (None, None),
+            '': (None, None),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.parse_price(text), expected)
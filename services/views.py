@@ -1,11 +1,18 @@
+import json
+from decimal import Decimal, InvalidOperation
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from .cache import get_catalog_version, service_catalog
 from .models import Service
 from .serializers import ServiceSerializer
 from accounts.permissions import IsAdminOrSalesAgent
-from .utils import custom_response
+from core.envelope import custom_response
+from core.writes import batched_writes
+from core.renderers import FastJSONRenderer, RenderedJSON, dumps
+from core.conditional import ConditionalGetMixin, weak_etag
+from core.replicas import ReplicaReadMixin
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing service data.
 
@@ -19,6 +26,8 @@ class ServiceViewSet(viewsets.ModelViewSet):
 
     Methods:
         get_queryset():Returns a queryset of services based on user role. Admins have access to all services, while sales agents can access all services.
+        get_price_filters(): Parses the `?min_price=`, `?max_price=` and `?currency=` filters of the list.
+        cached_data(data): Prepares cached JSON bytes for the negotiated renderer.
         list(request, *args, **kwargs): Retrieves a list of all services accessible by the user.
         retrieve(request, *args, **kwargs): Retrieves a specific service by ID.
         create(request, *args, **kwargs): Creates a new service with the provided data.
@@ -29,6 +38,8 @@ class ServiceViewSet(viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     permission_classes = [IsAdminOrSalesAgent]
     queryset = Service.objects.all()
+    # Sort keys of `?ordering=`, both covered by the (price, id) index.
+    ordering_fields = ('id', 'price')
     
     def get_queryset(self):
         """
@@ -37,55 +48,140 @@ class ServiceViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         if user.role == 'admin' or user.role == 'sales_agent':
-            return Service.objects.all()
-        return Service.objects.none()
+            queryset = Service.objects.all()
+        else:
+            return Service.objects.none()
+
+        if self.action == 'list':
+            queryset = queryset.filter(**self.get_price_filters())
+        return queryset
+
+    def get_price_filters(self):
+        """
+        Parse the price filters of the list into queryset lookups.
+
+        `?min_price=` and `?max_price=` bound the price (both included) and `?currency=`
+        selects a currency; they are answered from the (price, id) index. Services without a
+        price are left out when filtering or ordering by price.
+
+        Returns:
+            dict: The lookups to filter on; None when a price is not a number.
+        """
+        params = self.request.query_params
+        filters = {}
+        for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+            if params.get(param):
+                try:
+                    filters[lookup] = Decimal(params[param])
+                except InvalidOperation:
+                    return None
+                if not filters[lookup].is_finite():
+                    return None
+        if params.get('currency'):
+            filters['currency'] = params['currency'].upper()
+        if params.get('ordering', '').lstrip('-') == 'price':
+            # Keyset cursors cannot point at a null price.
+            filters['price__isnull'] = False
+        return filters
+
+    def cached_data(self, data):
+        """
+        Prepare cached JSON bytes as the `data` of a response.
+
+        `FastJSONRenderer` writes `RenderedJSON` bytes out as they are. The other renderers
+        (DRF's `JSONRenderer`, the browsable API) cannot, so they get the decoded data.
+
+        Args:
+            data (bytes): The cached, pre-rendered JSON.
+
+        Returns:
+            RenderedJSON | dict | list: The data to put in the response envelope.
+        """
+        if isinstance(getattr(self.request, 'accepted_renderer', None), FastJSONRenderer):
+            return RenderedJSON(data)
+        return json.loads(data)
+
+    def get_conditional_validators(self):
+        """
+        Validate list pages and details against the catalog version, without a query.
+
+        Returns:
+            tuple: The ETag and no last modification date.
+        """
+        return weak_etag(self.request.get_full_path(), get_catalog_version()), None
 
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of services.
 
+        Results are returned one page at a time using keyset pagination (`?cursor=`, `?page_size=`),
+        by ID or, with `?ordering=price` / `?ordering=-price`, by price. `?min_price=`, `?max_price=`
+        and `?currency=` filter the catalog in the database.
+        Rendered pages are cached per URL until the service catalog changes.
+
         Returns:
-            Response: A response object containing the list of services or a message indicating no services found.
+            Response: A response object containing a page of services or a message indicating no services found.
         """
-        queryset = self.get_queryset()
-        if queryset.exists():
-            serializer = self.get_serializer(queryset, many=True)
+        if self.get_price_filters() is None:
             response_data = custom_response(
-                status_code=200,
-                message="Services retrieved successfully.",
-                data=serializer.data
-            )
-            return Response(response_data, status=status.HTTP_200_OK)
-        else:
-            response_data = custom_response(
-                status_code=404,
-                message='No services found.',
-                data=[]
+                status_code=400,
+                message="Invalid price filter. Use numbers for min_price and max_price.",
+                data=None
             )
-            return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_name = f'list:{request.build_absolute_uri()}'
+        cached = service_catalog.get_rendered(cache_name)
+        if cached is None:
+            version = get_catalog_version()
+            queryset = self.get_queryset()
+            page = self.paginate_queryset(queryset)
+            if page:
+                serializer = self.get_serializer(page, many=True)
+                data = dumps(self.paginator.get_paginated_data(serializer.data))
+                cached = (status.HTTP_200_OK, "Services retrieved successfully.", data)
+            else:
+                cached = (status.HTTP_404_NOT_FOUND, 'No services found.', None)
+            service_catalog.set_rendered(cache_name, cached, version)
+
+        status_code, message, data = cached
+        response_data = custom_response(
+            status_code=status_code,
+            message=message,
+            data=self.cached_data(data) if data is not None else []
+        )
+        return Response(response_data, status=status_code)
 
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve a specific service by ID.
 
+        The rendered service is cached until the service catalog changes.
+
         Returns:
             Response: A response object containing the service data or a message indicating service not found.
         """
-        try:
-            instance = self.get_object()
-        except:
-            response_data = custom_response(
-                status_code=404,
-                message='Service not found.',
-                data=None
-            )
-            return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+        cache_name = f"retrieve:{kwargs.get('pk')}"
+        data = service_catalog.get_rendered(cache_name)
+        if data is None:
+            version = get_catalog_version()
+            try:
+                instance = self.get_object()
+            except:
+                response_data = custom_response(
+                    status_code=404,
+                    message='Service not found.',
+                    data=None
+                )
+                return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+
+            data = dumps(self.get_serializer(instance).data)
+            service_catalog.set_rendered(cache_name, data, version)
 
-        serializer = self.get_serializer(instance)
         response_data = custom_response(
             status_code=200,
             message="Service retrieved successfully.",
-            data=serializer.data
+            data=self.cached_data(data)
         )
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -166,7 +262,9 @@ class ServiceViewSet(viewsets.ModelViewSet):
             )
             return Response(response_data, status=status.HTTP_404_NOT_FOUND)
         
-        self.perform_destroy(instance)
+        # The proposals repriced without the service are logged together with its tombstone.
+        with batched_writes():
+            self.perform_destroy(instance)
         response_data = custom_response(
                 status_code=200,
                 message="Service successfully deleted.",
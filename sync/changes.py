@@ -0,0 +1,181 @@
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from core.writes import defer_write
+from customer.models import Customer
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from services.models import Service
+from .models import Change
+
+# Synced models and the resource name their changes are logged under.
+SYNCED_MODELS = {
+    Customer: 'customers',
+    Inquiries: 'inquiries',
+    Proposals: 'proposals',
+    Service: 'services',
+}
+# Resources every sales agent sees in full.
+SHARED_RESOURCES = ('services',)
+
+_local = threading.local()
+
+
+def deleting_inquiries():
+    """
+    Sales agents of the inquiries being deleted, by inquiry ID.
+
+    Filled from `pre_delete`, so the proposals deleted with an inquiry find their agent
+    without a query per proposal.
+    """
+    if not hasattr(_local, 'inquiries'):
+        _local.inquiries = {}
+    return _local.inquiries
+
+
+def proposal_inquiry(proposal):
+    """
+    Return the inquiry of a proposal, loading only the columns the write receivers need.
+
+    The inquiry is cached on the proposal, so the receivers of one save or delete load it
+    once. Returns None when the inquiry no longer exists.
+    """
+    if not Proposals.inquiry.is_cached(proposal):
+        inquiry = Inquiries.objects.only('assigned_sales_agent_id', 'created_at').filter(pk=proposal.inquiry_id).first()
+        if inquiry is None:
+            return None
+        Proposals.inquiry.field.set_cached_value(proposal, inquiry)
+    return proposal.inquiry
+
+
+def inquiry_agent(inquiry_id):
+    if inquiry_id in deleting_inquiries():
+        return deleting_inquiries()[inquiry_id]
+    return Inquiries.objects.filter(pk=inquiry_id).values_list('assigned_sales_agent_id', flat=True).first()
+
+
+def owner(instance):
+    """
+    Return the ID of the sales agent who can see a row, or None.
+
+    Args:
+        instance (Model): A row of a synced model.
+
+    Returns:
+        int: The sales agent ID; None for services and unassigned customers.
+    """
+    if isinstance(instance, (Customer, Inquiries)):
+        return instance.assigned_sales_agent_id
+    if isinstance(instance, Proposals):
+        if not Proposals.inquiry.is_cached(instance) and instance.inquiry_id in deleting_inquiries():
+            return deleting_inquiries()[instance.inquiry_id]
+        inquiry = proposal_inquiry(instance)
+        return inquiry.assigned_sales_agent_id if inquiry else None
+    return None
+
+
+def write_changes(changes):
+    Change.objects.bulk_create(changes)
+
+
+def log_changes(resource, action, rows):
+    """
+    Append entries to the change log with one INSERT.
+
+    Within `batched_writes`, the entries of the whole block are inserted together at its end.
+
+    Args:
+        resource (str): The resource name, e.g. 'inquiries'.
+        action (str): 'create', 'update' or 'delete'.
+        rows (iterable): `(object_id, agent_id)` pairs.
+    """
+    defer_write(write_changes, [
+        Change(resource=resource, object_id=object_id, action=action, agent_id=agent_id)
+        for object_id, agent_id in rows
+    ])
+
+
+def log_created(instances):
+    """
+    Log rows inserted without `post_save`, e.g. with `bulk_create`.
+
+    Args:
+        instances (list): Saved rows of one synced model.
+    """
+    if instances:
+        log_changes(SYNCED_MODELS[type(instances[0])], 'create', [(instance.pk, owner(instance)) for instance in instances])
+
+
+def changes_since(user, since, limit):
+    """
+    Return the change log entries visible to a user after a token, oldest first.
+
+    Admins see every entry. Sales agents see the entries of their own rows and of the
+    shared resources, read through the `(agent, id)` and `(resource, id)` indexes.
+
+    Args:
+        user (CustomUser): The user syncing.
+        since (int): The token of the last sync; 0 for every entry.
+        limit (int): The maximum number of entries.
+
+    Returns:
+        list: The `Change` entries.
+    """
+    queryset = Change.objects.filter(id__gt=since)
+    if user.role != 'admin':
+        queryset = queryset.filter(Q(agent=user.pk) | Q(resource__in=SHARED_RESOURCES))
+    return list(queryset.order_by('id')[:limit])
+
+
+def next_token(changes, since):
+    """
+    Return the token to sync from next time.
+
+    IDs are assigned when an entry is inserted but become visible when its transaction
+    commits, so an entry younger than `SYNC_SETTLE_SECONDS` may still be followed by an
+    older ID. The token only moves past settled entries; newer entries are returned again by
+    the next sync, which clients apply idempotently.
+
+    Args:
+        changes (list): The entries returned, oldest first.
+        since (int): The token the entries were read from.
+
+    Returns:
+        int: The next token.
+    """
+    settled = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    token = since
+    for change in changes:
+        if change.created_at > settled:
+            break
+        token = change.id
+    return token
+
+
+def collapse(changes):
+    """
+    Reduce entries to the final state of every row.
+
+    Returns:
+        dict: For each resource, the IDs of `created`, `updated` and `deleted` rows. Rows
+            created and deleted within the entries are left out.
+    """
+    first, last = {}, {}
+    for change in changes:
+        key = (change.resource, change.object_id)
+        first.setdefault(key, change.action)
+        last[key] = change.action
+
+    result = {resource: {'created': [], 'updated': [], 'deleted': []} for resource in SYNCED_MODELS.values()}
+    for key, action in last.items():
+        resource, object_id = key
+        if action == 'delete':
+            if first[key] != 'create':
+                result[resource]['deleted'].append(object_id)
+        elif first[key] == 'create':
+            result[resource]['created'].append(object_id)
+        else:
+            result[resource]['updated'].append(object_id)
+    return result
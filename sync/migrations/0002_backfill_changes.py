@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:20
+
+from django.db import migrations
+
+# Resource, model and the column holding the sales agent of each row (proposals take it from their inquiry).
+BACKFILL = [
+    ('services', 'services.Service', None),
+    ('customers', 'customer.Customer', 'assigned_sales_agent_id'),
+    ('inquiries', 'inquiries.Inquiries', 'assigned_sales_agent_id'),
+    ('proposals', 'proposal.Proposals', None),
+]
+
+
+def backfill(apps, schema_editor):
+    """
+    Log every existing row as created, so a sync without a token returns the whole dataset.
+    """
+    quote = schema_editor.quote_name
+    change = quote(apps.get_model('sync', 'Change')._meta.db_table)
+    columns = 'resource, object_id, action, agent_id, created_at'
+    for resource, label, agent_column in BACKFILL:
+        table = quote(apps.get_model(label)._meta.db_table)
+        if resource == 'proposals':
+            inquiries = quote(apps.get_model('inquiries', 'Inquiries')._meta.db_table)
+            select = (
+                f"SELECT 'proposals', p.id, 'create', i.assigned_sales_agent_id, CURRENT_TIMESTAMP "
+                f"FROM {table} p INNER JOIN {inquiries} i ON i.id = p.inquiry_id ORDER BY p.id"
+            )
+        else:
+            agent = agent_column or 'NULL'
+            select = f"SELECT '{resource}', id, 'create', {agent}, CURRENT_TIMESTAMP FROM {table} ORDER BY id"
+        schema_editor.execute(f"INSERT INTO {change} ({columns}) {select}")
+
+
+def clear(apps, schema_editor):
+    apps.get_model('sync', 'Change').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+        ('customer', '0004_customer_updated_at'),
+        ('inquiries', '0004_inquiries_updated_at'),
+        ('proposal', '0004_proposals_updated_at'),
+        ('services', '0006_service_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
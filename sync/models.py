@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import models
+
+class Change(models.Model):
+    """
+    One entry of the change log read by the sync API.
+
+    Every create, update and delete of a synced row appends an entry; the entry's ID is the
+    monotonic change token. Entries are scoped to the sales agent who can see the row when
+    the change happens, and a row moving to another agent gets a `delete` entry for the
+    previous one.
+
+    Attributes:
+        RESOURCE_CHOICES (list): The synced resources, named like their API endpoints.
+        ACTION_CHOICES (list): The kinds of change.
+        resource (CharField): The resource of the changed row.
+        object_id (BigIntegerField): The primary key of the changed row.
+        action (CharField): Whether the row was created, updated or deleted.
+        agent (ForeignKey): The sales agent the row belongs to, if any. Not a database
+            constraint, so the entries outlive a deleted agent.
+        created_at (DateTimeField): When the change was logged.
+    """
+    RESOURCE_CHOICES = [
+        ('customers', 'customers'),
+        ('inquiries', 'inquiries'),
+        ('proposals', 'proposals'),
+        ('services', 'services'),
+    ]
+    ACTION_CHOICES = [
+        ('create', 'create'),
+        ('update', 'update'),
+        ('delete', 'delete'),
+    ]
+
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    agent = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # A sales agent reads the changes of their rows after a token.
+            models.Index(fields=['agent', 'id'], name='sync_change_agent_id_idx'),
+            # Services are visible to every sales agent.
+            models.Index(fields=['resource', 'id'], name='sync_change_resource_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.action} {self.resource} {self.object_id}'
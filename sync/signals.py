@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from customer.models import Customer
+from inquiries.models import Inquiries
+from proposal.models import Proposals
+from .changes import SYNCED_MODELS, deleting_inquiries, inquiry_agent, log_changes, owner
+
+# Field deciding which sales agent sees a row, remembered when the row is loaded.
+OWNER_FIELDS = {
+    Customer: 'assigned_sales_agent_id',
+    Inquiries: 'assigned_sales_agent_id',
+    Proposals: 'inquiry_id',
+}
+_UNKNOWN = object()
+
+
+def remember_owner(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not loaded.
+    instance._sync_owner = instance.__dict__.get(OWNER_FIELDS[sender], _UNKNOWN)
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Log a created or updated row.
+
+    When the row moved to another sales agent (a customer or inquiry reassigned, a
+    proposal moved to another inquiry), the previous agent gets a `delete` entry; a
+    reassigned inquiry moves its proposals along.
+    """
+    if raw:
+        return
+    resource = SYNCED_MODELS[sender]
+    agent = owner(instance)
+    log_changes(resource, 'create' if created else 'update', [(instance.pk, agent)])
+
+    field = OWNER_FIELDS.get(sender)
+    if field is None:
+        return
+    previous, current = getattr(instance, '_sync_owner', _UNKNOWN), getattr(instance, field)
+    instance._sync_owner = current
+    if created or previous is _UNKNOWN or previous == current:
+        return
+    previous_agent = inquiry_agent(previous) if sender is Proposals else previous
+    if previous_agent == agent:
+        return
+    if previous_agent is not None:
+        log_changes(resource, 'delete', [(instance.pk, previous_agent)])
+    if sender is Inquiries:
+        proposals = list(instance.proposals.values_list('pk', flat=True))
+        if proposals and previous_agent is not None:
+            log_changes('proposals', 'delete', [(pk, previous_agent) for pk in proposals])
+        if proposals:
+            log_changes('proposals', 'update', [(pk, agent) for pk in proposals])
+
+
+def log_delete(sender, instance, **kwargs):
+    """
+    Log a tombstone for a deleted row.
+    """
+    log_changes(SYNCED_MODELS[sender], 'delete', [(instance.pk, owner(instance))])
+    if sender is Inquiries:
+        deleting_inquiries().pop(instance.pk, None)
+
+
+def remember_deleting_inquiry(sender, instance, **kwargs):
+    deleting_inquiries()[instance.pk] = instance.assigned_sales_agent_id
+
+
+for model, resource in SYNCED_MODELS.items():
+    post_save.connect(log_save, sender=model, dispatch_uid=f'sync_log_save_{resource}')
+    post_delete.connect(log_delete, sender=model, dispatch_uid=f'sync_log_delete_{resource}')
+for model in OWNER_FIELDS:
+    post_init.connect(remember_owner, sender=model, dispatch_uid=f'sync_remember_owner_{SYNCED_MODELS[model]}')
+pre_delete.connect(remember_deleting_inquiry, sender=Inquiries, dispatch_uid='sync_remember_deleting_inquiry')
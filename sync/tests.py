@@ -0,0 +1,120 @@
+from django.test import override_settings
+from core.testing import QueryBudgetTestCase
+from accounts.models import CustomUser
+from customer.models import Customer
+from services.models import Service
+from .models import Change
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(QueryBudgetTestCase):
+    """
+    `/api/sync/` returns the rows changed since a token, scoped like the resource endpoints.
+    """
+
+    def sync(self, since=None, budget=3):
+        params = {} if since is None else {'since': since}
+        return self.assertQueryBudget(budget, 'get', '/api/sync/', params).data['data']
+
+    def test_initial_sync_returns_every_row_as_created(self):
+        # the change log, then the rows of every resource with its nested IDs and adjusted proposal lines
+        data = self.sync(budget=8)
+        self.assertCountEqual([row['id'] for row in data['customers']['created']], [c.pk for c in self.customers])
+        self.assertCountEqual([row['id'] for row in data['proposals']['created']], [p.pk for p in self.proposals])
+        self.assertEqual(data['inquiries']['created'][0]['customer'], self.customers[0].pk)
+        self.assertEqual(data['services']['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_updates_and_deletes_after_token(self):
+        token = self.sync(budget=8)['token']
+        customer = self.customers[0]
+        customer.name = 'Renamed'
+        customer.save()
+        service = self.services[0].pk
+        self.services[0].delete()
+
+        # the open proposals that lost the service were repriced, so they come back as updated
+        data = self.sync(token, budget=5)
+        self.assertEqual([row['name'] for row in data['customers']['updated']], ['Renamed'])
+        self.assertEqual(data['services']['deleted'], [service])
+        self.assertEqual(data['inquiries'], {'created': [], 'updated': [], 'deleted': []})
+        self.assertCountEqual([row['id'] for row in data['proposals']['updated']], [p.pk for p in self.proposals])
+
+        data = self.sync(data['token'], budget=1)
+        self.assertEqual(data['customers']['updated'], [])
+
+    def test_created_then_deleted_rows_are_left_out(self):
+        token = self.sync(budget=8)['token']
+        Service.objects.create(name='Short lived', description='Test service', price='1').delete()
+        data = self.sync(token, budget=1)
+        self.assertEqual(data['services'], {'created': [], 'updated': [], 'deleted': []})
+
+    def test_sales_agent_sees_own_rows_and_shared_services(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        Customer.objects.create(
+            name='Other', email='other@example.com', phone_no='0', address='Test address',
+            assigned_sales_agent=other_agent,
+        )
+        self.client.force_authenticate(other_agent)
+        data = self.sync(budget=3)
+        self.assertEqual([row['name'] for row in data['customers']['created']], ['Other'])
+        self.assertEqual(data['inquiries']['created'], [])
+        self.assertEqual(len(data['services']['created']), self.fan_out)
+
+    def test_reassignment_deletes_for_previous_agent(self):
+        other_agent = CustomUser.objects.create_user(
+            username='other', email='other@example.com', role='sales_agent', password='password'
+        )
+        self.client.force_authenticate(self.agent)
+        token = self.sync(budget=8)['token']
+        inquiry = self.inquiries[0]
+        inquiry.assigned_sales_agent = other_agent
+        inquiry.save()
+
+        data = self.sync(token, budget=1)
+        self.assertEqual(data['inquiries']['deleted'], [inquiry.pk])
+        self.assertEqual(data['proposals']['deleted'], [self.proposals[0].pk])
+
+        self.client.force_authenticate(other_agent)
+        data = self.sync(token, budget=6)
+        self.assertEqual([row['id'] for row in data['inquiries']['updated']], [inquiry.pk])
+        self.assertEqual([row['id'] for row in data['proposals']['updated']], [self.proposals[0].pk])
+
+    def test_cascade_delete_logs_every_row(self):
+        token = self.sync(budget=8)['token']
+        customer, inquiry, proposal = self.customers[0].pk, self.inquiries[0].pk, self.proposals[0].pk
+        self.customers[0].delete()
+        data = self.sync(token, budget=1)
+        self.assertEqual(data['customers']['deleted'], [customer])
+        self.assertEqual(data['inquiries']['deleted'], [inquiry])
+        self.assertEqual(data['proposals']['deleted'], [proposal])
+        self.assertTrue(Change.objects.filter(resource='proposals', action='delete', agent=self.agent).exists())
+
+    @override_settings(SYNC_PAGE_SIZE=4)
+    def test_pages_through_the_log(self):
+        data = self.client.get('/api/sync/').data['data']
+        self.assertTrue(data['has_more'])
+        seen = 0
+        while data['has_more']:
+            data = self.client.get('/api/sync/', {'since': data['token']}).data['data']
+            seen += 1
+        self.assertGreater(seen, 1)
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_token_stops_before_unsettled_changes(self):
+        data = self.client.get('/api/sync/', {'since': 0}).data['data']
+        self.assertEqual(data['token'], '0')
+
+    @override_settings(SYNC_SETTLE_SECONDS=60, SYNC_PAGE_SIZE=4)
+    def test_full_page_of_unsettled_changes_has_no_more(self):
+        # following `has_more` with an unchanged token would return the same page forever
+        data = self.client.get('/api/sync/', {'since': 0}).data['data']
+        self.assertEqual(data['token'], '0')
+        self.assertFalse(data['has_more'])
+
+    def test_invalid_token(self):
+        for token in ('abc', '-1'):
+            response = self.client.get('/api/sync/', {'since': token})
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,102 @@
+from django.conf import settings
+from rest_framework.views import APIView
+from accounts.permissions import IsAdminOrSalesAgent
+from core.envelope import envelope_response
+from core.replicas import ReplicaReadMixin
+from customer.serializers import CustomerSerializer
+from inquiries.serializers import InquirySerializer
+from proposal.serializers import ProposalSerializer
+from services.serializers import ServiceSerializer
+from .changes import SYNCED_MODELS, changes_since, collapse, next_token
+
+SERIALIZERS = {
+    'customers': CustomerSerializer,
+    'inquiries': InquirySerializer,
+    'proposals': ProposalSerializer,
+    'services': ServiceSerializer,
+}
+# Lookup of the sales agent who can see a row, per resource; services are shared.
+AGENT_LOOKUPS = {
+    'customers': 'assigned_sales_agent',
+    'inquiries': 'assigned_sales_agent',
+    'proposals': 'inquiry__assigned_sales_agent',
+}
+MODELS = {resource: model for model, resource in SYNCED_MODELS.items()}
+
+
+class SyncView(ReplicaReadMixin, APIView):
+    """
+    API view returning the customers, inquiries, proposals and services changed since a token.
+
+    The changes are read from the change log (`sync.models.Change`) through indexes, so a
+    sync costs time proportional to the number of changes, not to the size of the tables.
+    Rows are scoped with the same rules as the resource endpoints: admins see everything,
+    sales agents their own customers, inquiries and proposals and every service.
+
+    Permission Classes:
+        - IsAdminOrSalesAgent: Admins and sales agents can sync.
+    """
+    permission_classes = [IsAdminOrSalesAgent]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request to return the changes after `?since=<token>`.
+
+        Without a token every row is returned, as created, one page at a time. The response
+        contains, per resource, the `created` and `updated` rows (related rows as IDs) and
+        the IDs of `deleted` rows, plus the `token` to pass next time. When `has_more` is
+        true, sync again right away with the new token; it is false while a full page holds
+        only entries younger than `SYNC_SETTLE_SECONDS`.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A DRF Response object with the changes, or an error for an invalid token.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            since = -1
+        if since < 0:
+            return envelope_response(400, "Invalid sync token.", data=None)
+
+        limit = settings.SYNC_PAGE_SIZE
+        changes = changes_since(request.user, since, limit)
+        collapsed = collapse(changes)
+        token = next_token(changes, since)
+        # A full page the token could not move into has only unsettled entries: syncing again
+        # right away would return the same page.
+        data = {'token': str(token), 'has_more': len(changes) == limit and token != since}
+        for resource, ids in collapsed.items():
+            created, updated = self.load_rows(resource, ids['created']), self.load_rows(resource, ids['updated'])
+            data[resource] = {
+                'created': [created[pk] for pk in ids['created'] if pk in created],
+                'updated': [updated[pk] for pk in ids['updated'] if pk in updated],
+                # Rows that were changed but are no longer visible are deleted for this user.
+                'deleted': ids['deleted'] + [pk for pk in ids['updated'] if pk not in updated],
+            }
+        return envelope_response(200, "Changes retrieved successfully.", data=data)
+
+    def load_rows(self, resource, ids):
+        """
+        Serialize the current state of changed rows visible to the user.
+
+        Args:
+            resource (str): The resource name.
+            ids (list): The primary keys of the changed rows.
+
+        Returns:
+            dict: The representation of each visible row, by primary key.
+        """
+        if not ids:
+            return {}
+        queryset = MODELS[resource].objects.filter(pk__in=ids)
+        if self.request.user.role != 'admin' and resource in AGENT_LOOKUPS:
+            queryset = queryset.filter(**{AGENT_LOOKUPS[resource]: self.request.user.pk})
+        serializer_class = SERIALIZERS[resource]
+        # Related rows are sent as IDs: they are synced as rows of their own.
+        context = {'request': self.request, 'fields': None, 'expand': {}}
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset, expand={})
+        return {row['id']: row for row in serializer_class(queryset, many=True, context=context).data}